@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the backend.
+
+Run from the backend directory:
+    python -m benchmarks.run [--layers micro,e2e,load] [--output FILE] [--save-baseline]
+"""
@@ -0,0 +1,149 @@
+"""
+End-to-end request benchmarks: the real app served by uvicorn on a local
+port, with NASA calls going to the stub server and the cache and catalog
+in a temporary directory.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from benchmarks.stub_nasa import start_stub
+
+# Requests timed per route
+DEFAULT_REQUESTS = 200
+
+IMPACT = {
+    "size": 100, "density": 3000, "velocity": 20, "angle": 45,
+    "impact_location": {"lat": 40.7128, "lng": -74.0060}, "is_water_impact": False,
+}
+
+DEFLECTION = {"type": "kinetic-impactor", "time_available": 365, "asteroid_mass": 1e10}
+
+# (name, method, path, JSON body)
+ROUTES: List[Tuple[str, str, str, Dict]] = [
+    ("simulation.simulate", "POST", "/api/simulation/simulate", IMPACT),
+    ("deflection.calculate", "POST", "/api/deflection/calculate", DEFLECTION),
+    ("asteroids.neo_feed", "GET", "/api/asteroids/neo/feed?start_date=2030-01-01&end_date=2030-01-07", None),
+    ("asteroids.neo_lookup", "GET", "/api/asteroids/neo/2000042", None),
+    ("asteroids.neo_browse", "GET", "/api/asteroids/neo/browse?page=0&size=20", None),
+    ("asteroids.statistics", "GET", "/api/asteroids/statistics", None),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+_stub = None
+
+
+def _environment():
+    """
+    Start the stub NASA API and point the app's environment at it.
+
+    Done once per process: the NASA client, cache and catalog read their
+    settings at import time, so every server started afterwards shares the
+    same stub and temporary data directory.
+    """
+    global _stub
+    if _stub is None:
+        _stub = start_stub()
+        data_dir = tempfile.mkdtemp(prefix="meteor-bench-")
+        os.environ["NASA_BASE_URL"] = "http://%s:%d" % _stub.server_address
+        os.environ["NEO_CACHE_PATH"] = os.path.join(data_dir, "neo_cache.sqlite3")
+        os.environ["NEO_CATALOG_URL"] = "sqlite:///" + os.path.join(data_dir, "neo_catalog.sqlite3")
+        os.environ["RESULT_CACHE_PATH"] = os.path.join(data_dir, "result_cache.sqlite3")
+        # The stub is not rate limited; keep the scheduler from throttling the benchmark
+        os.environ.setdefault("NASA_RATE_LIMIT", "1000000")
+    return _stub
+
+
+@contextmanager
+def serve_app(nasa_latency: float = 0.0) -> Iterator[str]:
+    """
+    Run the app against the stub NASA API for the duration of the block.
+
+    Args:
+        nasa_latency: Artificial stub latency per upstream request in seconds
+
+    Yields:
+        Base URL of the running app
+    """
+    import uvicorn
+
+    stub = _environment()
+    stub.RequestHandlerClass.latency = nasa_latency
+    from main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("Benchmark server failed to start")
+            time.sleep(0.01)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    Latency statistics in seconds.
+    """
+    samples = np.array(latencies)
+    return {
+        "unit": "s",
+        "median": float(np.median(samples)),
+        "p99": float(np.percentile(samples, 99)),
+        "mean": float(samples.mean()),
+        "min": float(samples.min()),
+        "requests": len(samples),
+    }
+
+
+def run(selected: List[str] = None, requests: int = DEFAULT_REQUESTS) -> Dict[str, Dict]:
+    """
+    Time sequential requests to each route.
+
+    Every route is requested once before timing, so NASA-backed routes are
+    measured on the warm (cached) path. The cold first request is reported
+    separately as "cold_s".
+
+    Args:
+        selected: Substrings; only routes whose name contains one are run
+        requests: Timed requests per route
+
+    Returns:
+        Results keyed "e2e.<route>"
+    """
+    import httpx
+
+    results = {}
+    with serve_app() as base_url, httpx.Client(base_url=base_url, timeout=30) as client:
+        for name, method, path, body in ROUTES:
+            if selected and not any(s in name for s in selected):
+                continue
+            start = time.perf_counter()
+            client.request(method, path, json=body).raise_for_status()
+            cold = time.perf_counter() - start
+
+            latencies = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.request(method, path, json=body)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+            results[f"e2e.{name}"] = {**summarize(latencies), "cold_s": cold}
+    return results
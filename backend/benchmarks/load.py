@@ -0,0 +1,79 @@
+"""
+Concurrency/load scenario: a fixed number of clients issue a mix of
+requests back to back for a fixed time, against the app served as in the
+end-to-end benchmarks.
+"""
+import asyncio
+import itertools
+import time
+from typing import Dict, List
+
+from benchmarks.e2e import ROUTES, serve_app, summarize
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_DURATION = 10.0
+
+# Routes in the load mix (simulation-heavy, as from the dashboard)
+LOAD_MIX = ["simulation.simulate", "simulation.simulate", "deflection.calculate",
+            "asteroids.neo_feed", "asteroids.neo_lookup"]
+
+
+async def _client(client, routes, deadline: float, latencies: List[float], errors: List[int]):
+    for method, path, body in routes:
+        if time.perf_counter() >= deadline:
+            return
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        if not ok:
+            errors.append(1)
+
+
+async def _load(base_url: str, concurrency: int, duration: float) -> Dict[str, float]:
+    import httpx
+
+    by_name = {name: (method, path, body) for name, method, path, body in ROUTES}
+    mix = [by_name[name] for name in LOAD_MIX]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        for method, path, body in mix:  # warm caches
+            (await client.request(method, path, json=body)).raise_for_status()
+
+        latencies: List[float] = []
+        errors: List[int] = []
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            _client(client, itertools.islice(itertools.cycle(mix), k, None), deadline, latencies, errors)
+            for k in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    return {
+        **summarize(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "errors": len(errors),
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+    }
+
+
+def run(concurrency: int = DEFAULT_CONCURRENCY, duration: float = DEFAULT_DURATION,
+        nasa_latency: float = 0.0) -> Dict[str, Dict]:
+    """
+    Run the load scenario.
+
+    Args:
+        concurrency: Concurrent clients
+        duration: Seconds to keep issuing requests
+        nasa_latency: Artificial stub latency per upstream request in seconds
+
+    Returns:
+        Results keyed "load.mixed"
+    """
+    with serve_app(nasa_latency) as base_url:
+        return {"load.mixed": asyncio.run(_load(base_url, concurrency, duration))}
@@ -0,0 +1,145 @@
+"""
+Microbenchmarks: ImpactSimulator methods, deflection calculations and
+response serialization, timed in-process.
+"""
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from simulation import ImpactSimulator
+from coastline import get_coastline
+from models import DeflectionStrategy, ImpactResults, BatchImpactResults
+from routers.deflection import calculate_kinetic_impactor, calculate_gravity_tractor, calculate_laser_ablation
+from routers.simulation import _column_to_list
+
+# Target wall time per timing run; calls are batched until a run takes this long
+TARGET_RUN_SECONDS = 0.02
+
+
+def measure(fn: Callable[[], object], runs: int = 30) -> Dict[str, float]:
+    """
+    Time a zero-argument callable.
+
+    Calls per run are calibrated (like timeit.autorange) so each run takes
+    about TARGET_RUN_SECONDS. Reported times are per call, in seconds.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= TARGET_RUN_SECONDS or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < TARGET_RUN_SECONDS / 10 else 2
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    samples = np.array(samples)
+    return {
+        "unit": "s",
+        "median": float(np.median(samples)),
+        "p99": float(np.percentile(samples, 99)),
+        "mean": float(samples.mean()),
+        "min": float(samples.min()),
+        "calls_per_run": number,
+        "runs": runs,
+    }
+
+
+def _simulate_once() -> Dict:
+    """
+    The /simulate pipeline for a fixed land impact, as a response dict.
+    """
+    energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(100, 3000, 20)
+    diameter, depth = ImpactSimulator.calculate_crater_size(energy_mt, False)
+    magnitude, seismic_radius = ImpactSimulator.calculate_seismic_effects(energy_joules)
+    fireball, thermal, overpressure = ImpactSimulator.calculate_atmospheric_effects(energy_mt)
+    casualties, affected = ImpactSimulator.estimate_casualties_at(40.7, -74.0, fireball, thermal, overpressure)
+    return {
+        "energy": {"joules": energy_joules, "megatons_tnt": energy_mt},
+        "crater": {"diameter": diameter, "depth": depth},
+        "seismic": {"magnitude": magnitude, "radius": seismic_radius},
+        "atmospheric": {"fireball_radius": fireball, "thermal_radiation": thermal, "overpressure": overpressure},
+        "casualties": {"estimated": casualties, "affected_population": affected},
+    }
+
+
+def cases(batch_size: int = 10_000) -> Dict[str, Callable[[], object]]:
+    """
+    Named zero-argument callables to benchmark.
+    """
+    energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(100, 3000, 20)
+    fireball, thermal, overpressure = ImpactSimulator.calculate_atmospheric_effects(energy_mt)
+
+    rng = np.random.default_rng(0)
+    size = rng.uniform(10, 1000, batch_size)
+    density = np.full(batch_size, 3000.0)
+    velocity = rng.uniform(11, 70, batch_size)
+    water = rng.random(batch_size) < 0.7
+    lat = rng.uniform(-60, 60, batch_size)
+    lng = rng.uniform(-180, 180, batch_size)
+    angle = rng.uniform(15, 90, batch_size)
+
+    strategy = DeflectionStrategy(type="kinetic-impactor", time_available=365, asteroid_mass=1e10)
+
+    result = ImpactResults(**_simulate_once())
+    batch = ImpactSimulator.simulate_batch(size[:1000], density[:1000], velocity[:1000],
+                                           water[:1000], lat[:1000], lng[:1000], angle[:1000])
+    batch_body = {"count": 1000}
+    for key, values in batch.items():
+        group, field = key.split(".")
+        batch_body.setdefault(group, {})[field] = _column_to_list(values)
+    batch_result = BatchImpactResults(**batch_body)
+
+    benchmarks = {
+        "ImpactSimulator.calculate_impact_energy": lambda: ImpactSimulator.calculate_impact_energy(100, 3000, 20),
+        "ImpactSimulator.surface_conditions": lambda: ImpactSimulator.surface_conditions(40.7, -74.0),
+        "ImpactSimulator.calculate_atmospheric_entry": lambda: ImpactSimulator.calculate_atmospheric_entry(
+            100, 3000, 20, 45),
+        "ImpactSimulator.calculate_crater_size": lambda: ImpactSimulator.calculate_crater_size(energy_mt, False),
+        "ImpactSimulator.calculate_seismic_effects": lambda: ImpactSimulator.calculate_seismic_effects(energy_joules),
+        "ImpactSimulator.calculate_tsunami_effects": lambda: ImpactSimulator.calculate_tsunami_effects(energy_mt),
+        "ImpactSimulator.calculate_atmospheric_effects": lambda: ImpactSimulator.calculate_atmospheric_effects(energy_mt),
+        "ImpactSimulator.estimate_casualties": lambda: ImpactSimulator.estimate_casualties(overpressure),
+        "ImpactSimulator.estimate_casualties_at": lambda: ImpactSimulator.estimate_casualties_at(
+            40.7, -74.0, fireball, thermal, overpressure),
+        f"ImpactSimulator.simulate_batch[{batch_size}]": lambda: ImpactSimulator.simulate_batch(
+            size, density, velocity, water, lat, lng, angle),
+        "deflection.calculate_kinetic_impactor": lambda: calculate_kinetic_impactor(strategy),
+        "deflection.calculate_gravity_tractor": lambda: calculate_gravity_tractor(strategy),
+        "deflection.calculate_laser_ablation": lambda: calculate_laser_ablation(strategy),
+        "serialization.ImpactResults": lambda: ImpactResults(**_simulate_once()).model_dump_json(),
+        "serialization.ImpactResults.dump_only": result.model_dump_json,
+        "serialization.BatchImpactResults[1000].dump_only": batch_result.model_dump_json,
+    }
+    if get_coastline() is not None:
+        # Mid-Indian Ocean impact; the travel-time field is cached after the warm-up call
+        benchmarks["ImpactSimulator.calculate_coastal_inundation"] = \
+            lambda: ImpactSimulator.calculate_coastal_inundation(-30.0, 80.0, 67.0, 10000.0)
+    return benchmarks
+
+
+def run(selected: List[str] = None, runs: int = 30) -> Dict[str, Dict]:
+    """
+    Run the microbenchmarks.
+
+    Args:
+        selected: Substrings; only cases whose name contains one are run
+        runs: Timing runs per case
+
+    Returns:
+        Results keyed "micro.<case>"
+    """
+    results = {}
+    for name, fn in cases().items():
+        if selected and not any(s in name for s in selected):
+            continue
+        fn()  # warm up (lazy dataset loads, caches)
+        results[f"micro.{name}"] = measure(fn, runs)
+    return results
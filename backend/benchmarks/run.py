@@ -0,0 +1,161 @@
+"""
+Run the benchmark layers, save the results as JSON and compare them with
+a stored baseline.
+
+    python -m benchmarks.run                              # all layers
+    python -m benchmarks.run --layers micro --select batch
+    python -m benchmarks.run --layers startup             # cold start and per-worker memory
+    python -m benchmarks.run --save-baseline              # record a new baseline
+    python -m benchmarks.run --fail-on-regression         # exit 1 on regressions (CI)
+
+Baselines are machine specific: record one on the machine that will run
+the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+
+LAYERS = ("micro", "e2e", "load", "startup")
+
+# Relative change beyond which a result counts as a regression
+DEFAULT_THRESHOLD = 0.2
+
+
+def _metadata() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _headline(name: str, result: Dict):
+    """
+    The value compared against the baseline and whether higher is better.
+    """
+    if "requests_per_second" in result:
+        return result["requests_per_second"], True
+    return result["median"], False
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Benchmark results keyed by name
+        baseline: Baseline results keyed by name
+        threshold: Relative change beyond which a result is flagged
+
+    Returns:
+        One row per benchmark present in both, with the relative change
+        (positive = slower) and a status of "regression", "improvement" or "ok"
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        value, higher_is_better = _headline(name, result)
+        reference, _ = _headline(name, baseline[name])
+        if not reference:
+            continue
+        change = (reference - value) / reference if higher_is_better else (value - reference) / reference
+        status = "regression" if change > threshold else "improvement" if change < -threshold else "ok"
+        rows.append({"name": name, "baseline": reference, "current": value, "change": change, "status": status})
+    return rows
+
+
+def _format(name: str, result: Dict) -> str:
+    value, higher_is_better = _headline(name, result)
+    if higher_is_better:
+        return f"{value:10.1f} req/s  p50 {result['median'] * 1e3:8.2f} ms  p99 {result['p99'] * 1e3:8.2f} ms"
+    return f"{value * 1e6:12.2f} us  p99 {result['p99'] * 1e6:12.2f} us"
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the backend benchmarks")
+    parser.add_argument("--layers", default=",".join(LAYERS), help="Comma-separated layers to run")
+    parser.add_argument("--select", default="", help="Comma-separated substrings selecting micro/e2e cases")
+    parser.add_argument("--runs", type=int, default=30, help="Timing runs per microbenchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per end-to-end route")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients in the load scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds the load scenario runs")
+    parser.add_argument("--nasa-latency", type=float, default=0.0,
+                        help="Artificial stub NASA latency in the load scenario, in seconds")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Cold starts timed per startup case")
+    parser.add_argument("--workers", type=int, default=2, help="Server workers in the startup scenario")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative change flagged as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression")
+    args = parser.parse_args(argv)
+
+    layers = [layer for layer in args.layers.split(",") if layer]
+    unknown = set(layers) - set(LAYERS)
+    if unknown:
+        parser.error(f"Unknown layers: {', '.join(sorted(unknown))}")
+    selected = [s for s in args.select.split(",") if s] or None
+
+    results: Dict[str, Dict] = {}
+    if "micro" in layers:
+        from benchmarks import micro
+        results.update(micro.run(selected, args.runs))
+    if "e2e" in layers:
+        from benchmarks import e2e
+        results.update(e2e.run(selected, args.requests))
+    if "load" in layers:
+        from benchmarks import load
+        results.update(load.run(args.concurrency, args.duration, args.nasa_latency))
+    if "startup" in layers:
+        from benchmarks import startup
+        results.update(startup.run(args.startup_runs, args.workers))
+
+    for name, result in results.items():
+        print(f"{name:60s} {_format(name, result)}")
+
+    report = {"meta": _metadata(), "results": results}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline_meta"] = baseline.get("meta")
+        report["comparison"] = compare(results, baseline.get("results", {}), args.threshold)
+        for row in report["comparison"]:
+            if row["status"] != "ok":
+                print(f"{row['status'].upper():12s} {row['name']}: {row['change']:+.1%} vs baseline")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    regressions = [row for row in report.get("comparison", []) if row["status"] == "regression"]
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
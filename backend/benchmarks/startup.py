@@ -0,0 +1,141 @@
+"""
+Cold start benchmarks.
+
+- startup.import_app: a fresh interpreter importing the app
+- startup.ready: `python serve.py --workers N` until /ready first answers
+  200, with the resident memory of each worker shortly after
+
+Both run in subprocesses against the stub NASA API and a temporary data
+directory (see e2e.py), so nothing is cached in the benchmark process.
+"""
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.e2e import _environment, _free_port, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold starts timed per case
+DEFAULT_RUNS = 5
+
+# Seconds a launch may take before the benchmark gives up
+READY_TIMEOUT = 60
+
+# Seconds after the first ready response before worker memory is sampled
+READY_SETTLE = 2.0
+
+
+def _rss_mb(pid: int) -> Dict[str, float]:
+    """
+    Resident memory of a process in MB: private, shared with other processes
+    (forked copy-on-write pages, memory-mapped datasets) and proportional
+    (shared pages divided among the processes sharing them).
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                values[key] = int(rest.split()[0]) / 1024
+    return {
+        "private": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+        "shared": values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0),
+        "proportional": values.get("Pss", 0.0),
+    }
+
+
+def time_import(runs: int) -> Dict[str, float]:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, check=True)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def _workers(pid: int) -> List[int]:
+    """
+    PIDs of the worker processes of a server (its children; itself if it has none).
+    """
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; the parent PID follows it
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                command = f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        # multiprocessing's resource tracker is a child too, but not a worker
+        if parent == pid and b"resource_tracker" not in command:
+            children.append(int(entry))
+    return sorted(children) or [pid]
+
+
+def time_ready(runs: int, workers: int) -> Dict[str, float]:
+    """
+    Seconds from launch until /ready first answers 200, and the resident
+    memory of each worker READY_SETTLE seconds later.
+    """
+    latencies, memory = [], []
+    for _ in range(runs):
+        port = _free_port()
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1",
+             "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR
+        )
+        # One client for all polls: creating one per request costs enough CPU
+        # to slow down the server being measured
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+                while True:
+                    if time.perf_counter() - start > READY_TIMEOUT:
+                        raise RuntimeError("Server did not become ready in time")
+                    if process.poll() is not None:
+                        raise RuntimeError("Server exited during startup")
+                    try:
+                        if client.get("/ready").status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.005)
+            latencies.append(time.perf_counter() - start)
+            # Connections cannot be routed to a given worker, so the others
+            # are given time to finish loading before memory is sampled
+            time.sleep(READY_SETTLE)
+            memory.append([_rss_mb(pid) for pid in _workers(process.pid)])
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    result = summarize(latencies)
+    result["workers"] = workers
+    result["worker_rss_mb"] = memory[-1]
+    return result
+
+
+def run(runs: int = DEFAULT_RUNS, workers: int = 2) -> Dict[str, Dict[str, float]]:
+    """
+    Run the cold start benchmarks.
+
+    Args:
+        runs: Cold starts timed per case
+        workers: Server workers in the startup.ready case
+
+    Returns:
+        Results keyed by benchmark name
+    """
+    _environment()
+    return {
+        "startup.import_app": time_import(runs),
+        f"startup.ready_{workers}_workers": time_ready(runs, workers),
+    }
@@ -0,0 +1,144 @@
+"""
+Local stand-in for the NASA NeoWs API, so that end-to-end benchmarks are
+repeatable and never touch the real (rate limited) service.
+
+Responses are deterministic and shaped like NeoWs, with a configurable
+artificial latency per request and an optional hourly rate limit reported
+in X-RateLimit-* headers like the real service. Scripted error responses
+(e.g. 503s, or 429s with Retry-After) can be served first, for testing
+retries.
+"""
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+TOTAL_OBJECTS = 500
+
+
+def fake_neo(neo_id: int, approach_date: str = "2030-01-01") -> Dict:
+    """
+    A NeoWs-shaped object with orbital data and one close approach.
+    """
+    diameter = 0.05 + (neo_id % 97) / 50
+    return {
+        "id": str(neo_id),
+        "neo_reference_id": str(neo_id),
+        "name": f"({neo_id})",
+        "absolute_magnitude_h": 18 + (neo_id % 10) / 2,
+        "estimated_diameter": {
+            "kilometers": {"estimated_diameter_min": diameter / 2, "estimated_diameter_max": diameter},
+        },
+        "is_potentially_hazardous_asteroid": neo_id % 7 == 0,
+        "is_sentry_object": False,
+        "close_approach_data": [{
+            "close_approach_date": approach_date,
+            "epoch_date_close_approach": 1893456000000,
+            "relative_velocity": {"kilometers_per_second": str(5 + neo_id % 20)},
+            "miss_distance": {"kilometers": str(1e6 + neo_id * 1000)},
+            "orbiting_body": "Earth",
+        }],
+        "orbital_data": {
+            "semi_major_axis": str(1 + (neo_id % 50) / 50),
+            "eccentricity": str((neo_id % 80) / 100),
+            "inclination": str(neo_id % 30),
+            "perihelion_argument": str(neo_id % 360),
+            "ascending_node_longitude": str((neo_id * 7) % 360),
+            "mean_anomaly": str((neo_id * 13) % 360),
+            "epoch_osculation": "2460000.5",
+            "orbit_class": {"orbit_class_type": "APO"},
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    rate_limit = None  # requests allowed per server lifetime (None = unlimited)
+    faults: List[Tuple[int, Dict[str, str]]] = []  # (status, headers) served first, in order
+    requests = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(self.latency)
+        with self.lock:
+            type(self).requests += 1
+            remaining = None if self.rate_limit is None else self.rate_limit - self.requests
+            fault = self.faults.pop(0) if self.faults else None
+        if fault is not None:
+            status, headers = fault
+            return self._send(status, {"error": "scripted fault"}, headers=headers)
+        if remaining is not None and remaining < 0:
+            return self._send(429, {"error": "rate limit exceeded"}, 0)
+
+        if url.path == "/feed":
+            start = date.fromisoformat(query["start_date"][0])
+            end = date.fromisoformat(query.get("end_date", query["start_date"])[0])
+            objects = {}
+            day = start
+            while day <= end:
+                base = day.toordinal() % 1000 * 10
+                objects[day.isoformat()] = [fake_neo(base + k, day.isoformat()) for k in range(5)]
+                day += timedelta(days=1)
+            body = {"links": {}, "element_count": sum(map(len, objects.values())), "near_earth_objects": objects}
+        elif url.path == "/neo/browse":
+            page, size = int(query.get("page", ["0"])[0]), int(query.get("size", ["20"])[0])
+            ids = range(page * size, min((page + 1) * size, TOTAL_OBJECTS))
+            body = {
+                "page": {"size": size, "number": page, "total_elements": TOTAL_OBJECTS,
+                         "total_pages": (TOTAL_OBJECTS + size - 1) // size},
+                "near_earth_objects": [fake_neo(2000000 + k) for k in ids],
+            }
+        elif url.path.startswith("/neo/"):
+            neo_id = url.path.rsplit("/", 1)[-1]
+            if not neo_id.isdigit():
+                return self._send(404, {"error": "not found"})
+            body = fake_neo(int(neo_id))
+        elif url.path == "/stats":
+            body = {"near_earth_object_count": TOTAL_OBJECTS, "close_approach_count": TOTAL_OBJECTS * 10}
+        else:
+            return self._send(404, {"error": "not found"})
+        self._send(200, body, remaining)
+
+    def _send(self, status: int, body: Dict, remaining: Optional[int] = None,
+              headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.rate_limit is not None and remaining is not None:
+            self.send_header("X-RateLimit-Limit", str(self.rate_limit))
+            self.send_header("X-RateLimit-Remaining", str(max(remaining, 0)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_stub(port: int = 0, latency: float = 0.0, rate_limit: Optional[int] = None,
+               faults: Optional[List[Tuple[int, Dict[str, str]]]] = None) -> ThreadingHTTPServer:
+    """
+    Serve the stub API on a background thread.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 = any free port)
+        latency: Artificial delay per request in seconds
+        rate_limit: Requests served before every response is a 429
+        faults: (status, headers) responses served before any normal one
+
+    Returns:
+        The running server (its address is server.server_address, and
+        server.RequestHandlerClass.requests counts the requests received)
+    """
+    handler = type("Handler", (StubHandler,), {"latency": latency, "rate_limit": rate_limit,
+                                               "faults": list(faults or []), "requests": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
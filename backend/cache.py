@@ -0,0 +1,236 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from nasa_client import BACKGROUND, request_priority
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "NEO_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "neo_cache.sqlite3")
+)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fresh_until: float  # epoch seconds after which the entry is stale
+    stale_until: float  # epoch seconds after which the entry is unusable
+
+
+class TieredCache:
+    """
+    Two-tier cache for JSON-serializable upstream responses.
+    
+    - Tier 1: in-process LRU (an OrderedDict) for sub-millisecond hits
+    - Tier 2: SQLite file that survives restarts and is shared by workers
+    
+    Entries are fresh for `ttl` seconds and may then be served stale for
+    another `stale_ttl` seconds while a background task refreshes them.
+    """
+    
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.metrics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+        
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "fresh_until REAL NOT NULL, stale_until REAL NOT NULL)"
+            )
+    
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry in memory, then on disk (promoting disk hits).
+        
+        Returns:
+            The entry (fresh or stale), or None if absent or expired
+        """
+        return self.lookup(key)[0]
+    
+    def lookup(self, key: str) -> Tuple[Optional[CacheEntry], str]:
+        """
+        Look up an entry and report which tier ("memory" or "disk") served it.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.stale_until > now:
+                    self._memory.move_to_end(key)
+                    return entry, "memory"
+                del self._memory[key]
+            
+            if self._db is None:
+                return None, "memory"
+            row = self._db.execute(
+                "SELECT value, fresh_until, stale_until FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now:
+                return None, "disk"
+            entry = CacheEntry(json.loads(row[0]), row[1], row[2])
+            self._remember(key, entry)
+            return entry, "disk"
+    
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        """
+        Store a value in both tiers.
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            ttl: Seconds the value is fresh
+            stale_ttl: Extra seconds the value may be served while refreshing
+        """
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + stale_ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, fresh_until, stale_until) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), entry.fresh_until, entry.stale_until)
+                )
+    
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0
+    ) -> Any:
+        """
+        Return a cached value, fetching or revalidating it as needed.
+        
+        Fresh entries are returned directly. Stale entries are returned
+        immediately while `fetch` refreshes them in the background. Misses
+        await `fetch` and store the result.
+        """
+        entry, tier = self.lookup(key)
+        if entry is not None:
+            if entry.fresh_until > time.time():
+                self.metrics[f"{tier}_hits"] += 1
+            else:
+                self.metrics["stale_hits"] += 1
+                self._refresh_in_background(key, fetch, ttl, stale_ttl)
+            return entry.value
+        
+        self.metrics["misses"] += 1
+        value = await fetch()
+        self.set(key, value, ttl, stale_ttl)
+        return value
+    
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float):
+        """
+        Refresh one key in the background; errors keep the stale entry.
+        """
+        async def refresh():
+            value = await fetch()
+            self.set(key, value, ttl, stale_ttl)
+        
+        self.run_in_background(key, refresh)
+    
+    def run_in_background(self, task_key: str, refresh: Callable[[], Awaitable[None]]):
+        """
+        Run a refresh coroutine unless one with the same key is in flight.
+        
+        Counts successes and failures in the refresh metrics.
+        """
+        if task_key in self._refreshing:
+            return
+        
+        async def run():
+            # Upstream calls made by the refresh yield to interactive requests
+            request_priority.set(BACKGROUND)
+            try:
+                await refresh()
+                self.metrics["refreshes"] += 1
+            except Exception:
+                self.metrics["refresh_errors"] += 1
+            finally:
+                self._refreshing.pop(task_key, None)
+        
+        task = asyncio.ensure_future(run())
+        self._refreshing[task_key] = task
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    def _remember(self, key: str, entry: CacheEntry):
+        """
+        Insert into the memory tier, evicting least recently used entries.
+        """
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and tier sizes.
+        """
+        hits = self.metrics["memory_hits"] + self.metrics["disk_hits"] + self.metrics["stale_hits"]
+        lookups = hits + self.metrics["misses"]
+        with self._lock:
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0] if self._db else 0
+            memory_entries = len(self._memory)
+        return {
+            **self.metrics,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+        }
+    
+    def close(self):
+        """
+        Cancel background refreshes and close the disk tier.
+        """
+        for task in list(self._background):
+            task.cancel()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_cache: Optional[TieredCache] = None
+
+
+def get_cache() -> TieredCache:
+    """
+    Return the process-wide NEO response cache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        _cache = TieredCache()
+    return _cache
+
+
+def close_cache():
+    """
+    Close the process-wide cache (called on application shutdown).
+    """
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -0,0 +1,777 @@
+"""
+Local NEO catalog backed by SQLAlchemy (SQLite by default).
+
+Ingest walks NASA's /neo/browse pages and stores every object with its
+orbital elements, diameter estimates, hazard flag and close approaches.
+Queries are served from indexed columns with keyset pagination.
+
+Usage:
+    python catalog.py ingest [--start-page N] [--max-pages N]
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sqlalchemy import (Boolean, Column, Date, Float, ForeignKey, Index, Integer, String, Text,
+                        and_, create_engine, delete, exists, func, insert, or_, select)
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from nasa_client import BACKGROUND, get_client, close_client
+
+DEFAULT_CATALOG_URL = os.getenv(
+    "NEO_CATALOG_URL",
+    "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "neo_catalog.sqlite3")
+)
+
+# NASA's /neo/browse returns at most 20 objects per page
+INGEST_PAGE_SIZE = 20
+
+Base = declarative_base()
+
+
+class NeoObject(Base):
+    __tablename__ = "neo_objects"
+    
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)
+    designation = Column(String)
+    absolute_magnitude = Column(Float)
+    diameter_min_km = Column(Float)
+    diameter_max_km = Column(Float)
+    is_hazardous = Column(Boolean, nullable=False, default=False)
+    is_sentry_object = Column(Boolean, nullable=False, default=False)
+    
+    # Osculating orbital elements (same units as OrbitalData)
+    a = Column(Float)  # semi-major axis (AU)
+    e = Column(Float)  # eccentricity
+    i = Column(Float)  # inclination (degrees)
+    # SQLite column names are case-insensitive, so omega/Omega need distinct names
+    omega = Column("perihelion_argument", Float)  # argument of periapsis (degrees)
+    Omega = Column("ascending_node_longitude", Float)  # longitude of ascending node (degrees)
+    M = Column(Float)  # mean anomaly (degrees)
+    epoch_jd = Column(Float)  # osculation epoch (Julian date)
+    orbit_class = Column(String)
+    
+    data = Column(Text, nullable=False)  # raw NASA JSON
+    data_hash = Column(String, nullable=False)
+    updated_at = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_neo_diameter", "diameter_max_km", "id"),
+        Index("ix_neo_hazardous_diameter", "is_hazardous", "diameter_max_km", "id"),
+    )
+
+
+class CloseApproach(Base):
+    __tablename__ = "close_approaches"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    neo_id = Column(String, ForeignKey("neo_objects.id", ondelete="CASCADE"), nullable=False)
+    approach_date = Column(Date, nullable=False)
+    epoch_ms = Column(Float)
+    miss_distance_km = Column(Float, nullable=False)
+    relative_velocity_kms = Column(Float)
+    orbiting_body = Column(String)
+    
+    __table_args__ = (
+        Index("ix_approach_neo", "neo_id"),
+        Index("ix_approach_date", "approach_date", "miss_distance_km", "id"),
+        Index("ix_approach_miss", "miss_distance_km", "id"),
+    )
+
+
+class NeoMoid(Base):
+    __tablename__ = "neo_moid"
+    
+    neo_id = Column(String, ForeignKey("neo_objects.id", ondelete="CASCADE"), primary_key=True)
+    moid_au = Column(Float, nullable=False)  # minimum orbit intersection distance to Earth
+    moid_km = Column(Float, nullable=False)
+    elements_hash = Column(String, nullable=False)  # hash of (a, e, i, omega, Omega) used
+    computed_at = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_moid", "moid_au", "neo_id"),
+    )
+
+
+class NeoRisk(Base):
+    __tablename__ = "neo_risk"
+    
+    neo_id = Column(String, ForeignKey("neo_objects.id", ondelete="CASCADE"), primary_key=True)
+    # Inputs the envelope was computed from
+    diameter_min_m = Column(Float, nullable=False)
+    diameter_max_m = Column(Float, nullable=False)
+    velocity_min_kms = Column(Float, nullable=False)  # impact velocity at atmospheric entry
+    velocity_max_kms = Column(Float, nullable=False)
+    density = Column(Float, nullable=False)
+    # Worst-case effects envelope over the scenario grid (see risk.py)
+    energy_mt_min = Column(Float, nullable=False)
+    energy_mt_max = Column(Float, nullable=False)
+    ground_energy_mt_max = Column(Float, nullable=False)
+    crater_diameter_max = Column(Float, nullable=False)  # meters
+    seismic_magnitude_max = Column(Float, nullable=False)
+    fireball_radius_max = Column(Float, nullable=False)  # km
+    thermal_radiation_max = Column(Float, nullable=False)  # km
+    overpressure_max = Column(Float, nullable=False)  # km
+    casualties_max = Column(Integer, nullable=False)
+    affected_population_max = Column(Integer, nullable=False)
+    inputs_hash = Column(String, nullable=False)  # hash of the inputs, model version and entry table used
+    computed_at = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_risk_casualties", "casualties_max", "neo_id"),
+        Index("ix_risk_energy", "energy_mt_max", "neo_id"),
+    )
+
+
+class CatalogState(Base):
+    __tablename__ = "catalog_state"
+    
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=False)  # JSON
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_neo(raw: Dict) -> Tuple[Dict, List[Dict]]:
+    """
+    Flatten one NASA NEO record into catalog columns.
+    
+    Args:
+        raw: NEO object as returned by /neo/browse or /neo/{id}
+        
+    Returns:
+        Tuple of (neo_objects row, list of close_approaches rows)
+    """
+    diameter = raw.get("estimated_diameter", {}).get("kilometers", {})
+    orbit = raw.get("orbital_data") or {}
+    data = json.dumps(raw, sort_keys=True)
+    
+    row = {
+        "id": str(raw["id"]),
+        "name": raw.get("name", ""),
+        "designation": raw.get("designation"),
+        "absolute_magnitude": _float(raw.get("absolute_magnitude_h")),
+        "diameter_min_km": _float(diameter.get("estimated_diameter_min")),
+        "diameter_max_km": _float(diameter.get("estimated_diameter_max")),
+        "is_hazardous": bool(raw.get("is_potentially_hazardous_asteroid", False)),
+        "is_sentry_object": bool(raw.get("is_sentry_object", False)),
+        "a": _float(orbit.get("semi_major_axis")),
+        "e": _float(orbit.get("eccentricity")),
+        "i": _float(orbit.get("inclination")),
+        "omega": _float(orbit.get("perihelion_argument")),
+        "Omega": _float(orbit.get("ascending_node_longitude")),
+        "M": _float(orbit.get("mean_anomaly")),
+        "epoch_jd": _float(orbit.get("epoch_osculation")),
+        "orbit_class": (orbit.get("orbit_class") or {}).get("orbit_class_type"),
+        "data": data,
+        "data_hash": hashlib.sha1(data.encode()).hexdigest(),
+        "updated_at": time.time(),
+    }
+    
+    approaches = []
+    for approach in raw.get("close_approach_data", []):
+        miss = _float(approach.get("miss_distance", {}).get("kilometers"))
+        try:
+            approach_date = date.fromisoformat(approach["close_approach_date"])
+        except (KeyError, ValueError):
+            continue
+        if miss is None:
+            continue
+        approaches.append({
+            "neo_id": row["id"],
+            "approach_date": approach_date,
+            "epoch_ms": _float(approach.get("epoch_date_close_approach")),
+            "miss_distance_km": miss,
+            "relative_velocity_kms": _float(approach.get("relative_velocity", {}).get("kilometers_per_second")),
+            "orbiting_body": approach.get("orbiting_body"),
+        })
+    return row, approaches
+
+
+def encode_cursor(value: Any, row_id: Any) -> str:
+    """
+    Encode a keyset position (sort value, tie-breaking id) as an opaque token.
+    """
+    if isinstance(value, date):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+
+# Leaderboard orderings (always most dangerous first)
+RISK_ORDERS = {
+    "casualties": NeoRisk.casualties_max,
+    "energy": NeoRisk.energy_mt_max,
+}
+
+
+class NeoCatalog:
+    """
+    Indexed local store of Near-Earth Objects.
+    """
+    
+    def __init__(self, url: str = DEFAULT_CATALOG_URL):
+        if url.startswith("sqlite:///"):
+            os.makedirs(os.path.dirname(url[len("sqlite:///"):]) or ".", exist_ok=True)
+        self.engine = create_engine(url)
+        self.Session = sessionmaker(self.engine, expire_on_commit=False)
+        Base.metadata.create_all(self.engine)
+        self._ingest: Optional[Dict] = None
+    
+    def upsert(self, records: List[Dict]) -> int:
+        """
+        Insert or update NEO records, skipping unchanged ones.
+        
+        Args:
+            records: Raw NASA NEO objects
+            
+        Returns:
+            Number of objects inserted or changed
+        """
+        parsed = [parse_neo(raw) for raw in records]
+        if not parsed:
+            return 0
+        
+        with self.Session.begin() as session:
+            ids = [row["id"] for row, _ in parsed]
+            hashes = dict(session.execute(
+                select(NeoObject.id, NeoObject.data_hash).where(NeoObject.id.in_(ids))
+            ).all())
+            changed = [(row, approaches) for row, approaches in parsed
+                       if hashes.get(row["id"]) != row["data_hash"]]
+            if not changed:
+                return 0
+            
+            changed_ids = [row["id"] for row, _ in changed]
+            session.execute(delete(CloseApproach).where(CloseApproach.neo_id.in_(changed_ids)))
+            session.execute(delete(NeoObject).where(NeoObject.id.in_(changed_ids)))
+            session.execute(insert(NeoObject), [row for row, _ in changed])
+            approaches = [approach for _, rows in changed for approach in rows]
+            if approaches:
+                session.execute(insert(CloseApproach), approaches)
+        return len(changed)
+    
+    def count(self) -> int:
+        with self.Session() as session:
+            return session.execute(select(func.count()).select_from(NeoObject)).scalar_one()
+    
+    def mark_ingested(self) -> Dict:
+        """
+        Record that an ingest has stored every browse page.
+        
+        Returns:
+            Dict with completed_at and the number of objects in the catalog
+        """
+        state = {"completed_at": time.time(), "objects": self.count()}
+        with self.Session.begin() as session:
+            session.execute(delete(CatalogState).where(CatalogState.key == "ingest"))
+            session.execute(insert(CatalogState), [{"key": "ingest", "value": json.dumps(state)}])
+        self._ingest = state
+        return state
+    
+    def ingest_state(self) -> Optional[Dict]:
+        """
+        The state recorded by the last completed ingest, or None if no ingest
+        has completed (the catalog may be empty or partial).
+        
+        Kept in memory once found, so serving from the catalog costs no
+        query per request. A later ingest in another process updates the
+        object count after a restart.
+        """
+        if self._ingest is None:
+            with self.Session() as session:
+                value = session.execute(
+                    select(CatalogState.value).where(CatalogState.key == "ingest")
+                ).scalar_one_or_none()
+            if value is not None:
+                self._ingest = json.loads(value)
+        return self._ingest
+    
+    def get(self, neo_id: str) -> Optional[Dict]:
+        """
+        Return the raw NASA record for one NEO, or None.
+        """
+        with self.Session() as session:
+            data = session.execute(select(NeoObject.data).where(NeoObject.id == neo_id)).scalar_one_or_none()
+        return json.loads(data) if data is not None else None
+    
+    def get_many(self, neo_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Return the raw NASA records for several NEOs in one query.
+        
+        Returns:
+            Dict mapping each ID found in the catalog to its record
+        """
+        if not neo_ids:
+            return {}
+        with self.Session() as session:
+            rows = session.execute(
+                select(NeoObject.id, NeoObject.data).where(NeoObject.id.in_(neo_ids))
+            ).all()
+        return {neo_id: json.loads(data) for neo_id, data in rows}
+    
+    def orbital_elements(self, ids: Optional[List[str]] = None, hazardous: Optional[bool] = None,
+                         limit: Optional[int] = None, bound_only: bool = False) -> Dict[str, Any]:
+        """
+        Orbital elements as NumPy columns, ordered by ID.
+        
+        Objects without a complete element set are skipped.
+        
+        Args:
+            ids: Restrict to these IDs
+            hazardous: Filter on the hazard flag
+            limit: Maximum number of objects
+            bound_only: Skip objects not on a bound elliptical orbit
+                (0 <= e < 1, a > 0), for which the elliptical formulas give NaN
+            
+        Returns:
+            Dict with "id" (list) and (n,) arrays a, e, i, omega, Omega, M, epoch
+        """
+        columns = [NeoObject.id, NeoObject.a, NeoObject.e, NeoObject.i,
+                   NeoObject.omega, NeoObject.Omega, NeoObject.M, NeoObject.epoch_jd]
+        query = select(*columns).where(and_(*(column.isnot(None) for column in columns[1:])))
+        if ids is not None:
+            query = query.where(NeoObject.id.in_(ids))
+        if hazardous is not None:
+            query = query.where(NeoObject.is_hazardous == hazardous)
+        if bound_only:
+            query = query.where(NeoObject.e >= 0, NeoObject.e < 1, NeoObject.a > 0)
+        query = query.order_by(NeoObject.id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        with self.Session() as session:
+            rows = session.execute(query).all()
+        
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), 7)
+        elements = {key: values[:, k] for k, key in enumerate(("a", "e", "i", "omega", "Omega", "M", "epoch"))}
+        elements["id"] = [row[0] for row in rows]
+        return elements
+    
+    def moid_hashes(self) -> Dict[str, str]:
+        """
+        Elements hash of every stored MOID result, keyed by NEO ID.
+        """
+        with self.Session() as session:
+            return dict(session.execute(select(NeoMoid.neo_id, NeoMoid.elements_hash)).all())
+    
+    def store_moids(self, rows: List[Dict]) -> None:
+        """
+        Replace the MOID results for the given objects.
+        
+        Args:
+            rows: Dicts with neo_id, moid_au, moid_km, elements_hash, computed_at
+        """
+        if not rows:
+            return
+        with self.Session.begin() as session:
+            session.execute(delete(NeoMoid).where(NeoMoid.neo_id.in_([row["neo_id"] for row in rows])))
+            session.execute(insert(NeoMoid), rows)
+    
+    def risk_inputs(self) -> Dict[str, Any]:
+        """
+        Diameter range and Earth close-approach velocity range per NEO, ordered by ID.
+        
+        Objects without a diameter estimate or an Earth close approach with
+        a known velocity are skipped.
+        
+        Returns:
+            Dict with "id" (list) and (n,) arrays diameter_min_km,
+            diameter_max_km, velocity_min_kms and velocity_max_kms
+        """
+        velocity = CloseApproach.relative_velocity_kms
+        query = (
+            select(NeoObject.id, NeoObject.diameter_min_km, NeoObject.diameter_max_km,
+                   func.min(velocity), func.max(velocity))
+            .join(CloseApproach, CloseApproach.neo_id == NeoObject.id)
+            .where(CloseApproach.orbiting_body == "Earth", velocity.isnot(None),
+                   NeoObject.diameter_min_km.isnot(None), NeoObject.diameter_max_km.isnot(None))
+            .group_by(NeoObject.id)
+            .order_by(NeoObject.id)
+        )
+        with self.Session() as session:
+            rows = session.execute(query).all()
+        
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), 4)
+        inputs = {key: values[:, k] for k, key in enumerate(
+            ("diameter_min_km", "diameter_max_km", "velocity_min_kms", "velocity_max_kms"))}
+        inputs["id"] = [row[0] for row in rows]
+        return inputs
+    
+    def risk_hashes(self) -> Dict[str, str]:
+        """
+        Inputs hash of every stored risk envelope, keyed by NEO ID.
+        """
+        with self.Session() as session:
+            return dict(session.execute(select(NeoRisk.neo_id, NeoRisk.inputs_hash)).all())
+    
+    def store_risks(self, rows: List[Dict]) -> None:
+        """
+        Replace the risk envelopes for the given objects.
+        
+        Args:
+            rows: Dicts with the NeoRisk columns
+        """
+        if not rows:
+            return
+        with self.Session.begin() as session:
+            session.execute(delete(NeoRisk).where(NeoRisk.neo_id.in_([row["neo_id"] for row in rows])))
+            session.execute(insert(NeoRisk), rows)
+    
+    def risk_ranking(
+        self,
+        order_by: str = "casualties",
+        hazardous: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """
+        NEOs ordered by their precomputed worst-case impact effects, most
+        dangerous first.
+        
+        Args:
+            order_by: "casualties" or "energy" (see RISK_ORDERS)
+            
+        Returns:
+            Dict with "items" (summary rows with a "risk" envelope) and "next_cursor"
+        """
+        if order_by not in RISK_ORDERS:
+            raise ValueError(f"order_by must be one of: {', '.join(RISK_ORDERS)}")
+        query = select(NeoObject, NeoRisk).join(NeoRisk, NeoRisk.neo_id == NeoObject.id)
+        if hazardous is not None:
+            query = query.where(NeoObject.is_hazardous == hazardous)
+        
+        column, neo_id = RISK_ORDERS[order_by], NeoRisk.neo_id
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            query = query.where(or_(column < value, and_(column == value, neo_id < row_id)))
+        query = query.order_by(column.desc(), neo_id.desc())
+        
+        with self.Session() as session:
+            rows = session.execute(query.limit(limit + 1)).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][1]
+            next_cursor = encode_cursor(getattr(last, column.key), last.neo_id)
+        items = [{**_summary(neo), "risk": _risk(result)} for neo, result in rows]
+        return {"items": items, "next_cursor": next_cursor}
+    
+    def moid_ranking(
+        self,
+        max_moid_au: Optional[float] = None,
+        hazardous: Optional[bool] = None,
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """
+        NEOs ordered by their screened MOID against Earth.
+        
+        Returns:
+            Dict with "items" (summary rows with moid_au/moid_km) and "next_cursor"
+        """
+        query = select(NeoObject, NeoMoid).join(NeoMoid, NeoMoid.neo_id == NeoObject.id)
+        if max_moid_au is not None:
+            query = query.where(NeoMoid.moid_au <= max_moid_au)
+        if hazardous is not None:
+            query = query.where(NeoObject.is_hazardous == hazardous)
+        
+        moid, neo_id = NeoMoid.moid_au, NeoMoid.neo_id
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            if descending:
+                query = query.where(or_(moid < value, and_(moid == value, neo_id < row_id)))
+            else:
+                query = query.where(or_(moid > value, and_(moid == value, neo_id > row_id)))
+        if descending:
+            query = query.order_by(moid.desc(), neo_id.desc())
+        else:
+            query = query.order_by(moid, neo_id)
+        
+        with self.Session() as session:
+            rows = session.execute(query.limit(limit + 1)).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][1]
+            next_cursor = encode_cursor(last.moid_au, last.neo_id)
+        items = [
+            {**_summary(neo), "moid_au": result.moid_au, "moid_km": result.moid_km,
+             "moid_computed_at": result.computed_at}
+            for neo, result in rows
+        ]
+        return {"items": items, "next_cursor": next_cursor}
+    
+    def browse(self, page: int, size: int) -> Dict:
+        """
+        Return one page in the shape of NASA's /neo/browse response.
+        
+        The total is the object count recorded by the last completed ingest.
+        """
+        state = self.ingest_state()
+        total = state["objects"] if state is not None else self.count()
+        with self.Session() as session:
+            rows = session.execute(
+                select(NeoObject.data).order_by(NeoObject.id).offset(page * size).limit(size)
+            ).scalars().all()
+        return {
+            "links": {
+                "self": f"/api/asteroids/neo/browse?page={page}&size={size}",
+                "next": f"/api/asteroids/neo/browse?page={page + 1}&size={size}",
+            },
+            "page": {
+                "size": size,
+                "total_elements": total,
+                "total_pages": (total + size - 1) // size,
+                "number": page,
+            },
+            "near_earth_objects": [json.loads(data) for data in rows],
+        }
+    
+    def search(
+        self,
+        min_diameter_km: Optional[float] = None,
+        max_diameter_km: Optional[float] = None,
+        hazardous: Optional[bool] = None,
+        approach_start: Optional[date] = None,
+        approach_end: Optional[date] = None,
+        max_miss_distance_km: Optional[float] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """
+        Filter NEOs, ordered by descending maximum diameter.
+        
+        Close-approach filters keep objects with at least one approach that
+        matches all of them. Pass `next_cursor` from the previous page as
+        `cursor` to continue.
+        
+        Returns:
+            Dict with "items" (summary rows) and "next_cursor"
+        """
+        query = select(NeoObject).where(NeoObject.diameter_max_km.isnot(None))
+        if min_diameter_km is not None:
+            query = query.where(NeoObject.diameter_max_km >= min_diameter_km)
+        if max_diameter_km is not None:
+            query = query.where(NeoObject.diameter_max_km <= max_diameter_km)
+        if hazardous is not None:
+            query = query.where(NeoObject.is_hazardous == hazardous)
+        
+        approach_filters = _approach_filters(approach_start, approach_end, max_miss_distance_km)
+        if approach_filters:
+            query = query.where(exists().where(and_(CloseApproach.neo_id == NeoObject.id, *approach_filters)))
+        
+        # Keyset on (diameter, id), both descending so the index is scanned in order
+        diameter = NeoObject.diameter_max_km
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            query = query.where(or_(diameter < value, and_(diameter == value, NeoObject.id < row_id)))
+        query = query.order_by(diameter.desc(), NeoObject.id.desc()).limit(limit + 1)
+        
+        with self.Session() as session:
+            rows = session.execute(query).scalars().all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last.diameter_max_km, last.id)
+        return {"items": [_summary(row) for row in rows], "next_cursor": next_cursor}
+    
+    def close_approaches(
+        self,
+        approach_start: Optional[date] = None,
+        approach_end: Optional[date] = None,
+        max_miss_distance_km: Optional[float] = None,
+        hazardous: Optional[bool] = None,
+        min_diameter_km: Optional[float] = None,
+        order_by: str = "date",
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict:
+        """
+        List close approaches ordered by date or by miss distance.
+        
+        Returns:
+            Dict with "items" (approach rows with NEO summaries) and "next_cursor"
+        """
+        if order_by not in ("date", "miss_distance"):
+            raise ValueError("order_by must be 'date' or 'miss_distance'")
+        sort_column = CloseApproach.approach_date if order_by == "date" else CloseApproach.miss_distance_km
+        
+        query = select(CloseApproach, NeoObject).join(NeoObject, NeoObject.id == CloseApproach.neo_id)
+        for condition in _approach_filters(approach_start, approach_end, max_miss_distance_km):
+            query = query.where(condition)
+        if hazardous is not None:
+            query = query.where(NeoObject.is_hazardous == hazardous)
+        if min_diameter_km is not None:
+            query = query.where(NeoObject.diameter_max_km >= min_diameter_km)
+        
+        if cursor:
+            value, row_id = decode_cursor(cursor)
+            if order_by == "date":
+                value = date.fromisoformat(value)
+            query = query.where(or_(sort_column > value, and_(sort_column == value, CloseApproach.id > row_id)))
+        query = query.order_by(sort_column, CloseApproach.id).limit(limit + 1)
+        
+        with self.Session() as session:
+            rows = session.execute(query).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(
+                last.approach_date if order_by == "date" else last.miss_distance_km, last.id
+            )
+        items = [
+            {
+                "close_approach_date": approach.approach_date.isoformat(),
+                "epoch_date_close_approach": approach.epoch_ms,
+                "miss_distance_km": approach.miss_distance_km,
+                "relative_velocity_kms": approach.relative_velocity_kms,
+                "orbiting_body": approach.orbiting_body,
+                "neo": _summary(neo),
+            }
+            for approach, neo in rows
+        ]
+        return {"items": items, "next_cursor": next_cursor}
+
+
+def _approach_filters(approach_start, approach_end, max_miss_distance_km) -> list:
+    filters = []
+    if approach_start is not None:
+        filters.append(CloseApproach.approach_date >= approach_start)
+    if approach_end is not None:
+        filters.append(CloseApproach.approach_date <= approach_end)
+    if max_miss_distance_km is not None:
+        filters.append(CloseApproach.miss_distance_km <= max_miss_distance_km)
+    return filters
+
+
+def _summary(row: NeoObject) -> Dict:
+    """
+    Compact representation of a catalog row for search results.
+    """
+    return {
+        "id": row.id,
+        "name": row.name,
+        "absolute_magnitude_h": row.absolute_magnitude,
+        "estimated_diameter_km": {"min": row.diameter_min_km, "max": row.diameter_max_km},
+        "is_potentially_hazardous_asteroid": row.is_hazardous,
+        "is_sentry_object": row.is_sentry_object,
+        "orbital_data": {
+            "a": row.a, "e": row.e, "i": row.i,
+            "omega": row.omega, "Omega": row.Omega, "M": row.M,
+            "epoch_jd": row.epoch_jd, "orbit_class": row.orbit_class,
+        },
+    }
+
+
+def _risk(row: NeoRisk) -> Dict:
+    """
+    Risk envelope columns of a NeoRisk row.
+    """
+    return {column.key: getattr(row, column.key) for column in NeoRisk.__table__.columns
+            if column.key not in ("neo_id", "inputs_hash")}
+
+
+async def ingest_catalog(
+    catalog: "NeoCatalog",
+    start_page: int = 0,
+    max_pages: Optional[int] = None,
+    page_size: int = INGEST_PAGE_SIZE
+) -> Dict[str, int]:
+    """
+    Walk NASA's /neo/browse pages and upsert every object into the catalog.
+    
+    The ingest is recorded as complete (see NeoCatalog.ingest_state) once
+    the last page is stored; until then the catalog is not served in place
+    of /neo/browse.
+    
+    Args:
+        catalog: Target catalog
+        start_page: First browse page (to resume an interrupted ingest)
+        max_pages: Stop after this many pages (None = all)
+        page_size: Objects per browse page
+        
+    Returns:
+        Dict with pages read, objects seen and objects changed
+    """
+    client = get_client()
+    page = start_page
+    stats = {"pages": 0, "objects": 0, "changed": 0}
+    while True:
+        data = await client.get("/neo/browse", {"page": page, "size": page_size}, priority=BACKGROUND)
+        records = data.get("near_earth_objects", [])
+        stats["changed"] += await asyncio.to_thread(catalog.upsert, records)
+        stats["objects"] += len(records)
+        stats["pages"] += 1
+        page += 1
+        
+        total_pages = data.get("page", {}).get("total_pages", 0)
+        if not records or page >= total_pages:
+            await asyncio.to_thread(catalog.mark_ingested)
+            return stats
+        if max_pages is not None and stats["pages"] >= max_pages:
+            return stats
+
+
+_catalog: Optional[NeoCatalog] = None
+
+
+def get_catalog() -> NeoCatalog:
+    """
+    Return the process-wide catalog, creating it on first use.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = NeoCatalog()
+    return _catalog
+
+
+async def _main(args):
+    try:
+        stats = await ingest_catalog(get_catalog(), args.start_page, args.max_pages)
+        print(f"Ingested {stats['objects']} objects from {stats['pages']} pages ({stats['changed']} changed)")
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the local NEO catalog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest all NEOs from NASA's browse API")
+    ingest_parser.add_argument("--start-page", type=int, default=0)
+    ingest_parser.add_argument("--max-pages", type=int, default=None)
+    asyncio.run(_main(parser.parse_args()))
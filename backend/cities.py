@@ -0,0 +1,309 @@
+"""
+Spherical spatial index of populated places for per-city impact breakdowns.
+
+Cities are stored as unit vectors in a scipy cKDTree. A great-circle radius
+r maps to the chord length 2 * sin(r / 2R), so radius queries are exact on
+the sphere.
+
+The bundled fallback covers the largest metro areas. Build the full dataset
+(~50k places) from a GeoNames dump (for example cities5000.txt):
+
+    python cities.py build cities5000.txt [--output PATH]
+"""
+import argparse
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from datasets import load_arrays
+
+EARTH_RADIUS = 6371  # km
+
+DEFAULT_CITIES_PATH = os.getenv(
+    "CITIES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.npz")
+)
+
+# Casualty rate for a city inside each zone; a city takes the highest rate
+# of the zones that reach it (fireball/overpressure/thermal as in population_grid)
+ZONE_CASUALTY_RATES = {
+    "fireball": 0.9,
+    "overpressure": 0.5,
+    "thermal": 0.25,
+    "tsunami": 0.1,
+    "seismic": 0.01,
+}
+
+# (scenario, city) pairs city_casualties_batch evaluates at once (~150 bytes
+# each), so its memory stays bounded however many cities the radii reach
+MAX_CITY_PAIRS = 1 << 19
+
+# Largest metro areas (same table as lib/population-service.ts)
+DEFAULT_CITIES = [
+    ("Tokyo", "JP", 35.6762, 139.6503, 37400000),
+    ("Delhi", "IN", 28.7041, 77.1025, 30300000),
+    ("Shanghai", "CN", 31.2304, 121.4737, 27100000),
+    ("São Paulo", "BR", -23.5505, -46.6333, 22000000),
+    ("Mexico City", "MX", 19.4326, -99.1332, 21800000),
+    ("Cairo", "EG", 30.0444, 31.2357, 20900000),
+    ("Mumbai", "IN", 19.0760, 72.8777, 20400000),
+    ("Beijing", "CN", 39.9042, 116.4074, 20400000),
+    ("Dhaka", "BD", 23.8103, 90.4125, 20300000),
+    ("Osaka", "JP", 34.6937, 135.5023, 19300000),
+    ("New York", "US", 40.7128, -74.0060, 18800000),
+    ("Karachi", "PK", 24.8607, 67.0011, 16100000),
+    ("Buenos Aires", "AR", -34.6037, -58.3816, 15200000),
+    ("Istanbul", "TR", 41.0082, 28.9784, 15200000),
+    ("Kolkata", "IN", 22.5726, 88.3639, 14900000),
+    ("Manila", "PH", 14.5995, 120.9842, 13900000),
+    ("Lagos", "NG", 6.5244, 3.3792, 13900000),
+    ("Rio de Janeiro", "BR", -22.9068, -43.1729, 13400000),
+    ("Guangzhou", "CN", 23.1291, 113.2644, 13300000),
+    ("Los Angeles", "US", 34.0522, -118.2437, 12400000),
+    ("Moscow", "RU", 55.7558, 37.6173, 12500000),
+    ("Paris", "FR", 48.8566, 2.3522, 11000000),
+    ("London", "GB", 51.5074, -0.1278, 9500000),
+    ("Chicago", "US", 41.8781, -87.6298, 8900000),
+    ("Bangalore", "IN", 12.9716, 77.5946, 8400000),
+    ("Hong Kong", "HK", 22.3193, 114.1694, 7500000),
+    ("Singapore", "SG", 1.3521, 103.8198, 5700000),
+    ("Sydney", "AU", -33.8688, 151.2093, 5300000),
+    ("San Francisco", "US", 37.7749, -122.4194, 4700000),
+    ("Toronto", "CA", 43.6532, -79.3832, 6200000),
+]
+
+
+def to_unit_vectors(lat, lng) -> np.ndarray:
+    """
+    Convert latitudes/longitudes in degrees to (..., 3) unit vectors.
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lng = np.radians(np.asarray(lng, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)], axis=-1)
+
+
+def chord_length(radius_km) -> np.ndarray:
+    """
+    Straight-line distance on the unit sphere for a great-circle radius.
+    """
+    angle = np.clip(np.asarray(radius_km, dtype=np.float64) / EARTH_RADIUS, 0, np.pi)
+    return 2 * np.sin(angle / 2)
+
+
+class CityIndex:
+    """
+    KD-tree over city unit vectors with great-circle radius queries.
+    """
+    
+    def __init__(self, names: np.ndarray, countries: np.ndarray, lat: np.ndarray,
+                 lng: np.ndarray, population: np.ndarray):
+        self.names = names
+        self.countries = countries
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lng = np.asarray(lng, dtype=np.float64)
+        self.population = np.asarray(population, dtype=np.int64)
+        self.vectors = to_unit_vectors(self.lat, self.lng)
+        # Imported here so that importing this module (and the app) stays cheap
+        from scipy.spatial import cKDTree
+        self.tree = cKDTree(self.vectors)
+    
+    @classmethod
+    def load(cls, path: str = DEFAULT_CITIES_PATH) -> "CityIndex":
+        """
+        Load the built dataset, or the bundled metro list if none exists.
+        """
+        if os.path.exists(path):
+            data = load_arrays(path)
+            return cls(data["names"], data["countries"], data["lat"], data["lng"], data["population"])
+        names, countries, lat, lng, population = zip(*DEFAULT_CITIES)
+        return cls(np.array(names), np.array(countries), np.array(lat), np.array(lng), np.array(population))
+    
+    def query_radius(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """
+        Indices of cities within a great-circle radius of one point.
+        """
+        return np.asarray(self.tree.query_ball_point(to_unit_vectors(lat, lng), chord_length(radius_km)),
+                          dtype=np.int64)
+    
+    def query_radius_batch(self, lat, lng, radius_km) -> List[np.ndarray]:
+        """
+        Indices of cities within each radius, for many points at once.
+        
+        Args:
+            lat: Center latitudes (n,)
+            lng: Center longitudes (n,)
+            radius_km: Radii (n,) or scalar
+            
+        Returns:
+            List of n index arrays
+        """
+        lat, lng, radius_km = np.broadcast_arrays(
+            np.asarray(lat, dtype=np.float64),
+            np.asarray(lng, dtype=np.float64),
+            np.asarray(radius_km, dtype=np.float64)
+        )
+        results = self.tree.query_ball_point(to_unit_vectors(lat, lng), chord_length(radius_km))
+        return [np.asarray(indices, dtype=np.int64) for indices in results]
+    
+    def distances_km(self, lat: float, lng: float, indices: np.ndarray) -> np.ndarray:
+        """
+        Great-circle distances from a point to the given cities.
+        """
+        center = to_unit_vectors(lat, lng)
+        cos_angle = np.clip(self.vectors[indices] @ center, -1, 1)
+        return np.arccos(cos_angle) * EARTH_RADIUS
+    
+    def city_casualties(self, lat: float, lng: float, radii: Dict[str, float]) -> List[Dict]:
+        """
+        Per-city breakdown for one impact.
+        
+        Args:
+            lat: Impact latitude
+            lng: Impact longitude
+            radii: Effect radius in km per zone name (keys of ZONE_CASUALTY_RATES)
+            
+        Returns:
+            Cities inside any zone, most casualties first, each with the
+            zones reaching it and an estimated casualty count
+        """
+        indices = self.query_radius(lat, lng, max(radii.values(), default=0))
+        if len(indices) == 0:
+            return []
+        distances = self.distances_km(lat, lng, indices)
+        
+        cities = []
+        for index, distance in zip(indices, distances):
+            zones = [zone for zone, radius in radii.items() if distance <= radius]
+            if not zones:
+                continue
+            rate = max(ZONE_CASUALTY_RATES[zone] for zone in zones)
+            cities.append({
+                "name": str(self.names[index]),
+                "country": str(self.countries[index]),
+                "lat": float(self.lat[index]),
+                "lng": float(self.lng[index]),
+                "population": int(self.population[index]),
+                "distance_km": float(distance),
+                "zones": zones,
+                "estimated_casualties": int(self.population[index] * rate),
+            })
+        cities.sort(key=lambda city: city["estimated_casualties"], reverse=True)
+        return cities
+    
+    def city_casualties_batch(self, lat, lng, radii: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Per-scenario totals over cities, for many impacts at once.
+        
+        Args:
+            lat: Impact latitudes (n,)
+            lng: Impact longitudes (n,)
+            radii: Effect radii (n,) per zone name; NaN radii are ignored
+            
+        Returns:
+            Dict with "affected" (cities in any zone), "population" and
+            "estimated_casualties", each an (n,) int64 array
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        zones = list(radii)
+        radius_matrix = np.nan_to_num(np.stack([np.asarray(radii[z], dtype=np.float64) for z in zones], axis=-1), nan=-1.0)
+        rates = np.array([ZONE_CASUALTY_RATES[z] for z in zones])
+        centers = to_unit_vectors(lat, lng)
+        reach = chord_length(radius_matrix.max(axis=-1))
+        
+        # Candidate counts first (no index lists), then scenarios in slices
+        # of at most MAX_CITY_PAIRS candidate pairs (at least one scenario each)
+        counts = np.asarray(self.tree.query_ball_point(centers, reach, return_length=True), dtype=np.int64)
+        ends = np.cumsum(counts)
+        totals = {key: np.zeros(len(lat), dtype=np.int64) for key in ("affected", "population", "estimated_casualties")}
+        start = 0
+        while start < len(lat):
+            offset = ends[start - 1] if start else 0
+            stop = max(start + 1, int(np.searchsorted(ends, offset + MAX_CITY_PAIRS, side="right")))
+            if ends[stop - 1] > offset:
+                part = slice(start, stop)
+                for key, values in self._casualties_slice(centers[part], reach[part], radius_matrix[part], rates).items():
+                    totals[key][part] = values
+            start = stop
+        return totals
+    
+    def _casualties_slice(self, centers: np.ndarray, reach: np.ndarray, radius_matrix: np.ndarray,
+                          rates: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        city_casualties_batch totals for a slice of scenarios, evaluating
+        all their (scenario, city) pairs at once.
+        """
+        n = len(centers)
+        candidates = self.tree.query_ball_point(centers, reach)
+        counts = np.array([len(c) for c in candidates], dtype=np.int64)
+        scenario = np.repeat(np.arange(n), counts)
+        city = np.concatenate([np.asarray(c, dtype=np.int64) for c in candidates])
+        del candidates
+        
+        cos_angle = np.einsum("ij,ij->i", self.vectors[city], centers[scenario])
+        distance = np.arccos(np.clip(cos_angle, -1, 1)) * EARTH_RADIUS
+        inside = distance[:, None] <= radius_matrix[scenario]
+        rate = np.where(inside, rates, 0).max(axis=-1)
+        hit = inside.any(axis=-1)
+        
+        # Sums stay far below 2**53, so float64 bincount weights are exact
+        population = self.population[city]
+        return {
+            "affected": np.bincount(scenario, weights=hit, minlength=n).astype(np.int64),
+            "population": np.bincount(scenario, weights=np.where(hit, population, 0), minlength=n).astype(np.int64),
+            "estimated_casualties": np.bincount(scenario, weights=np.trunc(population * rate),
+                                                minlength=n).astype(np.int64),
+        }
+
+
+def read_geonames(path: str) -> Dict[str, np.ndarray]:
+    """
+    Read a GeoNames cities dump (tab-separated, 19 columns).
+    """
+    names, countries, lat, lng, population = [], [], [], [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 15:
+                continue
+            names.append(fields[1])
+            countries.append(fields[8])
+            lat.append(float(fields[4]))
+            lng.append(float(fields[5]))
+            population.append(int(fields[14] or 0))
+    return {
+        "names": np.array(names),
+        "countries": np.array(countries),
+        "lat": np.array(lat, dtype=np.float64),
+        "lng": np.array(lng, dtype=np.float64),
+        "population": np.array(population, dtype=np.int64),
+    }
+
+
+_index: Optional[CityIndex] = None
+
+
+def get_city_index() -> CityIndex:
+    """
+    Return the shared city index, building it on first use.
+    """
+    global _index
+    if _index is None:
+        _index = CityIndex.load()
+    return _index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the city dataset")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Convert a GeoNames cities dump")
+    build_parser.add_argument("source", help="GeoNames file, e.g. cities5000.txt")
+    build_parser.add_argument("--output", default=DEFAULT_CITIES_PATH)
+    args = parser.parse_args()
+    
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    data = read_geonames(args.source)
+    np.savez(args.output, **data)
+    print(f"Wrote {args.output}: {len(data['names'])} cities")
@@ -0,0 +1,430 @@
+"""
+Coastal tsunami inundation from a precomputed coastline.
+
+Built once from the terrain grid (and the population grid, if present):
+
+- Coastline points: land cells of a COAST_RESOLUTION grid that border
+  water. Each point holds the population living within COASTAL_STRIP_KM of
+  it, accumulated by ground elevation (ELEVATION_BANDS).
+- Ocean graph: water cells of a coarser GRAPH_RESOLUTION grid, linked to
+  their 16 nearest neighbours and weighted by the shallow-water travel time
+  d / sqrt(g h). Each coastline point is attached to its nearest ocean cell.
+
+At runtime Dijkstra runs from the impact's ocean cell give the travel
+time and the ocean path length to every coastline point, so waves go
+around continents rather than through them. Fields are cached per source
+cell. The wave height decays with the path length (a coast behind a
+landmass is farther than its great-circle distance), and the run-up at
+each point floods the population living below it.
+
+Usage:
+    python coastline.py build [--output PATH] [--coast-resolution DEG] [--graph-resolution DEG]
+"""
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from cities import EARTH_RADIUS, to_unit_vectors
+from datasets import load_arrays
+from population_grid import get_population_grid
+from terrain import get_terrain_grid
+
+DEFAULT_COASTLINE_PATH = os.getenv(
+    "COASTLINE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "coastline.npz")
+)
+
+GRAVITY = 9.81  # m/s²
+
+# Grid spacing of the coastline points and of the ocean graph, in degrees
+COAST_RESOLUTION = 0.1
+GRAPH_RESOLUTION = 1.0
+
+# Shallowest depth used for wave speeds (m)
+MIN_OCEAN_DEPTH = 10.0
+
+# Population within this distance of a coastline point is assigned to it
+COASTAL_STRIP_KM = 25.0
+
+# Upper edges (m above sea level) of the elevation bands population is
+# accumulated in; nobody above the last band is flooded
+ELEVATION_BANDS = (0.0, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+# Smallest wave height (m) that affects a coast; the decay is calibrated so
+# the wave falls to this height at the tsunami's affected radius
+MIN_WAVE_HEIGHT = 1.0
+
+# Travel-time and path-length fields kept per process (two float32s per
+# ocean cell each)
+FIELD_CACHE_SIZE = 32
+
+# Neighbour offsets of the ocean graph (each edge is added both ways). Knight
+# moves only link cells whose two straddled cells are water, so no edge
+# crosses land.
+_NEIGHBOURS = {
+    (0, 1): (),
+    (1, 0): (),
+    (1, 1): (),
+    (1, -1): (),
+    (1, 2): ((0, 1), (1, 1)),
+    (2, 1): ((1, 0), (1, 1)),
+    (1, -2): ((0, -1), (1, -1)),
+    (2, -1): ((1, 0), (1, -1)),
+}
+
+
+def _great_circle_km(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distance between unit vectors (broadcast over the last axis).
+    """
+    return EARTH_RADIUS * np.arccos(np.clip((a * b).sum(axis=-1), -1, 1))
+
+
+def _wave_speed(depth) -> np.ndarray:
+    return np.sqrt(GRAVITY * np.maximum(depth, MIN_OCEAN_DEPTH))
+
+
+class CoastlineIndex:
+    """
+    Coastline points, their coastal population, and the ocean travel-time graph.
+    """
+
+    def __init__(self, data: Dict[str, np.ndarray]):
+        self.lat = np.asarray(data["coast_lat"], dtype=np.float64)
+        self.lng = np.asarray(data["coast_lng"], dtype=np.float64)
+        self.vectors = to_unit_vectors(self.lat, self.lng)
+        self.coast_node = np.asarray(data["coast_node"], dtype=np.int64)
+        self.coast_offset = np.asarray(data["coast_offset"], dtype=np.float64)
+        self.bands = np.asarray(data["bands"], dtype=np.float64)
+        self.population_below = (
+            np.asarray(data["population_below"], dtype=np.float64) if "population_below" in data else None
+        )
+
+        self.node_vectors = to_unit_vectors(data["node_lat"], data["node_lng"])
+        self.node_speed = _wave_speed(np.asarray(data["node_depth"], dtype=np.float64))
+        # scipy is imported where it is used, so importing this module (and
+        # therefore the app) does not pay for it
+        from scipy.sparse import csr_matrix
+        from scipy.spatial import cKDTree
+        self.node_tree = cKDTree(self.node_vectors)
+        n = len(self.node_speed)
+        self.graph = csr_matrix((data["graph_weights"], data["graph_indices"], data["graph_indptr"]), shape=(n, n))
+        # Same edges weighted by their length in km
+        rows = np.repeat(np.arange(n), np.diff(self.graph.indptr))
+        lengths = _great_circle_km(self.node_vectors[rows], self.node_vectors[self.graph.indices])
+        self.distance_graph = csr_matrix((lengths, self.graph.indices, self.graph.indptr), shape=(n, n))
+        # Coastline point to ocean cell offsets (stored as travel times) in km
+        self.coast_offset_km = self.coast_offset * self.node_speed[self.coast_node] / 1000
+
+        self._fields: "OrderedDict[int, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_COASTLINE_PATH) -> "CoastlineIndex":
+        return cls(load_arrays(path))
+
+    def ocean_fields(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Shallow-water travel time (s) and shortest ocean path length (km)
+        from an ocean cell to every ocean cell (inf where unreachable),
+        cached per source cell.
+        """
+        with self._lock:
+            fields = self._fields.get(node)
+            if fields is not None:
+                self._fields.move_to_end(node)
+                return fields
+        from scipy.sparse.csgraph import dijkstra
+        fields = (dijkstra(self.graph, indices=node).astype(np.float32),
+                  dijkstra(self.distance_graph, indices=node).astype(np.float32))
+        with self._lock:
+            self._fields[node] = fields
+            while len(self._fields) > FIELD_CACHE_SIZE:
+                self._fields.popitem(last=False)
+        return fields
+
+    def inundation(self, lat: float, lng: float, wave_height: float,
+                   affected_radius: float) -> Dict[str, np.ndarray]:
+        """
+        Coastline points reached by a tsunami, sorted by arrival time.
+
+        The wave decays as wave_height * r0 / r beyond the source radius r0,
+        with r the ocean path length to the point, which puts the
+        MIN_WAVE_HEIGHT contour at `affected_radius` along the ocean. The run-up
+        at a point equals the wave height reaching it, and floods the coastal
+        population living below that elevation.
+
+        Args:
+            lat, lng: Impact point in degrees
+            wave_height: Wave height at the source in meters
+            affected_radius: Distance in km at which the wave falls to
+                MIN_WAVE_HEIGHT
+
+        Returns:
+            Dict of arrays over the affected points: index (into the
+            coastline), lat, lng, distance_km (along the ocean), arrival_time
+            (s), wave_height (m) and inundated_population (absent without
+            population data)
+        """
+        indices, distance, arrival, height = self._reach(lat, lng, wave_height, affected_radius)
+        order = np.argsort(arrival)
+        indices, distance, arrival, height = indices[order], distance[order], arrival[order], height[order]
+        result = {
+            "index": indices,
+            "lat": self.lat[indices],
+            "lng": self.lng[indices],
+            "distance_km": distance,
+            "arrival_time": arrival,
+            "wave_height": height,
+        }
+        if self.population_below is not None:
+            result["inundated_population"] = self._population_below(indices, height)
+        return result
+
+    def summary(self, lat: float, lng: float, wave_height: float,
+                affected_radius: float) -> Tuple[int, Optional[float], Optional[float]]:
+        """
+        Totals of `inundation`.
+
+        Returns:
+            Tuple of (affected coastline points, first arrival in seconds or
+            None, inundated population or None without population data)
+        """
+        indices, _, arrival, height = self._reach(lat, lng, wave_height, affected_radius)
+        first_arrival = float(arrival.min()) if len(indices) else None
+        if self.population_below is None:
+            return len(indices), first_arrival, None
+        return len(indices), first_arrival, float(self._population_below(indices, height).sum())
+
+    def _reach(self, lat: float, lng: float, wave_height: float,
+               affected_radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Affected points (unsorted) with their ocean path length, arrival
+        time and wave height.
+        """
+        empty = np.empty(0)
+        if wave_height < MIN_WAVE_HEIGHT or affected_radius <= 0:
+            return np.empty(0, dtype=np.int64), empty, empty, empty
+
+        # No ocean path is shorter than the great circle, so candidates are
+        # taken by dot product first
+        source = to_unit_vectors(lat, lng)
+        dot = self.vectors @ source
+        indices = np.flatnonzero(dot >= np.cos(min(affected_radius / EARTH_RADIUS, np.pi)))
+
+        source_offset, node = self.node_tree.query(source)
+        times, lengths = self.ocean_fields(int(node))
+        source_km = EARTH_RADIUS * 2 * np.arcsin(min(source_offset / 2, 1.0))
+        nodes = self.coast_node[indices]
+        arrival = times[nodes] + self.coast_offset[indices] + source_km * 1000 / self.node_speed[node]
+        distance = lengths[nodes] + self.coast_offset_km[indices] + source_km
+        reached = np.isfinite(arrival) & (distance <= affected_radius)
+        indices, distance, arrival = indices[reached], distance[reached].astype(np.float64), arrival[reached].astype(np.float64)
+
+        r0 = affected_radius * MIN_WAVE_HEIGHT / wave_height
+        height = wave_height * np.minimum(1.0, r0 / np.maximum(distance, 1e-9))
+        return indices, distance, arrival, height
+
+    def _population_below(self, indices: np.ndarray, height: np.ndarray) -> np.ndarray:
+        """
+        Population of each point living below the given elevations,
+        interpolated linearly between the elevation bands.
+        """
+        band = np.clip(np.searchsorted(self.bands, height), 1, len(self.bands) - 1)
+        lower, upper = self.bands[band - 1], self.bands[band]
+        fraction = np.clip((height - lower) / (upper - lower), 0, 1)
+        flat = self.population_below.ravel()
+        base = indices * len(self.bands) + band
+        below_lower, below_upper = flat[base - 1], flat[base]
+        return below_lower + fraction * (below_upper - below_lower)
+
+
+def _coarsen(elevation: np.ndarray, factor: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Water fraction and mean water depth (m) of factor x factor blocks.
+    """
+    rows, cols = elevation.shape[0] // factor, elevation.shape[1] // factor
+    fraction = np.empty((rows, cols))
+    depth = np.empty((rows, cols))
+    for row in range(rows):
+        block = np.asarray(elevation[row * factor:(row + 1) * factor, :cols * factor], dtype=np.float64)
+        block = block.reshape(factor, cols, factor).transpose(1, 0, 2).reshape(cols, -1)
+        water = block < 0
+        count = water.sum(axis=1)
+        fraction[row] = count / block.shape[1]
+        depth[row] = np.where(water, -block, 0).sum(axis=1) / np.maximum(count, 1)
+    return fraction, depth
+
+
+def _cell_centers(rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    lat = 90 - (np.arange(rows) + 0.5) * 180 / rows
+    lng = -180 + (np.arange(cols) + 0.5) * 360 / cols
+    return lat, lng
+
+
+def _coast_cells(water: np.ndarray) -> np.ndarray:
+    """
+    Land cells with a water cell to the north, south, east or west.
+    """
+    neighbour = np.zeros_like(water)
+    neighbour[1:] |= water[:-1]
+    neighbour[:-1] |= water[1:]
+    neighbour |= np.roll(water, 1, axis=1) | np.roll(water, -1, axis=1)
+    return ~water & neighbour
+
+
+def build_ocean_graph(fraction: np.ndarray, depth: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Ocean cells (at least half water) and the travel-time edges between them.
+    """
+    rows, cols = fraction.shape
+    water = fraction >= 0.5
+    node_index = np.full((rows, cols), -1, dtype=np.int64)
+    node_index[water] = np.arange(water.sum())
+    lat, lng = _cell_centers(rows, cols)
+    r, c = np.nonzero(water)
+    vectors = to_unit_vectors(lat[r], lng[c])
+    speed = _wave_speed(depth[r, c])
+
+    def is_water(dr, dc, r=r, c=c):
+        rr = r + dr
+        inside = (rr >= 0) & (rr < rows)
+        return inside & water[np.clip(rr, 0, rows - 1), (c + dc) % cols]
+
+    sources, targets, weights = [], [], []
+    for (dr, dc), straddled in _NEIGHBOURS.items():
+        ok = is_water(dr, dc)
+        for sr, sc in straddled:
+            ok &= is_water(sr, sc)
+        a = np.flatnonzero(ok)
+        b = node_index[r[a] + dr, (c[a] + dc) % cols]
+        seconds = _great_circle_km(vectors[a], vectors[b]) * 1000 / ((speed[a] + speed[b]) / 2)
+        sources += [a, b]
+        targets += [b, a]
+        weights += [seconds, seconds]
+
+    from scipy.sparse import csr_matrix
+    n = len(r)
+    graph = csr_matrix(
+        (np.concatenate(weights), (np.concatenate(sources), np.concatenate(targets))), shape=(n, n)
+    )
+    return {
+        "node_lat": lat[r],
+        "node_lng": lng[c],
+        "node_depth": depth[r, c],
+        "graph_indptr": graph.indptr.astype(np.int64),
+        "graph_indices": graph.indices.astype(np.int32),
+        "graph_weights": graph.data.astype(np.float32),
+    }
+
+
+def coastal_population(coast_vectors: np.ndarray, chunk_rows: int = 256) -> Optional[np.ndarray]:
+    """
+    Population within COASTAL_STRIP_KM of each coastline point, accumulated
+    below each of ELEVATION_BANDS (None if no population grid is built).
+
+    Every populated cell is assigned to its nearest coastline point.
+    """
+    population = get_population_grid()
+    terrain = get_terrain_grid()
+    if population is None:
+        return None
+    from scipy.spatial import cKDTree
+    tree = cKDTree(coast_vectors)
+    strip = 2 * np.sin(COASTAL_STRIP_KM / EARTH_RADIUS / 2)
+    histogram = np.zeros((len(coast_vectors), len(ELEVATION_BANDS) + 1))
+    lat, lng = _cell_centers(population.rows, population.cols)
+
+    for start in range(0, population.rows, chunk_rows):
+        stop = min(start + chunk_rows, population.rows)
+        # Cell counts from the summed-area table
+        sat = population.sat[start:stop + 1]
+        counts = np.diff(np.diff(sat, axis=0), axis=1)
+        r, c = np.nonzero(counts > 0)
+        if not len(r):
+            continue
+        cell_lat, cell_lng = lat[start + r], lng[c]
+        distance, nearest = tree.query(to_unit_vectors(cell_lat, cell_lng), distance_upper_bound=strip)
+        inside = np.isfinite(distance)
+        elevation = terrain.elevation(cell_lat[inside], cell_lng[inside])
+        band = np.searchsorted(ELEVATION_BANDS, elevation)
+        np.add.at(histogram, (nearest[inside], band), counts[r[inside], c[inside]])
+
+    return np.cumsum(histogram[:, :len(ELEVATION_BANDS)], axis=1)
+
+
+def build_coastline(coast_resolution: float = COAST_RESOLUTION,
+                    graph_resolution: float = GRAPH_RESOLUTION) -> Dict[str, np.ndarray]:
+    """
+    Build the coastline dataset from the terrain (and population) grids.
+    """
+    terrain = get_terrain_grid()
+    if terrain is None:
+        raise ValueError("Build the terrain grid first (python terrain.py build)")
+
+    coast_factor = max(1, int(round(coast_resolution / terrain.cell_lat)))
+    coast_fraction, _ = _coarsen(terrain.elevation_grid, coast_factor)
+    coast_rows, coast_cols = np.nonzero(_coast_cells(coast_fraction >= 0.5))
+    lat, lng = _cell_centers(*coast_fraction.shape)
+    coast_lat, coast_lng = lat[coast_rows], lng[coast_cols]
+    coast_vectors = to_unit_vectors(coast_lat, coast_lng)
+
+    graph_factor = max(1, int(round(graph_resolution / terrain.cell_lat)))
+    data = build_ocean_graph(*_coarsen(terrain.elevation_grid, graph_factor))
+
+    # Attach each coastline point to its nearest ocean cell
+    node_vectors = to_unit_vectors(data["node_lat"], data["node_lng"])
+    from scipy.spatial import cKDTree
+    chord, node = cKDTree(node_vectors).query(coast_vectors)
+    offset_km = EARTH_RADIUS * 2 * np.arcsin(np.minimum(chord / 2, 1.0))
+    data.update({
+        "coast_lat": coast_lat,
+        "coast_lng": coast_lng,
+        "coast_node": node.astype(np.int32),
+        "coast_offset": (offset_km * 1000 / _wave_speed(data["node_depth"][node])).astype(np.float32),
+        "bands": np.array(ELEVATION_BANDS),
+    })
+
+    below = coastal_population(coast_vectors)
+    if below is not None:
+        data["population_below"] = below.astype(np.float32)
+    return data
+
+
+_index: Optional[CoastlineIndex] = None
+_index_checked = False
+
+
+def get_coastline() -> Optional[CoastlineIndex]:
+    """
+    Return the shared coastline index, or None if it has not been built.
+    """
+    global _index, _index_checked
+    if not _index_checked:
+        _index_checked = True
+        if os.path.exists(DEFAULT_COASTLINE_PATH):
+            _index = CoastlineIndex.load(DEFAULT_COASTLINE_PATH)
+    return _index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the coastline dataset")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Derive coastline points and the ocean graph")
+    build_parser.add_argument("--output", default=DEFAULT_COASTLINE_PATH)
+    build_parser.add_argument("--coast-resolution", type=float, default=COAST_RESOLUTION,
+                              help="Coastline point spacing in degrees")
+    build_parser.add_argument("--graph-resolution", type=float, default=GRAPH_RESOLUTION,
+                              help="Ocean graph cell size in degrees")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    data = build_coastline(args.coast_resolution, args.graph_resolution)
+    np.savez(args.output, **data)
+    populated = "with" if "population_below" in data else "without"
+    print(f"Wrote {args.output}: {len(data['coast_lat'])} coastline points ({populated} population), "
+          f"{len(data['node_lat'])} ocean cells")
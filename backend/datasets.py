@@ -0,0 +1,98 @@
+"""
+Read-only datasets shared by every server worker.
+
+Large arrays are opened from .npy files with numpy's memmap, so all worker
+processes map the same pages of the OS page cache instead of each holding
+a private copy. Datasets built as .npz archives (which cannot be memory
+mapped) are extracted once into a directory of .npy files under
+DATASET_CACHE_DIR. The directory is keyed by the archive's size and
+modification time, so rebuilding a dataset invalidates its extraction.
+
+`python serve.py` extracts the archives before starting the workers; if it
+has not, the first worker to load a dataset does it.
+"""
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DATASET_CACHE_DIR = os.getenv(
+    "DATASET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "mmap")
+)
+
+
+def load_arrays(path: str) -> Dict[str, np.ndarray]:
+    """
+    Open the arrays of an .npz archive as read-only memory maps.
+
+    Args:
+        path: Path to the .npz archive
+
+    Returns:
+        Dict of arrays keyed by archive member name
+    """
+    target = extracted_path(path)
+    if not os.path.isdir(target):
+        _extract(path, target)
+    return {
+        name[:-len(".npy")]: np.asarray(np.load(os.path.join(target, name), mmap_mode="r"))
+        for name in sorted(os.listdir(target)) if name.endswith(".npy")
+    }
+
+
+def file_version(path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Absolute path, size and modification time (ns) of a dataset file, or
+    None if it does not exist. Rebuilding a dataset changes its version.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def extracted_path(path: str) -> str:
+    """
+    Directory holding the extracted arrays of the current version of an archive.
+    """
+    stat = os.stat(path)
+    return os.path.join(DATASET_CACHE_DIR, f"{_stem(path)}-{stat.st_size}-{stat.st_mtime_ns}")
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _extract(path: str, target: str):
+    """
+    Write every member of an archive to its own .npy file.
+
+    Members are written to a temporary directory that is renamed into place,
+    so workers extracting concurrently never see a partial extraction.
+    """
+    os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".extract-", dir=DATASET_CACHE_DIR)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            for key in data.files:
+                np.save(os.path.join(staging, f"{key}.npy"), data[key], allow_pickle=False)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            if not os.path.isdir(target):
+                raise
+            # Another worker finished first
+            return
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    # Drop extractions of older versions of the same archive
+    prefix = f"{_stem(path)}-"
+    for name in os.listdir(DATASET_CACHE_DIR):
+        stale = os.path.join(DATASET_CACHE_DIR, name)
+        if name.startswith(prefix) and stale != target and name[len(prefix):].replace("-", "").isdigit():
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,452 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from models import SweepRange, TradeSpaceRequest
+from orbital_mechanics import OrbitalMechanics
+
+EARTH_RADIUS_KM = 6371
+EARTH_ESCAPE_VELOCITY_KMS = 11.186
+SECONDS_PER_DAY = 86400
+
+# Largest trade-space grid evaluated per request (summed over strategies)
+MAX_GRID_POINTS = 5_000_000
+
+# Unit directions in the asteroid's RTN frame (radial, transverse, normal)
+RTN_DIRECTIONS = {
+    "along-track": (0.0, 1.0, 0.0),
+    "anti-along-track": (0.0, -1.0, 0.0),
+    "radial": (1.0, 0.0, 0.0),
+    "anti-radial": (-1.0, 0.0, 0.0),
+    "normal": (0.0, 0.0, 1.0),
+    "anti-normal": (0.0, 0.0, -1.0),
+}
+
+class DeflectionCalculator:
+    """
+    Deflection strategy models.
+
+    Every method accepts either plain floats or NumPy arrays (broadcast
+    against each other), so single calculations and trade-space sweeps
+    share the same formulas.
+    """
+
+    G = 6.67430e-11  # gravitational constant
+
+    # Tunable spacecraft parameters per strategy and their nominal values
+    # (the models take them as required arguments; `evaluate` fills in the
+    # ones not given)
+    PARAMETERS = {
+        "kinetic-impactor": {
+            "impactor_mass": 1000.0,  # kg (spacecraft mass)
+            "impactor_velocity": 10000.0,  # m/s (relative velocity)
+            "beta": 2.0,  # momentum enhancement factor
+        },
+        "gravity-tractor": {
+            "spacecraft_mass": 20000.0,  # kg
+            "distance": 100.0,  # meters from asteroid
+        },
+        "laser-ablation": {
+            "laser_power": 100000.0,  # watts
+            "efficiency": 0.1,
+        },
+    }
+
+    @staticmethod
+    def kinetic_impactor(time_available, asteroid_mass, impactor_mass, impactor_velocity, beta):
+        """
+        Kinetic impactor mission.
+
+        Momentum transfer: Δv = (β * m_impactor * v_impactor) / m_asteroid
+        where β is momentum enhancement factor (typically 1.5-3.0)
+
+        Args:
+            time_available: Time available in days
+            asteroid_mass: Asteroid mass in kg
+            impactor_mass: Spacecraft mass in kg
+            impactor_velocity: Relative velocity in m/s
+            beta: Momentum enhancement factor
+
+        Returns:
+            Tuple of (delta-v in m/s, success probability, required missions)
+        """
+        delta_v = np.divide(np.multiply(np.multiply(beta, impactor_mass), impactor_velocity), asteroid_mass)
+
+        # Success probability based on time available (typical mission takes 180 days)
+        days_needed = 180
+        success_prob = np.minimum(np.divide(time_available, days_needed), 1.0) * 0.85
+
+        required_missions = np.maximum(1, np.floor(np.divide(asteroid_mass, np.multiply(impactor_mass, 100))))
+        return delta_v, success_prob, required_missions
+
+    @staticmethod
+    def gravity_tractor(time_available, asteroid_mass, spacecraft_mass, distance):
+        """
+        Gravity tractor mission.
+
+        Uses gravitational attraction to slowly alter orbit.
+        Requires long mission duration but very precise.
+
+        Args:
+            time_available: Time available in days
+            asteroid_mass: Asteroid mass in kg
+            spacecraft_mass: Tractor mass in kg
+            distance: Hover distance from the asteroid in meters
+
+        Returns:
+            Tuple of (delta-v in m/s, success probability, required missions)
+        """
+        force = np.multiply(DeflectionCalculator.G * np.asarray(spacecraft_mass), asteroid_mass) / np.power(distance, 2)
+        acceleration = np.divide(force, asteroid_mass)
+
+        time_seconds = np.multiply(time_available, 24) * 60 * 60
+        delta_v = acceleration * time_seconds
+
+        # Requires at least 1 year
+        days_needed = 365
+        success_prob = np.minimum(np.divide(time_available, days_needed), 1.0) * 0.95
+
+        required_missions = np.ones(np.broadcast(time_available, asteroid_mass).shape)
+        return delta_v, success_prob, required_missions
+
+    @staticmethod
+    def laser_ablation(time_available, asteroid_mass, laser_power, efficiency):
+        """
+        Laser ablation mission.
+
+        Uses focused laser to vaporize surface material,
+        creating thrust through ablation.
+
+        Args:
+            time_available: Time available in days
+            asteroid_mass: Asteroid mass in kg
+            laser_power: Laser power in watts
+            efficiency: Fraction of laser power converted to thrust
+
+        Returns:
+            Tuple of (delta-v in m/s, success probability, required missions)
+        """
+        thrust = np.multiply(laser_power, efficiency) / 3e8  # Approximate
+
+        time_seconds = np.multiply(time_available, 24) * 60 * 60
+        delta_v = np.divide(thrust * time_seconds, asteroid_mass)
+
+        # Experimental technology
+        days_needed = 270
+        success_prob = np.minimum(np.divide(time_available, days_needed), 1.0) * 0.70
+
+        required_missions = np.maximum(1, np.floor(np.divide(asteroid_mass, 1e9)))
+        return delta_v, success_prob, required_missions
+
+    @staticmethod
+    def evaluate(strategy: str, time_available, asteroid_mass, **parameters):
+        """
+        Dispatch to the model for a strategy type.
+
+        Parameters not given take their nominal values from PARAMETERS.
+
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        models = {
+            "kinetic-impactor": DeflectionCalculator.kinetic_impactor,
+            "gravity-tractor": DeflectionCalculator.gravity_tractor,
+            "laser-ablation": DeflectionCalculator.laser_ablation,
+        }
+        if strategy not in models:
+            raise ValueError(f"Unknown deflection strategy '{strategy}'")
+        nominal = DeflectionCalculator.PARAMETERS[strategy]
+        return models[strategy](time_available, asteroid_mass, **{**nominal, **parameters})
+
+    @staticmethod
+    def sweep(strategy: str, axes: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a strategy over the Cartesian product of its parameter axes.
+
+        Args:
+            strategy: Strategy type
+            axes: 1-D value arrays for time_available, asteroid_mass and any
+                of the strategy's PARAMETERS (missing ones use nominal values)
+
+        Returns:
+            Dict of flat arrays: every axis plus delta_v, success_probability
+            and required_missions
+        """
+        names = ["time_available", "asteroid_mass"] + list(DeflectionCalculator.PARAMETERS[strategy])
+        values = [np.asarray(axes.get(name, [DeflectionCalculator.PARAMETERS[strategy].get(name)]),
+                             dtype=np.float64) for name in names]
+        grids = np.meshgrid(*values, indexing="ij", sparse=True)
+        inputs = dict(zip(names, grids))
+        delta_v, success, missions = DeflectionCalculator.evaluate(strategy, **inputs)
+
+        shape = tuple(len(v) for v in values)
+        columns = {name: np.broadcast_to(grid, shape).ravel() for name, grid in inputs.items()}
+        columns["delta_v"] = np.broadcast_to(delta_v, shape).ravel()
+        columns["success_probability"] = np.broadcast_to(success, shape).ravel()
+        columns["required_missions"] = np.broadcast_to(missions, shape).ravel()
+        return columns
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    """
+    Indices of the non-dominated rows of a 3-column objective matrix.
+
+    All objectives are maximized. The sweep runs over the column with the
+    fewest distinct values; within each level a 2-D staircase (running
+    maximum) removes points dominated by better levels or by each other.
+    Exact duplicates keep a single representative.
+
+    Args:
+        objectives: (n, 3) array
+
+    Returns:
+        Sorted array of row indices on the frontier
+    """
+    n = objectives.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    distinct = [len(np.unique(objectives[:, k])) for k in range(3)]
+    level_col = int(np.argmin(distinct))
+    x_col, y_col = [k for k in range(3) if k != level_col]
+    level, x, y = objectives[:, level_col], objectives[:, x_col], objectives[:, y_col]
+
+    # Best level first, then x and y descending
+    order = np.lexsort((-y, -x, -level))
+    boundaries = np.flatnonzero(np.diff(level[order])) + 1
+
+    stair_x = np.zeros(0)  # staircase of better levels: x descending,
+    stair_y = np.zeros(0)  # y = running maximum
+    keep: List[np.ndarray] = []
+    for group in np.split(order, boundaries):
+        gx, gy = x[group], y[group]
+
+        # Dominated within the level: an earlier point (x >=) already has y >=
+        previous_best = np.concatenate([[-np.inf], np.maximum.accumulate(gy)[:-1]])
+        candidate = gy > previous_best
+
+        # Dominated by a better level: some staircase point has x >= and y >=
+        if len(stair_x):
+            count = np.searchsorted(-stair_x, -gx, side="right")
+            candidate &= ~((count > 0) & (stair_y[np.maximum(count - 1, 0)] >= gy))
+
+        survivors = group[candidate]
+        if len(survivors):
+            keep.append(survivors)
+            merged_x = np.concatenate([stair_x, x[survivors]])
+            merged_y = np.concatenate([stair_y, y[survivors]])
+            merged = np.lexsort((-merged_y, -merged_x))
+            stair_x, stair_y = merged_x[merged], np.maximum.accumulate(merged_y[merged])
+
+    return np.sort(np.concatenate(keep)) if keep else np.zeros(0, dtype=np.int64)
+
+
+def sweep_values(name: str, sweep: SweepRange) -> np.ndarray:
+    """
+    Expand a SweepRange into its values.
+
+    Raises:
+        ValueError: If the sweep is incomplete, empty or not finite
+    """
+    if sweep.values is not None:
+        values = np.asarray(sweep.values, dtype=np.float64)
+    elif sweep.min is None or sweep.max is None:
+        raise ValueError(f"{name}: give either values or min and max")
+    elif sweep.log:
+        if sweep.min <= 0 or sweep.max <= 0:
+            raise ValueError(f"{name}: logarithmic sweeps need positive bounds")
+        values = np.geomspace(sweep.min, sweep.max, sweep.steps)
+    else:
+        values = np.linspace(sweep.min, sweep.max, sweep.steps)
+    if len(values) == 0 or not np.all(np.isfinite(values)):
+        raise ValueError(f"{name}: values must be finite and non-empty")
+    return values
+
+
+def trade_space_axes(request: TradeSpaceRequest) -> Dict[str, np.ndarray]:
+    """
+    Validate a trade-space request and expand its sweeps, checking the grid size.
+
+    Raises:
+        ValueError: If a strategy, parameter or sweep is invalid or the grid is too large
+    """
+    if not request.strategies:
+        raise ValueError("At least one strategy is required")
+    unknown = [s for s in request.strategies if s not in DeflectionCalculator.PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown deflection strategy: {', '.join(unknown)}")
+    if len(set(request.strategies)) != len(request.strategies):
+        raise ValueError("Strategies must not repeat")
+
+    known = {name for strategy in request.strategies for name in DeflectionCalculator.PARAMETERS[strategy]}
+    unknown = sorted(set(request.parameters) - known)
+    if unknown:
+        raise ValueError(
+            f"Unknown parameters for the selected strategies: {', '.join(unknown)} "
+            f"(valid: {', '.join(sorted(known))})"
+        )
+
+    axes = {
+        "time_available": sweep_values("time_available", request.time_available),
+        "asteroid_mass": sweep_values("asteroid_mass", request.asteroid_mass),
+    }
+    if np.any(axes["time_available"] < 0) or np.any(axes["asteroid_mass"] <= 0):
+        raise ValueError("time_available must be >= 0 and asteroid_mass > 0")
+    for name, sweep in request.parameters.items():
+        axes[name] = sweep_values(name, sweep)
+
+    grid_points = 0
+    for strategy in request.strategies:
+        size = len(axes["time_available"]) * len(axes["asteroid_mass"])
+        for name in DeflectionCalculator.PARAMETERS[strategy]:
+            size *= len(axes.get(name, [None]))
+        grid_points += size
+    if grid_points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid has {grid_points} points; at most {MAX_GRID_POINTS} are allowed")
+    return axes
+
+
+def trade_space(strategies: List[str], axes: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Sweep strategies over a parameter grid and find the Pareto frontier.
+
+    The asteroid mass is a property of the threat rather than a mission
+    choice, so the frontier (max delta-v, max success probability, min
+    missions) is computed separately for each mass in the sweep.
+
+    Args:
+        strategies: Strategy types to include
+        axes: 1-D arrays for time_available, asteroid_mass and spacecraft parameters
+
+    Returns:
+        Tuple of (grid columns with a "strategy" index column, frontier indices
+        sorted by mass, missions, success probability and delta-v)
+    """
+    parts = [DeflectionCalculator.sweep(strategy, axes) for strategy in strategies]
+
+    names = {name for part in parts for name in part}
+    columns = {}
+    for name in names:
+        columns[name] = np.concatenate([
+            part[name] if name in part else np.full(len(part["delta_v"]), np.nan) for part in parts
+        ])
+    columns["strategy"] = np.concatenate([np.full(len(part["delta_v"]), k) for k, part in enumerate(parts)])
+
+    objectives = np.stack([
+        columns["delta_v"], columns["success_probability"], -columns["required_missions"]
+    ], axis=1)
+    mass = columns["asteroid_mass"]
+    by_mass = np.argsort(mass, kind="stable")
+    boundaries = np.flatnonzero(np.diff(mass[by_mass])) + 1
+    frontier = np.concatenate([
+        group[pareto_front(objectives[group])] for group in np.split(by_mass, boundaries)
+    ])
+
+    order = np.lexsort((
+        -columns["delta_v"][frontier],
+        -columns["success_probability"][frontier],
+        columns["required_missions"][frontier],
+        mass[frontier],
+    ))
+    return columns, frontier[order]
+
+
+def b_plane_miss_distance(positions: np.ndarray, velocities: np.ndarray,
+                          earth_position: np.ndarray, earth_velocity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Miss distance in the target (B-) plane of an Earth encounter.
+
+    The relative motion is treated as a straight line through the
+    encounter epoch, so the miss distance is the component of the relative
+    position perpendicular to the relative velocity. Timing changes from an
+    along-track push therefore show up as B-plane displacement.
+
+    Args:
+        positions: Asteroid positions at the encounter epoch (..., 3) in AU
+        velocities: Asteroid velocities (..., 3) in AU/day
+        earth_position: Earth position (3,) in AU
+        earth_velocity: Earth velocity (3,) in AU/day
+
+    Returns:
+        Tuple of (miss distance in km, relative speed in km/s)
+    """
+    relative_position = positions - earth_position
+    relative_velocity = velocities - earth_velocity
+    speed = np.linalg.norm(relative_velocity, axis=-1)
+    along = np.sum(relative_position * relative_velocity, axis=-1) / speed
+    perpendicular = relative_position - (along / speed)[..., None] * relative_velocity
+    miss_km = np.linalg.norm(perpendicular, axis=-1) * OrbitalMechanics.AU_KM
+    speed_kms = speed * OrbitalMechanics.AU_KM / SECONDS_PER_DAY
+    return miss_km, speed_kms
+
+
+def capture_radius_km(speed_kms):
+    """
+    B-plane radius inside which Earth is hit, including gravitational focusing.
+    """
+    return EARTH_RADIUS_KM * np.sqrt(1 + (EARTH_ESCAPE_VELOCITY_KMS / np.asarray(speed_kms)) ** 2)
+
+
+def propagate_deflection(elements: Dict[str, float], encounter_epoch: float, deflection_epochs: np.ndarray,
+                         delta_v: np.ndarray, directions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Apply impulsive pushes to an orbit and measure the resulting Earth miss distance.
+
+    Every combination of deflection epoch and direction is evaluated in one
+    vectorized pass: the asteroid state at each epoch gets delta_v along the
+    direction (in its radial/transverse/normal frame), the new elements are
+    propagated to the encounter, and the B-plane miss distance is taken
+    against Earth's position there.
+
+    Args:
+        elements: Pre-deflection element set (a, e, i, omega, Omega, M, epoch)
+        encounter_epoch: Julian date of the Earth encounter
+        deflection_epochs: Julian dates of the pushes (m,)
+        delta_v: Velocity change in m/s per deflection epoch (m,)
+        directions: RTN unit vectors (k, 3)
+
+    Returns:
+        Dict with "elements" (arrays of shape (m, k)), "miss_distance_km" (m, k),
+        and the undeflected "nominal_miss_distance_km", "relative_speed_kms" and
+        "capture_radius_km"
+    """
+    body = {key: np.array([float(value)]) for key, value in elements.items()}
+    deflection_epochs = np.asarray(deflection_epochs, dtype=np.float64)
+    directions = np.asarray(directions, dtype=np.float64)
+    directions = directions / np.linalg.norm(directions, axis=-1, keepdims=True)
+    earth = {key: np.array([value]) for key, value in OrbitalMechanics.EARTH_ELEMENTS.items()}
+
+    earth_position, earth_velocity = OrbitalMechanics.propagate(earth, [encounter_epoch], with_velocity=True)
+    earth_position, earth_velocity = earth_position[0, 0], earth_velocity[0, 0]
+    nominal_position, nominal_velocity = OrbitalMechanics.propagate(body, [encounter_epoch], with_velocity=True)
+    nominal_miss, speed = b_plane_miss_distance(nominal_position[0, 0], nominal_velocity[0, 0],
+                                                earth_position, earth_velocity)
+
+    # State and RTN frame at each deflection epoch
+    r, v = OrbitalMechanics.propagate(body, deflection_epochs, with_velocity=True)
+    r, v = r[0], v[0]  # (m, 3)
+    radial = r / np.linalg.norm(r, axis=-1, keepdims=True)
+    normal = np.cross(r, v)
+    normal /= np.linalg.norm(normal, axis=-1, keepdims=True)
+    transverse = np.cross(normal, radial)
+    frame = np.stack([radial, transverse, normal], axis=1)  # (m, 3 basis vectors, 3)
+
+    # m/s -> AU/day, then rotate each RTN direction into the ecliptic frame
+    dv = np.asarray(delta_v, dtype=np.float64) * SECONDS_PER_DAY / (OrbitalMechanics.AU_KM * 1000)
+    pushes = dv[:, None, None] * np.einsum("kj,mjd->mkd", directions, frame)  # (m, k, 3)
+    m, k = pushes.shape[:2]
+
+    new_elements = OrbitalMechanics.state_to_elements(
+        np.broadcast_to(r[:, None, :], pushes.shape),
+        v[:, None, :] + pushes,
+        deflection_epochs[:, None]
+    )
+    flat = {key: value.ravel() for key, value in new_elements.items()}
+    position, velocity = OrbitalMechanics.propagate(flat, [encounter_epoch], with_velocity=True)
+    miss, _ = b_plane_miss_distance(position[:, 0], velocity[:, 0], earth_position, earth_velocity)
+
+    return {
+        "elements": new_elements,
+        "miss_distance_km": miss.reshape(m, k),
+        "nominal_miss_distance_km": float(nominal_miss),
+        "relative_speed_kms": float(speed),
+        "capture_radius_km": float(capture_radius_km(speed)),
+    }
@@ -0,0 +1,322 @@
+"""
+Atmospheric entry: ablation, fragmentation and airburst.
+
+The body is integrated from ENTRY_ALTITUDE along its entry angle with
+drag, ablation, gravity and Earth curvature. Once the ram pressure exceeds
+the body's strength it breaks up, and the debris cloud spreads laterally
+("pancake" model, Chyba et al. 1993; Collins et al. 2005). When the cloud
+reaches PANCAKE_FACTOR times its breakup radius, its energy is released as
+an airburst. If the body or cloud reaches the ground first, it strikes with
+whatever mass and velocity remain.
+
+The ODE solutions (scipy solve_ivp, a few ms each) are precomputed over a
+size x density x velocity x angle grid and stored as a small .npz table.
+Requests then interpolate the table multilinearly, which costs
+microseconds. Interpolation stays within one regime (airburst or ground
+impact), so a lookup never mixes a burst altitude with ground fractions.
+
+Usage:
+    python entry.py build [--output PATH] [--workers N]
+"""
+import argparse
+import itertools
+import math
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_ENTRY_TABLE_PATH = os.getenv(
+    "ENTRY_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "entry_table.npz")
+)
+
+# Atmosphere and physical constants
+SEA_LEVEL_DENSITY = 1.225  # kg/m³
+SCALE_HEIGHT = 8000.0  # m
+EARTH_RADIUS_M = 6.371e6
+GRAVITY = 9.81  # m/s²
+ENTRY_ALTITUDE = 100e3  # m
+
+# Drag and heat-transfer coefficients, heat of ablation (J/kg)
+DRAG_COEFFICIENT = 2.0
+HEAT_TRANSFER_COEFFICIENT = 0.1
+HEAT_OF_ABLATION = 5e6
+
+# Debris cloud radius (relative to breakup radius) at which it bursts
+PANCAKE_FACTOR = 7.0
+
+# Bodies slowed below this speed (m/s) have deposited their energy aloft
+TERMINAL_VELOCITY = 100.0
+
+# Lookup table axes
+TABLE_SIZES = np.logspace(0, 3.5, 22)  # m (1 m - 3.2 km)
+TABLE_DENSITIES = np.array([1000, 1500, 2000, 2500, 3000, 3500, 5000, 8000], dtype=np.float64)  # kg/m³
+TABLE_VELOCITIES = np.linspace(11, 72, 13)  # km/s
+TABLE_ANGLES = np.array([5, 10, 15, 20, 30, 45, 60, 75, 90], dtype=np.float64)  # degrees from horizontal
+
+# Table outputs, in storage order
+OUTPUTS = ("burst_altitude", "breakup_altitude", "velocity_fraction", "mass_fraction")
+
+
+def strength(density):
+    """
+    Yield strength in Pa from bulk density (Collins et al. 2005, eq. 10).
+    """
+    return np.power(10.0, 2.107 + 0.0624 * np.sqrt(density))
+
+
+def integrate_entry(size: float, density: float, velocity: float, angle: float) -> Tuple[float, float, float, float]:
+    """
+    Integrate one entry trajectory.
+
+    Args:
+        size: Diameter in meters
+        density: Density in kg/m³
+        velocity: Entry velocity in km/s
+        angle: Entry angle in degrees from horizontal
+
+    Returns:
+        Tuple of (burst altitude in m (0 for a ground impact),
+        breakup altitude in m (0 if intact), ground velocity / entry
+        velocity, ground mass / entry mass); the fractions are 0 for an
+        airburst
+    """
+    from scipy.integrate import solve_ivp
+
+    v0 = velocity * 1000
+    radius0 = size / 2
+    m0 = density * 4 / 3 * np.pi * radius0 ** 3
+    y_strength = strength(density)
+
+    def forces(v, m, theta, z, area):
+        rho_air = SEA_LEVEL_DENSITY * np.exp(-z / SCALE_HEIGHT)
+        return (
+            -DRAG_COEFFICIENT * rho_air * area * v * v / (2 * m) + GRAVITY * np.sin(theta),
+            -HEAT_TRANSFER_COEFFICIENT * rho_air * area * v ** 3 / (2 * HEAT_OF_ABLATION),
+            GRAVITY * np.cos(theta) / v - v * np.cos(theta) / (EARTH_RADIUS_M + z),
+            -v * np.sin(theta),
+            rho_air,
+        )
+
+    def intact(t, y):
+        v, m, theta, z = y
+        radius = np.cbrt(3 * m / (4 * np.pi * density))
+        return forces(v, m, theta, z, np.pi * radius * radius)[:4]
+
+    def ground(t, y):
+        return y[3]
+    ground.terminal, ground.direction = True, -1
+
+    def breakup(t, y):
+        return SEA_LEVEL_DENSITY * np.exp(-y[3] / SCALE_HEIGHT) * y[0] ** 2 - y_strength
+    breakup.terminal, breakup.direction = True, 1
+
+    def stopped(t, y):
+        return y[0] - TERMINAL_VELOCITY
+    stopped.terminal = True
+
+    state = [v0, m0, np.radians(angle), ENTRY_ALTITUDE]
+    # The breakup event only fires on a rising crossing, so a body whose
+    # strength is already exceeded at ENTRY_ALTITUDE fragments right away
+    if breakup(0, state) < 0:
+        solution = solve_ivp(intact, (0, 1e5), state, events=[ground, breakup, stopped], rtol=1e-6,
+                             atol=[1e-3, m0 * 1e-9, 1e-9, 1e-2])
+        v, m, theta, z = solution.y[:, -1]
+        if solution.t_events[2].size:
+            return z, 0.0, 0.0, 0.0
+        if not solution.t_events[1].size:
+            return 0.0, 0.0, v / v0, m / m0
+    else:
+        v, m, theta, z = state
+
+    # Pancake phase: the debris cloud spreads under the pressure difference
+    # across it (r * d²r/dt² = C_D ρ_air v² / (2 ρ_body))
+    breakup_altitude = z
+    breakup_radius = np.cbrt(3 * m / (4 * np.pi * density))
+
+    def pancake(t, y):
+        v, m, theta, z, radius, spread = y
+        dv, dm, dtheta, dz, rho_air = forces(v, m, theta, z, np.pi * radius * radius)
+        return dv, dm, dtheta, dz, spread, DRAG_COEFFICIENT * rho_air * v * v / (2 * density * radius)
+
+    def burst(t, y):
+        return y[4] - PANCAKE_FACTOR * breakup_radius
+    burst.terminal, burst.direction = True, 1
+
+    solution = solve_ivp(pancake, (0, 1e5), [v, m, theta, z, breakup_radius, 0.0],
+                         events=[ground, burst, stopped], rtol=1e-6,
+                         atol=[1e-3, m0 * 1e-9, 1e-9, 1e-2, breakup_radius * 1e-9, 1e-6])
+    v, m, theta, z = solution.y[:4, -1]
+    if solution.t_events[1].size or solution.t_events[2].size:
+        return z, breakup_altitude, 0.0, 0.0
+    return 0.0, breakup_altitude, v / v0, m / m0
+
+
+def _integrate_block(points: np.ndarray) -> np.ndarray:
+    """
+    Integrate rows of (size, density, velocity, angle) (runs in a worker process).
+    """
+    return np.array([integrate_entry(*point) for point in points])
+
+
+def build_table(workers: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Integrate every grid point of the lookup table.
+
+    Args:
+        workers: Worker processes (default: one per CPU)
+
+    Returns:
+        Dict with the four axes and one array per name in OUTPUTS
+    """
+    grid = np.stack(np.meshgrid(TABLE_SIZES, TABLE_DENSITIES, TABLE_VELOCITIES, TABLE_ANGLES,
+                                indexing="ij"), axis=-1)
+    points = grid.reshape(-1, 4)
+    blocks = np.array_split(points, max(1, len(points) // 256))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        values = np.concatenate(list(executor.map(_integrate_block, blocks)))
+    values = values.reshape(grid.shape[:4] + (len(OUTPUTS),))
+    return {
+        "sizes": TABLE_SIZES,
+        "densities": TABLE_DENSITIES,
+        "velocities": TABLE_VELOCITIES,
+        "angles": TABLE_ANGLES,
+        **{name: values[..., k] for k, name in enumerate(OUTPUTS)},
+    }
+
+
+class EntryTable:
+    """
+    Multilinear interpolation over a precomputed entry table.
+
+    Size is interpolated in log space; inputs outside the table are clamped
+    to its edges. The regime is the one holding most of the interpolation
+    weight among the cell's corners, and only corners of that regime are
+    interpolated: an airburst has no ground fractions and a ground impact
+    no burst altitude.
+    """
+
+    def __init__(self, path: str = DEFAULT_ENTRY_TABLE_PATH):
+        with np.load(path) as data:
+            self.axes = [np.log10(data["sizes"]), data["densities"], data["velocities"], data["angles"]]
+            # Outputs stacked on the last axis so one gather serves all of them
+            values = np.stack([data[name] for name in OUTPUTS], axis=-1)
+        shape = values.shape[:4]
+        strides = [int(np.prod(shape[k + 1:])) for k in range(4)]
+        self.flat = np.ascontiguousarray(values.reshape(-1, len(OUTPUTS)))
+        self.strides = np.array(strides)
+        # Axis bits and flat offset of each of the 16 cell corners (axis 0 most significant)
+        self.corner_bits = list(itertools.product((0, 1), repeat=4))
+        self.corner_offsets = np.array(self.corner_bits) @ self.strides
+        # Plain-Python copies for single lookups, where NumPy call overhead dominates
+        self._axes_list = [axis.tolist() for axis in self.axes]
+        self._flat_list = self.flat.tolist()
+        self._strides_list = strides
+        self._corners_list = list(zip(self.corner_bits, self.corner_offsets.tolist()))
+
+    def lookup(self, size, density, velocity, angle) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Interpolate the entry outcome.
+
+        Args:
+            size: Diameters in meters
+            density: Densities in kg/m³
+            velocity: Entry velocities in km/s
+            angle: Entry angles in degrees
+
+        Returns:
+            Tuple of (burst altitude in m, breakup altitude in m, ground
+            velocity fraction, ground mass fraction), broadcast over the inputs
+        """
+        if np.ndim(size) == np.ndim(density) == np.ndim(velocity) == np.ndim(angle) == 0:
+            return self._lookup_one(math.log10(size), float(density), float(velocity), float(angle))
+
+        coords = np.broadcast_arrays(np.log10(size), np.asarray(density, dtype=np.float64),
+                                     np.asarray(velocity, dtype=np.float64), np.asarray(angle, dtype=np.float64))
+        shape = coords[0].shape
+        base = np.zeros(coords[0].size, dtype=np.int64)
+        weights = np.ones((coords[0].size, 1))
+        for axis, stride, values in zip(self.axes, self.strides, coords):
+            values = np.clip(values.ravel(), axis[0], axis[-1])
+            index = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2)
+            fraction = (values - axis[index]) / (axis[index + 1] - axis[index])
+            base += index * stride
+            # weights[n, corner] = product over axes of (1 - f) or f
+            weights = (weights[:, :, None] * np.stack([1 - fraction, fraction], axis=1)[:, None, :]).reshape(len(base), -1)
+
+        corners = self.flat[base[:, None] + self.corner_offsets]
+        airburst = corners[:, :, 0] > 0
+        is_airburst = np.einsum("nc,nc->n", weights, airburst) >= 0.5
+        weights = np.where(airburst == is_airburst[:, None], weights, 0.0)
+        weights /= weights.sum(axis=1, keepdims=True)
+        result = np.einsum("nc,nco->no", weights, corners)
+        result[is_airburst, 2:] = 0.0
+        result[~is_airburst, 0] = 0.0
+        result = result.reshape(shape + (len(OUTPUTS),))
+        return tuple(result[..., k][()] for k in range(len(OUTPUTS)))
+
+    def _lookup_one(self, *coords: float) -> Tuple[float, float, float, float]:
+        base = 0
+        fractions = []
+        for axis, stride, value in zip(self._axes_list, self._strides_list, coords):
+            value = min(max(value, axis[0]), axis[-1])
+            index = min(max(bisect_right(axis, value) - 1, 0), len(axis) - 2)
+            fractions.append((value - axis[index]) / (axis[index + 1] - axis[index]))
+            base += index * stride
+
+        corners = []
+        for bits, offset in self._corners_list:
+            weight = 1.0
+            for bit, fraction in zip(bits, fractions):
+                weight *= fraction if bit else 1 - fraction
+            if weight:
+                corners.append((weight, self._flat_list[base + offset]))
+        is_airburst = sum(weight for weight, values in corners if values[0] > 0) >= 0.5
+
+        result = [0.0] * len(OUTPUTS)
+        total = 0.0
+        for weight, values in corners:
+            if (values[0] > 0) == is_airburst:
+                total += weight
+                for k, value in enumerate(values):
+                    result[k] += weight * value
+        result = [value / total for value in result]
+        if is_airburst:
+            result[2] = result[3] = 0.0
+        else:
+            result[0] = 0.0
+        return tuple(result)
+
+
+_table: Optional[EntryTable] = None
+_table_checked = False
+
+
+def get_entry_table() -> Optional[EntryTable]:
+    """
+    Return the shared entry table, or None if it has not been built.
+    """
+    global _table, _table_checked
+    if not _table_checked:
+        _table_checked = True
+        if os.path.exists(DEFAULT_ENTRY_TABLE_PATH):
+            _table = EntryTable(DEFAULT_ENTRY_TABLE_PATH)
+    return _table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the atmospheric entry lookup table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Integrate the entry model over the table grid")
+    build_parser.add_argument("--output", default=DEFAULT_ENTRY_TABLE_PATH)
+    build_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    table = build_table(args.workers)
+    np.savez(args.output, **table)
+    airburst = (table["burst_altitude"] > 0).mean()
+    print(f"Wrote {args.output}: {table['burst_altitude'].size} entries, {airburst:.0%} airbursts")
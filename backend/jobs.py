@@ -0,0 +1,317 @@
+"""
+In-process job queue for work that does not fit in one HTTP response.
+
+Jobs are queued on a bounded asyncio queue and run by a fixed number of
+worker tasks, so a burst of large submissions is rejected (JobQueueFull)
+instead of piling up, and interactive endpoints keep their share of the
+event loop and process pool. A running job appends result chunks as they
+are computed; readers can stream them while the job is still running.
+
+Result chunks are written to files (one per chunk) as they are emitted and
+read back by each reader, so a large job or a slow reader holds no results
+in memory. The files of all jobs together are capped at
+MAX_JOB_RESULT_BYTES: once it is reached, submissions are rejected and a
+job that would exceed it fails.
+"""
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Jobs running concurrently (each keeps at most a few chunks in the process pool)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+
+# Jobs waiting for a worker before submissions are rejected
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 16))
+
+# Seconds a finished job (and its results) is kept
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 60 * 60))
+
+# Directory holding the result files (default: a temporary directory per process)
+JOB_RESULTS_DIR = os.getenv("JOB_RESULTS_DIR")
+
+# Result bytes kept on disk across all jobs
+MAX_JOB_RESULT_BYTES = int(os.getenv("MAX_JOB_RESULT_BYTES", 8 << 30))
+
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when a job is submitted while the queue or the result storage is
+    at capacity.
+    """
+
+
+class JobResultsFull(Exception):
+    """
+    Raised when a job emits results beyond MAX_JOB_RESULT_BYTES.
+    """
+
+
+class Job:
+    """
+    A unit of background work and the result chunks it has produced so far.
+
+    Each chunk is either a list of JSON-ready records or a dict of equally
+    long NumPy columns. Chunks are stored as files in a directory of the
+    job's own under `results_dir`; `chunks` holds their paths. `reserve` is
+    called with the size of every chunk before it is written, and raises
+    JobResultsFull if there is no room for it.
+    """
+
+    def __init__(self, kind: str, run: Callable[["Job"], Awaitable[None]], results_dir: str,
+                 reserve: Callable[[int], None]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.directory = os.path.join(results_dir, self.id)
+        self.chunks: List[str] = []
+        self.records = 0
+        self.result_bytes = 0
+        self._reserve = reserve
+        self._run = run
+        self._task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def emit_records(self, records: List[Dict]):
+        """
+        Append a chunk of JSON-ready records.
+        """
+        if records:
+            payload = json.dumps(records).encode()
+            self._reserve(len(payload))
+            with open(self._chunk_path(".json"), "wb") as f:
+                f.write(payload)
+            self._add_chunk(f.name, len(records), len(payload))
+
+    def emit_columns(self, columns: Dict[str, np.ndarray]):
+        """
+        Append a chunk of NumPy columns (one record per row).
+        """
+        rows = len(next(iter(columns.values()))) if columns else 0
+        if rows:
+            self._reserve(sum(values.nbytes for values in columns.values()))
+            path = self._chunk_path(".npz")
+            np.savez(path, **columns)
+            self._add_chunk(path, rows, os.path.getsize(path))
+
+    def read_chunk(self, index: int) -> Any:
+        """
+        Load result chunk `index` (records or columns, as emitted).
+        """
+        path = self.chunks[index]
+        if path.endswith(".npz"):
+            with np.load(path, allow_pickle=False) as data:
+                return {key: data[key] for key in data.files}
+        with open(path) as f:
+            return json.load(f)
+
+    def discard(self):
+        """
+        Delete the result files.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def set_progress(self, done: float, total: float):
+        self.progress = min(1.0, done / total) if total else 1.0
+        self._notify()
+
+    async def wait_for_chunk(self, index: int):
+        """
+        Wait until chunk `index` exists or the job has finished.
+        """
+        while len(self.chunks) <= index and not self.finished:
+            changed = self._changed
+            await changed.wait()
+
+    def status_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result_chunks": len(self.chunks),
+            "result_records": self.records,
+        }
+
+    def _chunk_path(self, suffix: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{len(self.chunks)}{suffix}")
+
+    def _add_chunk(self, path: str, rows: int, size: int):
+        self.chunks.append(path)
+        self.records += rows
+        self.result_bytes += size
+        self._notify()
+
+    def _notify(self):
+        # Wake every waiter, then start a fresh event for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _finish(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        if status == "succeeded":
+            self.progress = 1.0
+        self._notify()
+
+
+class JobManager:
+    """
+    Bounded queue of jobs served by a fixed pool of worker tasks.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = MAX_QUEUED_JOBS,
+                 result_ttl: int = JOB_RESULT_TTL, results_dir: Optional[str] = JOB_RESULTS_DIR,
+                 max_result_bytes: int = MAX_JOB_RESULT_BYTES):
+        self.jobs: Dict[str, Job] = {}
+        self.result_ttl = result_ttl
+        self.max_result_bytes = max_result_bytes
+        if results_dir is not None:
+            os.makedirs(results_dir, exist_ok=True)
+        self.results_dir = tempfile.mkdtemp(prefix="jobs-", dir=results_dir)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._closing = False
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(workers)]
+
+    def submit(self, kind: str, run: Callable[[Job], Awaitable[None]]) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            kind: Job type label
+            run: Coroutine function doing the work; receives the Job to
+                report progress and emit results
+
+        Raises:
+            JobQueueFull: If too many jobs are already waiting, or the
+                results kept on disk reach MAX_JOB_RESULT_BYTES
+        """
+        self._expire()
+        if self.result_bytes() >= self.max_result_bytes:
+            raise JobQueueFull(f"Job result storage is full ({self.max_result_bytes} bytes); "
+                               "wait for finished jobs to expire")
+        job = Job(kind, run, self.results_dir, self._reserve)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs waiting)")
+        self.jobs[job.id] = job
+        return job
+
+    def result_bytes(self) -> int:
+        """
+        Bytes of result files kept across all jobs.
+        """
+        return sum(job.result_bytes for job in self.jobs.values())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        self._expire()
+        return sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job (finished jobs are left unchanged).
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            job._finish("cancelled")
+        return job
+
+    async def close(self):
+        """
+        Cancel all jobs and stop the workers.
+        """
+        self._closing = True
+        for job in list(self.jobs.values()):
+            self.cancel(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        shutil.rmtree(self.results_dir, ignore_errors=True)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+                job._task = asyncio.create_task(job._run(job))
+                try:
+                    await job._task
+                    job._finish("succeeded")
+                except asyncio.CancelledError:
+                    job._finish("cancelled")
+                    if self._closing or not job._task.cancelled():
+                        raise  # the worker itself is being cancelled
+                except Exception as e:
+                    job._finish("failed", str(e))
+            finally:
+                self._queue.task_done()
+
+    def _reserve(self, size: int):
+        if self.result_bytes() + size > self.max_result_bytes:
+            raise JobResultsFull(f"Job result storage is full ({self.max_result_bytes} bytes)")
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            self.jobs.pop(job_id).discard()
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Return the process-wide job manager, creating it on first use.
+
+    Must be called from within the running event loop.
+    """
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
+
+
+async def close_job_manager():
+    """
+    Cancel outstanding jobs (called on application shutdown).
+    """
+    global _manager
+    if _manager is not None:
+        await _manager.close()
+        _manager = None
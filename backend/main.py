@@ -1,12 +1,82 @@
-from fastapi import FastAPI
+import time
+
+# Start of the app import, the reference for the startup time reported by /ready
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from typing import Dict
+import asyncio
+import os
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from routers import simulation, asteroids, deflection
+from fastapi.responses import JSONResponse
+from routers import simulation, asteroids, deflection, orbits, jobs, terrain
+import cache
+import jobs as job_queue
+import metrics
+import nasa_client
+import process_pool
+import result_cache
 import uvicorn
 
+def _open_datasets() -> Dict[str, bool]:
+    """
+    Open the array datasets and import the dependencies that load lazily
+    (SQLAlchemy, scipy). Holds no connections or threads, so serve.py
+    calls it once before forking the workers.
+
+    Returns:
+        Which optional datasets are built
+    """
+    import catalog  # noqa: F401
+    from cities import get_city_index
+    from coastline import get_coastline
+    from entry import get_entry_table
+    from population_grid import get_population_grid
+    from terrain import get_terrain_grid
+    get_city_index()
+    return {
+        "population_grid": get_population_grid() is not None,
+        "terrain": get_terrain_grid() is not None,
+        "entry_table": get_entry_table() is not None,
+        "coastline": get_coastline() is not None,
+    }
+
+def _load_datasets() -> Dict[str, bool]:
+    """
+    Open every dataset, so that no request pays for loading one.
+
+    Returns:
+        Which optional datasets are built
+    """
+    from catalog import get_catalog
+    datasets = _open_datasets()
+    # The catalog's database connections are per process
+    get_catalog()
+    return datasets
+
+async def _warm_up() -> Dict[str, object]:
+    datasets = await asyncio.to_thread(_load_datasets)
+    return {"datasets": datasets, "startup_seconds": time.perf_counter() - _IMPORT_STARTED}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Datasets load in the background: /health answers as soon as the
+    # worker accepts connections, /ready once the datasets are open
+    app.state.warm_up = asyncio.ensure_future(_warm_up())
+    yield
+    app.state.warm_up.cancel()
+    await job_queue.close_job_manager()
+    cache.close_cache()
+    result_cache.close_result_cache()
+    await nasa_client.close_client()
+    process_pool.shutdown_executor()
+
 app = FastAPI(
     title="Asteroid Impact Simulator API",
     description="Backend API for asteroid impact simulation and planetary defense",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -18,10 +88,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latency per route, exported at /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
 app.include_router(asteroids.router, prefix="/api/asteroids", tags=["asteroids"])
 app.include_router(deflection.router, prefix="/api/deflection", tags=["deflection"])
+app.include_router(orbits.router, prefix="/api/orbits", tags=["orbits"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(terrain.router, prefix="/api/terrain", tags=["terrain"])
 
 @app.get("/")
 async def root():
@@ -31,9 +107,69 @@ async def root():
         "docs": "/docs"
     }
 
+def _runtime_metrics():
+    """
+    Cache and job queue state, read when /metrics is scraped.
+    """
+    cache_events = metrics.Counter("neo_cache_events_total", "NEO response cache lookups and refreshes", ("event",))
+    cache_entries = metrics.Gauge("neo_cache_entries", "Entries held by the NEO response cache", ("tier",))
+    stats = cache.get_cache().stats()
+    for event in ("memory_hits", "disk_hits", "stale_hits", "misses", "refreshes", "refresh_errors"):
+        cache_events.inc(event, amount=stats[event])
+    cache_entries.set("memory", value=stats["memory_entries"])
+    cache_entries.set("disk", value=stats["disk_entries"])
+
+    results = metrics.Counter("result_cache_events_total", "Simulation result cache lookups and evictions", ("event",))
+    result_stats = result_cache.get_result_cache().stats()
+    for event in ("memory_hits", "disk_hits", "misses", "evictions"):
+        results.inc(event, amount=result_stats[event])
+    results_bytes = metrics.Gauge("result_cache_memory_bytes", "Bytes held by the in-process result cache")
+    results_bytes.set(value=result_stats["memory_bytes"])
+
+    jobs = metrics.Gauge("jobs", "Background jobs by status", ("status",))
+    manager = job_queue.get_job_manager()
+    for job in manager.list():
+        jobs.inc(job.status)
+    job_bytes = metrics.Gauge("job_result_bytes", "Bytes of job results kept on disk")
+    job_bytes.set(value=manager.result_bytes())
+
+    upstream = nasa_client.get_client().scheduler.stats()
+    quota = metrics.Gauge("nasa_quota_tokens", "NASA API requests the scheduler may still make")
+    quota.set(value=upstream["tokens"])
+    queued = metrics.Gauge("nasa_queued_requests", "NASA API requests waiting for quota", ("priority",))
+    queued.set("interactive", value=upstream["queued_interactive"])
+    queued.set("background", value=upstream["queued_background"])
+    scheduler = metrics.Counter("nasa_scheduler_events_total", "NASA API scheduler grants, timeouts and 429s", ("event",))
+    for event in ("granted", "timeouts", "rate_limited"):
+        scheduler.inc(event, amount=upstream[event])
+    return [cache_events, cache_entries, results, results_bytes, jobs, job_bytes, quota, queued, scheduler]
+
+metrics.REGISTRY.add_collector(_runtime_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Metrics in the Prometheus text exposition format.
+    """
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness, as opposed to liveness (/health): 200 once this worker has
+    opened its datasets, 503 while they are loading or if loading failed.
+    """
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is None or not warm_up.done():
+        return JSONResponse({"status": "starting"}, status_code=503)
+    if warm_up.cancelled() or warm_up.exception() is not None:
+        error = "cancelled" if warm_up.cancelled() else str(warm_up.exception())
+        return JSONResponse({"status": "failed", "error": error}, status_code=503)
+    return {"status": "ready", "pid": os.getpid(), **warm_up.result()}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
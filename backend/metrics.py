@@ -0,0 +1,296 @@
+"""
+Process-local metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are kept in plain dicts keyed by label
+values, so recording a sample is a dict lookup and a few additions and can
+stay enabled in production. `render()` produces the `/metrics` payload.
+
+Each uvicorn worker process keeps its own metrics; scrape every worker (or
+sum them in the query) when running with several workers.
+"""
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds (upper bounds; +Inf is implied)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2, 0.1)
+
+# Upstream NASA paths are reported by template, not by object id
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Base class: a named metric family with a fixed set of label names.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple) -> Tuple:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {labels}")
+        return tuple(str(value) for value in labels)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value: float):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram with fixed bucket upper bounds.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = REQUEST_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last = +Inf), then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = [(key, list(state[0]), state[1]) for key, state in sorted(self._values.items())]
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, key)} {cumulative}"
+
+
+class Registry:
+    """
+    A set of metric families plus collectors evaluated at render time.
+
+    Collectors return already-built metrics, for values that live elsewhere
+    (e.g. cache counters) and are only read when scraped.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = REQUEST_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        families = list(self.metrics.values())
+        for collector in self.collectors:
+            families.extend(collector())
+        return "\n".join(metric.render() for metric in families) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method", ("route", "method"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served")
+
+NASA_REQUESTS = REGISTRY.counter(
+    "nasa_requests_total", "Upstream NASA API attempts by path template and outcome", ("path", "outcome"))
+NASA_LATENCY = REGISTRY.histogram(
+    "nasa_request_duration_seconds", "Upstream NASA API attempt latency by path template", ("path",))
+NASA_RATE_LIMIT = REGISTRY.gauge(
+    "nasa_rate_limit", "Last NASA API quota reported in X-RateLimit headers", ("kind",))
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "simulation_stage_duration_seconds", "Time spent in each simulation pipeline stage", ("stage",),
+    buckets=STAGE_BUCKETS)
+
+PROCESS_START = REGISTRY.gauge("process_start_time_seconds", "Start time of the process since the Unix epoch")
+PROCESS_START.set(value=time.time())
+
+
+def nasa_path(path: str) -> str:
+    """
+    Path template for an upstream NASA path ("/neo/3542519" -> "/neo/{id}").
+    """
+    return _NUMERIC_SEGMENT.sub("/{id}", path)
+
+
+def record_nasa_response(path: str, elapsed: float, status: Optional[int], headers: Optional[Dict] = None):
+    """
+    Record one upstream NASA attempt.
+
+    Args:
+        path: Request path relative to the NeoWs base URL
+        elapsed: Attempt duration in seconds
+        status: HTTP status, or None if the request did not complete
+        headers: Response headers (for X-RateLimit-Limit / X-RateLimit-Remaining)
+    """
+    template = nasa_path(path)
+    NASA_LATENCY.observe(template, value=elapsed)
+    if status is None:
+        outcome = "transport_error"
+    elif status == 429:
+        outcome = "rate_limited"
+    elif status >= 400:
+        outcome = "error"
+    else:
+        outcome = "ok"
+    NASA_REQUESTS.inc(template, outcome)
+    if headers:
+        for kind in ("limit", "remaining"):
+            value = headers.get(f"X-RateLimit-{kind.capitalize()}")
+            if value is not None:
+                try:
+                    NASA_RATE_LIMIT.set(kind, value=float(value))
+                except ValueError:
+                    pass
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a simulation stage into simulation_stage_duration_seconds.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(name, value=time.perf_counter() - start)
+
+
+def _route_template(scope) -> str:
+    """
+    Full path template of the route that served a request, or "unmatched".
+    """
+    # Newer FastAPI resolves included routers lazily; the matched route then
+    # only knows its path relative to the router prefix
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None and getattr(context, "path_format", None):
+        return context.path_format
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latency and in-flight requests.
+
+    Requests are labelled by route template (e.g. "/api/asteroids/neo/{asteroid_id}")
+    so that path parameters do not create unbounded label sets; requests
+    that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            template = _route_template(scope)
+            HTTP_LATENCY.observe(template, scope["method"], value=time.perf_counter() - start)
+            HTTP_REQUESTS.inc(template, scope["method"], status)
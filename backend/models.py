@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 class ImpactLocation(BaseModel):
     lat: float = Field(..., ge=-90, le=90, description="Latitude")
@@ -11,12 +11,25 @@ class ImpactParameters(BaseModel):
     velocity: float = Field(..., gt=0, description="Velocity in km/s")
     angle: float = Field(..., ge=0, le=90, description="Entry angle in degrees")
     impact_location: ImpactLocation
-    is_water_impact: Optional[bool] = False
+    is_water_impact: Optional[bool] = Field(None, description="Water impact (derived from the terrain grid if omitted)")
+
+class TerrainResult(BaseModel):
+    is_water_impact: bool
+    elevation: Optional[float] = Field(None, description="Surface elevation in meters (negative below sea level; null without a terrain grid)")
+    water_depth: float = Field(..., description="Water depth used for the tsunami, meters (0 on land)")
 
 class EnergyResult(BaseModel):
     joules: float
     megatons_tnt: float
 
+class EntryResult(BaseModel):
+    is_airburst: bool
+    burst_altitude: float = Field(..., description="Airburst altitude in meters (0 for a ground impact)")
+    breakup_altitude: float = Field(..., description="Breakup altitude in meters (0 if the body stays intact)")
+    airburst_energy_mt: float = Field(..., description="Energy deposited in the atmosphere, megatons TNT")
+    ground_energy_mt: float = Field(..., description="Energy delivered to the ground, megatons TNT")
+    impact_velocity: float = Field(..., description="Velocity at the ground in km/s (0 for an airburst)")
+
 class CraterResult(BaseModel):
     diameter: float
     depth: float
@@ -28,6 +41,9 @@ class SeismicResult(BaseModel):
 class TsunamiResult(BaseModel):
     wave_height: float
     affected_radius: float
+    affected_coast_points: Optional[int] = Field(None, description="Coastline points reached (null without a coastline dataset)")
+    first_arrival: Optional[float] = Field(None, description="Minutes until the wave reaches the first coast")
+    inundated_population: Optional[int] = Field(None, description="Coastal population living below the run-up height")
 
 class AtmosphericResult(BaseModel):
     fireball_radius: float
@@ -39,13 +55,149 @@ class CasualtiesResult(BaseModel):
     affected_population: int
 
 class ImpactResults(BaseModel):
+    terrain: Optional[TerrainResult] = None
     energy: EnergyResult
+    entry: Optional[EntryResult] = None
     crater: CraterResult
     seismic: SeismicResult
     tsunami: Optional[TsunamiResult] = None
     atmospheric: AtmosphericResult
     casualties: Optional[CasualtiesResult] = None
 
+class ImpactParameterColumns(BaseModel):
+    """Columnar form of ImpactParameters for batch requests (one entry per scenario)."""
+    size: List[float] = Field(..., description="Asteroid sizes in meters")
+    density: List[float] = Field(..., description="Densities in kg/m³")
+    velocity: List[float] = Field(..., description="Velocities in km/s")
+    angle: List[float] = Field(..., description="Entry angles in degrees")
+    lat: List[float] = Field(..., description="Impact latitudes")
+    lng: List[float] = Field(..., description="Impact longitudes")
+    is_water_impact: Optional[List[Optional[bool]]] = Field(None, description="Water impacts (null entries are derived from the terrain grid)")
+
+class BatchImpactRequest(BaseModel):
+    scenarios: Optional[List[ImpactParameters]] = None
+    columns: Optional[ImpactParameterColumns] = None
+    include_cities: bool = Field(False, description="Add per-scenario totals over affected cities")
+
+class BatchTerrainResult(BaseModel):
+    is_water_impact: List[bool]
+    elevation: List[Optional[float]]
+    water_depth: List[float]
+
+class BatchEnergyResult(BaseModel):
+    joules: List[float]
+    megatons_tnt: List[float]
+
+class BatchEntryResult(BaseModel):
+    is_airburst: List[bool]
+    burst_altitude: List[float]
+    breakup_altitude: List[float]
+    airburst_energy_mt: List[float]
+    ground_energy_mt: List[float]
+    impact_velocity: List[float]
+
+class BatchCraterResult(BaseModel):
+    diameter: List[float]
+    depth: List[float]
+
+class BatchSeismicResult(BaseModel):
+    magnitude: List[float]
+    radius: List[float]
+
+class BatchTsunamiResult(BaseModel):
+    wave_height: List[Optional[float]]
+    affected_radius: List[Optional[float]]
+
+class BatchAtmosphericResult(BaseModel):
+    fireball_radius: List[float]
+    thermal_radiation: List[float]
+    overpressure: List[float]
+
+class BatchCasualtiesResult(BaseModel):
+    estimated: List[int]
+    affected_population: List[int]
+
+class BatchCityResult(BaseModel):
+    affected: List[int]
+    population: List[int]
+    estimated_casualties: List[int]
+
+class BatchImpactResults(BaseModel):
+    """Columnar ImpactResults; tsunami entries are null for land impacts."""
+    count: int
+    terrain: Optional[BatchTerrainResult] = None
+    energy: BatchEnergyResult
+    entry: Optional[BatchEntryResult] = None
+    crater: BatchCraterResult
+    seismic: BatchSeismicResult
+    tsunami: BatchTsunamiResult
+    atmospheric: BatchAtmosphericResult
+    casualties: BatchCasualtiesResult
+    cities: Optional[BatchCityResult] = None
+
+class CoastalImpactPoints(BaseModel):
+    """Coastline points reached by a tsunami, column-wise in order of arrival."""
+    lat: List[float]
+    lng: List[float]
+    distance_km: List[float] = Field(..., description="Length of the ocean path from the impact in km")
+    arrival_time: List[float] = Field(..., description="Minutes after impact")
+    wave_height: List[float] = Field(..., description="Wave height (run-up) in meters")
+    inundated_population: Optional[List[float]] = None
+
+class CoastalImpactResults(BaseModel):
+    is_water_impact: bool
+    wave_height: Optional[float] = None
+    affected_radius: Optional[float] = None
+    affected_coast_points: int
+    first_arrival: Optional[float] = Field(None, description="Minutes until the wave reaches the first coast")
+    inundated_population: Optional[int] = None
+    coast: CoastalImpactPoints
+
+class CityImpact(BaseModel):
+    name: str
+    country: str
+    lat: float
+    lng: float
+    population: int
+    distance_km: float
+    zones: List[str] = Field(..., description="Effect zones reaching the city")
+    estimated_casualties: int
+
+class CityImpactResults(BaseModel):
+    radii: Dict[str, float] = Field(..., description="Effect radius per zone in km")
+    cities: List[CityImpact]
+    total_population: int
+    estimated_casualties: int
+
+class DistributionSpec(BaseModel):
+    kind: str = Field("fixed", description="Type: fixed, normal, lognormal, uniform, or empirical")
+    value: Optional[float] = Field(None, description="Value for fixed distributions")
+    mean: Optional[float] = Field(None, description="Mean (normal) or mean of ln(x) (lognormal)")
+    std: Optional[float] = Field(None, ge=0, description="Standard deviation (normal) or of ln(x) (lognormal)")
+    low: Optional[float] = Field(None, description="Lower bound for uniform distributions")
+    high: Optional[float] = Field(None, description="Upper bound for uniform distributions")
+    samples: Optional[List[float]] = Field(None, description="Observed values for empirical distributions")
+
+class MonteCarloRequest(BaseModel):
+    size: DistributionSpec
+    density: DistributionSpec
+    velocity: DistributionSpec
+    angle: DistributionSpec
+    lat: DistributionSpec
+    lng: DistributionSpec
+    is_water_impact: Optional[bool] = Field(None, description="Water impact for every draw (derived per draw from the terrain grid if omitted)")
+    n_samples: int = Field(100_000, ge=1, le=2_000_000, description="Number of Monte Carlo draws")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed (generated and returned if omitted)")
+    percentiles: List[float] = Field([5, 25, 50, 75, 95], description="Percentiles to report (0-100)")
+    include_cities: bool = Field(False, description="Add bands for affected cities and their casualties")
+
+class MonteCarloResults(BaseModel):
+    n_samples: int
+    seed: int
+    percentiles: List[float]
+    bands: Dict[str, Dict[str, List[float]]] = Field(..., description="Percentile values per ImpactResults field")
+    mean: Dict[str, Dict[str, float]]
+
 class OrbitalData(BaseModel):
     a: float  # semi-major axis (AU)
     e: float  # eccentricity
@@ -53,14 +205,135 @@ class OrbitalData(BaseModel):
     omega: float  # argument of periapsis (degrees)
     Omega: float  # longitude of ascending node (degrees)
     M: float  # mean anomaly (degrees)
+    epoch: Optional[float] = None  # epoch of M (Julian date)
+
+class EphemerisRequest(BaseModel):
+    orbits: Optional[List[OrbitalData]] = Field(None, description="Element sets (epoch defaults to start)")
+    asteroid_ids: Optional[List[str]] = Field(None, description="Catalog IDs to propagate")
+    start: float = Field(..., description="First epoch (Julian date)")
+    stop: float = Field(..., description="Last epoch (Julian date)")
+    steps: int = Field(100, ge=1, le=10000, description="Number of evenly spaced epochs")
+    format: str = Field("binary", description="binary (little-endian float32 array) or json")
+
+class SweepRange(BaseModel):
+    values: Optional[List[float]] = Field(None, description="Explicit values (instead of min/max/steps)")
+    min: Optional[float] = Field(None, description="First value")
+    max: Optional[float] = Field(None, description="Last value")
+    steps: int = Field(1, ge=1, le=1_000_000, description="Number of evenly spaced values")
+    log: bool = Field(False, description="Space values logarithmically")
+
+class GridAxis(BaseModel):
+    parameter: str = Field(..., description="Swept parameter: size, density, velocity, angle, lat or lng")
+    sweep: SweepRange
+
+class GridRequest(BaseModel):
+    base: ImpactParameters = Field(..., description="Values of the parameters that are not swept")
+    x: GridAxis = Field(..., description="Parameter along the columns of each surface")
+    y: GridAxis = Field(..., description="Parameter along the rows of each surface")
+    fields: List[str] = Field(
+        ["energy.megatons_tnt", "crater.diameter", "casualties.estimated"],
+        description="Result columns to return, as <group>.<field>"
+    )
+    preview: Optional[int] = Field(None, ge=2, description="Evaluate at most this many points per axis (every k-th value)")
+    format: str = Field("npy", description="npy (float32 array of shape (fields, y, x)) or json")
 
 class DeflectionStrategy(BaseModel):
     type: str = Field(..., description="Type: kinetic-impactor, gravity-tractor, or laser-ablation")
     time_available: float = Field(..., description="Time available in days")
     asteroid_mass: float = Field(..., description="Asteroid mass in kg")
+    orbital_data: Optional[OrbitalData] = Field(None, description="Pre-deflection orbit (epoch required)")
+    encounter_epoch: Optional[float] = Field(None, description="Julian date of the Earth encounter")
+    direction: List[float] = Field([0.0, 1.0, 0.0], description="Push direction in the RTN frame (radial, transverse, normal)")
 
 class DeflectionResult(BaseModel):
     delta_v: float = Field(..., description="Velocity change in m/s")
     success_probability: float = Field(..., description="Probability of success (0-1)")
     required_missions: int = Field(..., description="Number of missions required")
     new_orbital_data: Optional[OrbitalData] = None
+    b_plane_miss_distance_km: Optional[float] = Field(None, description="Miss distance at the encounter after deflection")
+    nominal_miss_distance_km: Optional[float] = Field(None, description="Miss distance without deflection")
+    capture_radius_km: Optional[float] = Field(None, description="Miss distances below this hit Earth")
+
+class DeflectionPropagationRequest(BaseModel):
+    orbital_data: OrbitalData = Field(..., description="Pre-deflection orbit (epoch required)")
+    encounter_epoch: float = Field(..., description="Julian date of the Earth encounter")
+    lead_times: SweepRange = Field(..., description="Days between the push and the encounter")
+    directions: Optional[List[List[float]]] = Field(
+        None, description="RTN push directions (default: ± radial, along-track and normal)"
+    )
+    delta_v: Optional[float] = Field(None, gt=0, description="Fixed velocity change in m/s")
+    strategy: Optional[str] = Field(None, description="Strategy whose delta-v (for lead time as time_available) is applied")
+    asteroid_mass: Optional[float] = Field(None, gt=0, description="Asteroid mass in kg (with strategy)")
+
+class DeflectionOption(BaseModel):
+    lead_time: float
+    deflection_epoch: float
+    direction: List[float]
+    delta_v: float
+    miss_distance_km: Optional[float]
+    new_orbital_data: OrbitalData
+
+class DeflectionPropagationResults(BaseModel):
+    nominal_miss_distance_km: float
+    relative_speed_kms: float
+    capture_radius_km: float
+    lead_times: List[float]
+    directions: List[List[float]]
+    delta_v: List[float] = Field(..., description="Velocity change per lead time (m/s)")
+    miss_distance_km: List[List[Optional[float]]] = Field(..., description="Per lead time, per direction")
+    best: Optional[DeflectionOption] = Field(None, description="Option with the largest miss distance")
+
+class TradeSpaceRequest(BaseModel):
+    strategies: List[str] = Field(
+        ["kinetic-impactor", "gravity-tractor", "laser-ablation"],
+        description="Strategy types to sweep"
+    )
+    time_available: SweepRange = Field(..., description="Lead time in days")
+    asteroid_mass: SweepRange = Field(..., description="Asteroid mass in kg")
+    parameters: Dict[str, SweepRange] = Field(
+        {},
+        description="Spacecraft parameter sweeps (e.g. impactor_mass, beta, laser_power); others stay nominal"
+    )
+    limit: int = Field(1000, ge=1, le=100_000, description="Maximum frontier points returned")
+
+class TradeSpacePoint(BaseModel):
+    strategy: str
+    time_available: float
+    asteroid_mass: float
+    parameters: Dict[str, float]
+    delta_v: float
+    success_probability: float
+    required_missions: int
+
+class TradeSpaceResults(BaseModel):
+    grid_points: int
+    frontier_size: int
+    frontier: List[TradeSpacePoint] = Field(..., description="Non-dominated points per asteroid mass")
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str = Field(..., description="batch, monte-carlo, trade-space, screening or risk")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    progress: float = Field(..., description="Fraction of work done (0-1)")
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result_chunks: int = Field(..., description="Result chunks available so far")
+    result_records: int = Field(..., description="Result records available so far")
+
+class TerrainPointsRequest(BaseModel):
+    lat: List[float] = Field(..., description="Latitudes")
+    lng: List[float] = Field(..., description="Longitudes")
+
+class TerrainPoints(BaseModel):
+    is_water: List[bool]
+    elevation: List[float] = Field(..., description="Elevation in meters (negative below sea level)")
+    water_depth: List[float] = Field(..., description="Water depth in meters (0 on land)")
+
+class TerrainProfile(BaseModel):
+    distance_km: List[float] = Field(..., description="Distance from the start along the great circle")
+    lat: List[float]
+    lng: List[float]
+    elevation: List[float] = Field(..., description="Elevation in meters (negative below sea level)")
+    is_water: List[bool]
@@ -0,0 +1,299 @@
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from models import DistributionSpec, MonteCarloRequest
+from simulation import ImpactSimulator
+from cities import get_city_index
+from process_pool import get_executor
+
+# Draws per worker task. Fixed (not derived from the CPU count) so that a
+# given seed produces identical results on any machine.
+CHUNK_SIZE = 100_000
+
+# Smallest value sampled for strictly positive parameters
+POSITIVE_FLOOR = 1e-9
+
+# Relative width of the sketch buckets that percentile bands are read from
+SKETCH_ACCURACY = 1e-3
+
+# Magnitudes below this share the sketch's zero bucket
+SKETCH_MIN_MAGNITUDE = 1e-12
+
+
+class ColumnSketch:
+    """
+    Mergeable summary of one simulated column.
+    
+    Values are binned into logarithmic buckets (mirrored for negatives) whose
+    bounds are SKETCH_ACCURACY apart relatively. Each bucket keeps its count
+    and the smallest and largest value seen, so percentiles are exact when a
+    bucket holds a single distinct value and otherwise within the bucket's
+    width. Chunks are reduced to sketches as they complete, so a run never
+    holds more than one chunk of raw draws per worker.
+    """
+    
+    _LOG_GAMMA = np.log((1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY))
+    _KEY_OFFSET = int(-np.floor(np.log(SKETCH_MIN_MAGNITUDE) / _LOG_GAMMA)) + 1
+    
+    def __init__(self, keys: np.ndarray, counts: np.ndarray, lows: np.ndarray,
+                 highs: np.ndarray, total: float):
+        self.keys = keys
+        self.counts = counts
+        self.lows = lows
+        self.highs = highs
+        self.total = total
+    
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "ColumnSketch":
+        """
+        Build a sketch from raw values, ignoring NaNs.
+        """
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        values = values[~np.isnan(values)]
+        magnitude = np.abs(values)
+        keys = np.zeros(len(values), dtype=np.int64)
+        nonzero = magnitude > SKETCH_MIN_MAGNITUDE
+        keys[nonzero] = np.sign(values[nonzero]).astype(np.int64) * (
+            np.ceil(np.log(magnitude[nonzero]) / cls._LOG_GAMMA).astype(np.int64) + cls._KEY_OFFSET
+        )
+        # Keys are monotonic in the value, so sorted values give sorted keys
+        keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        return cls(keys, counts, values[starts], values[starts + counts - 1], float(values.sum()))
+    
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+    
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        """
+        Combine two sketches into one covering both sets of values.
+        """
+        if not len(other.keys):
+            return self
+        if not len(self.keys):
+            return other
+        keys = np.concatenate([self.keys, other.keys])
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        return ColumnSketch(
+            keys[starts],
+            np.add.reduceat(np.concatenate([self.counts, other.counts])[order], starts),
+            np.minimum.reduceat(np.concatenate([self.lows, other.lows])[order], starts),
+            np.maximum.reduceat(np.concatenate([self.highs, other.highs])[order], starts),
+            self.total + other.total
+        )
+    
+    def _value_at(self, rank: np.ndarray) -> np.ndarray:
+        """
+        Approximate the rank-th smallest value (0-based).
+        """
+        ends = np.cumsum(self.counts)
+        bucket = np.searchsorted(ends, rank, side="right")
+        within = rank - (ends[bucket] - self.counts[bucket])
+        spread = np.maximum(self.counts[bucket] - 1, 1)
+        return self.lows[bucket] + (self.highs[bucket] - self.lows[bucket]) * within / spread
+    
+    def percentiles(self, percentiles: List[float]) -> np.ndarray:
+        """
+        Percentiles with the same linear interpolation as np.percentile.
+        """
+        rank = np.asarray(percentiles, dtype=np.float64) / 100 * (self.count - 1)
+        below, above = np.floor(rank), np.ceil(rank)
+        low = self._value_at(below.astype(np.int64))
+        high = self._value_at(above.astype(np.int64))
+        return low + (high - low) * (rank - below)
+
+
+def validate_spec(name: str, spec: DistributionSpec):
+    """
+    Check that a distribution spec carries the parameters its kind needs.
+    
+    Raises:
+        ValueError: If the spec is incomplete or unknown
+    """
+    required = {
+        "fixed": ("value",),
+        "normal": ("mean", "std"),
+        "lognormal": ("mean", "std"),
+        "uniform": ("low", "high"),
+        "empirical": ("samples",),
+    }
+    if spec.kind not in required:
+        raise ValueError(f"Unknown distribution '{spec.kind}' for {name}")
+    missing = [field for field in required[spec.kind] if getattr(spec, field) is None]
+    if missing:
+        raise ValueError(f"{name}: {spec.kind} distribution requires {', '.join(missing)}")
+    if spec.kind == "uniform" and spec.high < spec.low:
+        raise ValueError(f"{name}: uniform distribution requires low <= high")
+    if spec.kind == "empirical" and not spec.samples:
+        raise ValueError(f"{name}: empirical distribution requires at least one sample")
+
+
+def sample(spec: Dict, n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw n values from a distribution spec.
+    
+    Args:
+        spec: DistributionSpec as a plain dict
+        n: Number of draws
+        rng: NumPy random generator
+        
+    Returns:
+        Array of n samples
+    """
+    kind = spec["kind"]
+    if kind == "fixed":
+        return np.full(n, spec["value"], dtype=np.float64)
+    if kind == "normal":
+        return rng.normal(spec["mean"], spec["std"], n)
+    if kind == "lognormal":
+        return rng.lognormal(spec["mean"], spec["std"], n)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], n)
+    return rng.choice(np.asarray(spec["samples"], dtype=np.float64), n)
+
+
+def sample_inputs(specs: Dict[str, Dict], n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Draw a chunk of ImpactParameters, clipped to their valid ranges.
+    """
+    # Draw order is fixed so that seeds stay reproducible
+    size = np.maximum(sample(specs["size"], n, rng), POSITIVE_FLOOR)
+    density = np.maximum(sample(specs["density"], n, rng), POSITIVE_FLOOR)
+    velocity = np.maximum(sample(specs["velocity"], n, rng), POSITIVE_FLOOR)
+    angle = np.clip(sample(specs["angle"], n, rng), 0, 90)
+    lat = np.clip(sample(specs["lat"], n, rng), -90, 90)
+    lng = (sample(specs["lng"], n, rng) + 180) % 360 - 180
+    return {"size": size, "density": density, "velocity": velocity,
+            "angle": angle, "lat": lat, "lng": lng}
+
+
+def simulate_chunk(specs: Dict[str, Dict], n: int, seed_seq: np.random.SeedSequence,
+                   is_water: Optional[bool], include_cities: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Sample and simulate one chunk of draws (runs inside a worker process).
+    """
+    rng = np.random.default_rng(seed_seq)
+    inputs = sample_inputs(specs, n, rng)
+    results = ImpactSimulator.simulate_batch(
+        inputs["size"],
+        inputs["density"],
+        inputs["velocity"],
+        None if is_water is None else np.full(n, is_water, dtype=bool),
+        inputs["lat"],
+        inputs["lng"],
+        inputs["angle"]
+    )
+    if include_cities:
+        totals = get_city_index().city_casualties_batch(
+            inputs["lat"], inputs["lng"], ImpactSimulator.effect_radii(results)
+        )
+        for key, values in totals.items():
+            results[f"cities.{key}"] = values
+    return results
+
+
+def sketch_chunk(specs: Dict[str, Dict], n: int, seed_seq: np.random.SeedSequence,
+                 is_water: Optional[bool], include_cities: bool = False) -> Dict[str, ColumnSketch]:
+    """
+    Simulate one chunk and reduce each column to a sketch (runs inside a worker process).
+    """
+    results = simulate_chunk(specs, n, seed_seq, is_water, include_cities)
+    return {key: ColumnSketch.from_values(values) for key, values in results.items()}
+
+
+def summarize(sketches: Dict[str, ColumnSketch], percentiles: List[float]) -> Dict[str, Dict]:
+    """
+    Reduce merged column sketches to percentile bands and means.
+    
+    Returns:
+        Dict with "bands" and "mean", both nested as group -> field
+    """
+    bands: Dict[str, Dict[str, List[float]]] = {}
+    means: Dict[str, Dict[str, float]] = {}
+    for key, sketch in sketches.items():
+        # Tsunami columns are NaN for draws landing on land: bands cover water draws
+        if sketch.count == 0:
+            continue
+        group, field = key.split(".")
+        bands.setdefault(group, {})[field] = sketch.percentiles(percentiles).tolist()
+        means.setdefault(group, {})[field] = sketch.mean
+    return {"bands": bands, "mean": means}
+
+
+async def run_monte_carlo(
+    request: MonteCarloRequest,
+    progress: Optional[Callable[[int, int], None]] = None,
+    max_in_flight: Optional[int] = None
+) -> Dict:
+    """
+    Run a Monte Carlo simulation across the process pool.
+    
+    Draws are split into fixed-size chunks seeded from one SeedSequence,
+    simulated in parallel without blocking the event loop, and reduced to
+    column sketches as they complete; the merged sketches give the
+    percentile bands.
+    
+    Args:
+        request: Monte Carlo request with input distributions
+        progress: Called with (draws done, total draws) after each chunk
+        max_in_flight: Chunks queued in the process pool at once (None = all)
+        
+    Returns:
+        Dict matching MonteCarloResults
+    """
+    names = ("size", "density", "velocity", "angle", "lat", "lng")
+    for name in names:
+        validate_spec(name, getattr(request, name))
+    if any(p < 0 or p > 100 for p in request.percentiles):
+        raise ValueError("Percentiles must be between 0 and 100")
+    
+    specs = {name: getattr(request, name).model_dump() for name in names}
+    seed = request.seed if request.seed is not None else int(np.random.SeedSequence().entropy % (2 ** 63))
+    n = request.n_samples
+    
+    sizes = [CHUNK_SIZE] * (n // CHUNK_SIZE)
+    if n % CHUNK_SIZE:
+        sizes.append(n % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    done = np.cumsum(sizes)
+    
+    executor = get_executor()
+    window = max_in_flight or len(sizes)
+    
+    def submit(index):
+        return asyncio.wrap_future(executor.submit(
+            sketch_chunk, specs, sizes[index], seeds[index],
+            request.is_water_impact, request.include_cities
+        ))
+    
+    futures = [submit(index) for index in range(min(window, len(sizes)))]
+    sketches: Dict[str, ColumnSketch] = {}
+    try:
+        for index in range(len(sizes)):
+            chunk = await futures[index]
+            if index + window < len(sizes):
+                futures.append(submit(index + window))
+            for key, sketch in chunk.items():
+                sketches[key] = sketches[key].merge(sketch) if key in sketches else sketch
+            if progress is not None:
+                progress(int(done[index]), n)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    
+    summary = await asyncio.to_thread(summarize, sketches, request.percentiles)
+    return {
+        "n_samples": n,
+        "seed": seed,
+        "percentiles": request.percentiles,
+        **summary
+    }
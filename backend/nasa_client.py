@@ -0,0 +1,397 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+import metrics
+
+NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")  # Replace with actual API key
+NASA_BASE_URL = os.getenv("NASA_BASE_URL", "https://api.nasa.gov/neo/rest/v1")
+
+# Upstream statuses worth retrying (rate limiting and server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests per RATE_LIMIT_WINDOW the key may make until NASA's
+# X-RateLimit-Limit header says otherwise (DEMO_KEY allows 30 per hour)
+NASA_RATE_LIMIT = int(os.getenv("NASA_RATE_LIMIT", 30 if NASA_API_KEY == "DEMO_KEY" else 1000))
+RATE_LIMIT_WINDOW = 60 * 60  # seconds
+
+# Upstream requests in flight at once
+NASA_MAX_CONCURRENCY = int(os.getenv("NASA_MAX_CONCURRENCY", 8))
+
+# Share of the quota background requests may not use, kept for interactive ones
+NASA_BACKGROUND_RESERVE = float(os.getenv("NASA_BACKGROUND_RESERVE", 0.2))
+
+# Seconds an interactive request waits for quota before failing with a 429
+NASA_INTERACTIVE_MAX_WAIT = float(os.getenv("NASA_INTERACTIVE_MAX_WAIT", 10.0))
+
+# Longest sleep before retrying after a 429, whatever Retry-After asks for
+MAX_RETRY_SLEEP = 30.0  # seconds
+
+# Request priorities (lower is served first)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Priority of upstream requests made from the current task; background
+# work (catalog ingest, cache refreshes) sets it to BACKGROUND
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+class NASAAPIError(Exception):
+    """
+    Raised when the NASA API cannot be reached or returns an error.
+    """
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class QuotaExhausted(NASAAPIError):
+    """
+    Raised when an interactive request cannot get API quota in time, or
+    NASA still answers 429 after all retries.
+    
+    `retry_after` estimates the seconds until quota is available (None if unknown).
+    """
+    
+    def __init__(self, message: str = "NASA API rate limit exhausted", retry_after: Optional[float] = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("future", "priority")
+    
+    def __init__(self, future: asyncio.Future, priority: int):
+        self.future = future
+        self.priority = priority
+
+
+class UpstreamScheduler:
+    """
+    Token bucket and priority queue in front of every upstream attempt.
+    
+    The bucket holds the requests the API key may still make. It refills at
+    limit / RATE_LIMIT_WINDOW per second and is re-synced from the
+    X-RateLimit-Limit / X-RateLimit-Remaining headers of every response
+    (NASA's count is authoritative). A 429 empties it.
+    
+    Requests wait in a priority queue: interactive requests are always
+    served before background ones, and background requests leave a reserve
+    of the quota untouched. At most `max_concurrency` requests are in
+    flight at once.
+    """
+    
+    def __init__(self, rate_limit: int = NASA_RATE_LIMIT, window: float = RATE_LIMIT_WINDOW,
+                 max_concurrency: int = NASA_MAX_CONCURRENCY, background_reserve: float = NASA_BACKGROUND_RESERVE):
+        self.window = window
+        self.max_concurrency = max_concurrency
+        self.background_reserve = background_reserve
+        self.capacity = float(rate_limit)
+        self.tokens = float(rate_limit)
+        self.in_flight = 0
+        self._updated = time.monotonic()
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.metrics = {"granted": 0, "timeouts": 0, "rate_limited": 0}
+    
+    async def acquire(self, waiter: "_Waiter", timeout: Optional[float] = None):
+        """
+        Wait for a token and a concurrency slot.
+        
+        Args:
+            waiter: Created with `waiter()`; its priority may be raised while
+                it waits (see `promote`)
+            timeout: Seconds to wait before raising QuotaExhausted (None = no limit)
+        """
+        self._push(waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self.metrics["timeouts"] += 1
+                raise QuotaExhausted(retry_after=self.retry_after(waiter.priority))
+        except asyncio.CancelledError:
+            if not waiter.future.cancel():
+                self.release()  # granted just before the cancellation
+            raise
+    
+    def waiter(self, priority: int) -> _Waiter:
+        return _Waiter(asyncio.get_running_loop().create_future(), priority)
+    
+    def promote(self, waiter: _Waiter, priority: int):
+        """
+        Raise the priority of a queued request (e.g. when an interactive
+        caller joins a background request for the same resource).
+        """
+        if priority < waiter.priority and not waiter.future.done():
+            waiter.priority = priority
+            self._push(waiter)
+            self._dispatch()
+    
+    def release(self, status: Optional[int] = None, headers: Optional[Dict] = None):
+        """
+        Return the concurrency slot of a finished attempt and sync the
+        bucket with the response.
+        """
+        self.in_flight -= 1
+        if headers:
+            limit = _header_number(headers.get("X-RateLimit-Limit"))
+            if limit:
+                self.capacity = limit
+            remaining = _header_number(headers.get("X-RateLimit-Remaining"))
+            if remaining is not None:
+                self._refill()
+                # Requests still in flight have not been counted by NASA yet,
+                # and responses overtaking each other may carry a stale count,
+                # so the header only raises the estimate when nothing else is
+                # in flight
+                synced = min(self.capacity, remaining - self.in_flight)
+                self.tokens = max(0.0, synced if self.in_flight == 0 else min(self.tokens, synced))
+        if status == 429:
+            self.tokens = 0.0
+            self.metrics["rate_limited"] += 1
+        self._dispatch()
+    
+    def retry_after(self, priority: int) -> float:
+        """
+        Seconds until the bucket holds a token for a request of this priority.
+        """
+        self._refill()
+        return max(0.0, self._needed(priority) - self.tokens) * self.window / self.capacity
+    
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        queued = {INTERACTIVE: 0, BACKGROUND: 0}
+        for priority, _, waiter in self._queue:
+            if priority == waiter.priority and not waiter.future.done():
+                queued[priority] = queued.get(priority, 0) + 1
+        return {
+            **self.metrics,
+            "tokens": self.tokens,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "queued_interactive": queued[INTERACTIVE],
+            "queued_background": queued[BACKGROUND],
+        }
+    
+    def _push(self, waiter: _Waiter):
+        heapq.heappush(self._queue, (waiter.priority, next(self._order), waiter))
+    
+    def _needed(self, priority: int) -> float:
+        """
+        Tokens the bucket must hold to grant a request (background requests
+        leave the reserve untouched).
+        """
+        return 1.0 + (self.background_reserve * self.capacity if priority > INTERACTIVE else 0.0)
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / self.window)
+        self._updated = now
+    
+    def _dispatch(self):
+        """
+        Grant queued requests in priority order while quota and slots allow.
+        """
+        self._refill()
+        while self._queue:
+            priority, _, waiter = self._queue[0]
+            if priority != waiter.priority or waiter.future.done():
+                heapq.heappop(self._queue)  # promoted, cancelled or timed out
+                continue
+            if self.in_flight >= self.max_concurrency:
+                return  # the next release dispatches again
+            needed = self._needed(priority)
+            if self.tokens < needed:
+                self._wake_after((needed - self.tokens) * self.window / self.capacity)
+                return
+            heapq.heappop(self._queue)
+            self.tokens -= 1
+            self.in_flight += 1
+            self.metrics["granted"] += 1
+            waiter.future.set_result(None)
+    
+    def _wake_after(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+class NASAClient:
+    """
+    Shared async client for the NASA NeoWs API.
+    
+    - One pooled httpx.AsyncClient (keep-alive connections, no per-call handshake)
+    - Per-request timeouts and retries with exponential backoff and jitter
+    - Singleflight: concurrent identical requests share a single upstream call
+    - Every attempt goes through the quota-aware UpstreamScheduler
+    """
+    
+    def __init__(
+        self,
+        base_url: str = NASA_BASE_URL,
+        api_key: str = NASA_API_KEY,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_connections: int = 20
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        self.scheduler = UpstreamScheduler()
+        self._inflight: Dict[Tuple, Tuple[asyncio.Future, Dict[str, int]]] = {}
+    
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+                  priority: Optional[int] = None) -> Any:
+        """
+        GET a NeoWs resource, coalescing concurrent identical requests.
+        
+        Args:
+            path: Path relative to the NeoWs base URL (e.g. "/feed")
+            params: Query parameters (the API key is added automatically)
+            priority: INTERACTIVE or BACKGROUND (default: `request_priority`)
+            
+        Returns:
+            Decoded JSON response
+            
+        Raises:
+            QuotaExhausted: If an interactive request gets no quota in time
+            NASAAPIError: If the request fails after all retries
+        """
+        params = dict(params or {})
+        priority = request_priority.get() if priority is None else priority
+        key = (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+        
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            state = {"priority": priority}
+            task = asyncio.ensure_future(self._fetch(path, params, state))
+            self._inflight[key] = (task, state)
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            task, state = inflight
+            if priority < state["priority"]:
+                # An interactive caller joined a background request
+                state["priority"] = priority
+                if "waiter" in state:
+                    self.scheduler.promote(state["waiter"], priority)
+        
+        # Shield so that one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    async def _fetch(self, path: str, params: Dict[str, Any], state: Dict[str, Any]) -> Any:
+        """
+        Perform one upstream request with retries.
+        """
+        url = f"{self.base_url}{path}"
+        query = {**params, "api_key": self.api_key}
+        
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            waiter = state["waiter"] = self.scheduler.waiter(state["priority"])
+            timeout = NASA_INTERACTIVE_MAX_WAIT if state["priority"] == INTERACTIVE else None
+            await self.scheduler.acquire(waiter, timeout)
+            start = time.perf_counter()
+            try:
+                response = await self._http.get(url, params=query)
+            except httpx.TransportError as e:
+                self.scheduler.release()
+                metrics.record_nasa_response(path, time.perf_counter() - start, None)
+                error = NASAAPIError(f"{type(e).__name__}: {e}")
+            except BaseException:
+                self.scheduler.release()
+                raise
+            else:
+                self.scheduler.release(response.status_code, response.headers)
+                metrics.record_nasa_response(path, time.perf_counter() - start, response.status_code, response.headers)
+                if response.status_code < 400:
+                    try:
+                        return response.json()
+                    except ValueError as e:
+                        # e.g. an HTML page from a proxy in front of the API
+                        raise NASAAPIError(f"Invalid JSON in response for {path}: {e}")
+                error = NASAAPIError(
+                    f"{response.status_code} error for {path}",
+                    status_code=response.status_code
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    raise error
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if (response.status_code == 429 and retry_after is not None
+                        and state["priority"] == INTERACTIVE and retry_after > NASA_INTERACTIVE_MAX_WAIT):
+                    # Longer than an interactive caller may wait: fail now
+                    raise QuotaExhausted(str(error), retry_after)
+            
+            if attempt == self.max_retries:
+                if error.status_code == 429:
+                    raise QuotaExhausted(str(error), retry_after if retry_after is not None
+                                         else self.scheduler.retry_after(state["priority"]))
+                raise error
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+            await asyncio.sleep(min(retry_after, MAX_RETRY_SLEEP) if retry_after is not None else delay)
+    
+    async def aclose(self):
+        """
+        Close pooled connections.
+        """
+        await self._http.aclose()
+
+
+def _header_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds.
+    """
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_client: Optional[NASAClient] = None
+
+
+def get_client() -> NASAClient:
+    """
+    Return the process-wide NASA client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        _client = NASAClient()
+    return _client
+
+
+async def close_client():
+    """
+    Close the process-wide NASA client (called on application shutdown).
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from cache import TieredCache, get_cache
+from nasa_client import get_client
+
+# NASA's feed endpoint accepts at most 7 days per request
+FEED_WINDOW_DAYS = 7
+
+# Longest range served by one feed request
+MAX_FEED_DAYS = 366
+
+# Concurrent upstream window fetches per feed request
+FEED_CONCURRENCY = 4
+
+# (fresh seconds, extra stale seconds) for days that can still change and
+# for days in the past, whose close approaches are settled
+RECENT_DAY_TTL = (60 * 60, 24 * 60 * 60)
+PAST_DAY_TTL = (30 * 24 * 60 * 60, 365 * 24 * 60 * 60)
+
+
+def _day_key(day: date) -> str:
+    return f"feed-day:{day.isoformat()}"
+
+
+def _day_ttl(day: date) -> Tuple[float, float]:
+    return PAST_DAY_TTL if day < date.today() - timedelta(days=1) else RECENT_DAY_TTL
+
+
+def _aligned_windows(days: List[date]) -> List[Tuple[date, date]]:
+    """
+    Group days into NASA-sized windows aligned to a fixed 7-day grid.
+    
+    Aligning windows means overlapping user ranges request identical
+    upstream windows, which the NASA client coalesces into one call.
+    """
+    windows = []
+    for day in days:
+        start = date.fromordinal(day.toordinal() - day.toordinal() % FEED_WINDOW_DAYS)
+        window = (start, start + timedelta(days=FEED_WINDOW_DAYS - 1))
+        if not windows or windows[-1] != window:
+            windows.append(window)
+    return windows
+
+
+async def _fetch_window(cache: TieredCache, start: date, end: date) -> Dict[str, list]:
+    """
+    Fetch one window from NASA and cache each of its days individually.
+    """
+    data = await get_client().get("/feed", {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat()
+    })
+    objects = data.get("near_earth_objects", {})
+    
+    days = {}
+    day = start
+    while day <= end:
+        neos = objects.get(day.isoformat(), [])
+        cache.set(_day_key(day), neos, *_day_ttl(day))
+        days[day.isoformat()] = neos
+        day += timedelta(days=1)
+    return days
+
+
+async def get_feed(start: date, end: date) -> Dict:
+    """
+    Return the NEO feed for an inclusive date range, assembled from per-day chunks.
+    
+    Cached days are reused. Missing days are fetched in aligned 7-day
+    windows concurrently. Stale days are served as-is and refreshed in the
+    background.
+    
+    Args:
+        start: First day of the range
+        end: Last day of the range (inclusive)
+        
+    Returns:
+        Dict in the shape of NASA's feed response
+        
+    Raises:
+        ValueError: If the range is empty or longer than MAX_FEED_DAYS
+        NASAAPIError: If a missing window cannot be fetched
+    """
+    n_days = (end - start).days + 1
+    if n_days < 1:
+        raise ValueError("end_date must not be before start_date")
+    if n_days > MAX_FEED_DAYS:
+        raise ValueError(f"Date range exceeds {MAX_FEED_DAYS} days")
+    
+    cache = get_cache()
+    days = [start + timedelta(days=i) for i in range(n_days)]
+    objects: Dict[str, list] = {}
+    missing: List[date] = []
+    stale: List[date] = []
+    
+    for day in days:
+        entry, tier = cache.lookup(_day_key(day))
+        if entry is None:
+            cache.metrics["misses"] += 1
+            missing.append(day)
+            continue
+        objects[day.isoformat()] = entry.value
+        if entry.fresh_until > time.time():
+            cache.metrics[f"{tier}_hits"] += 1
+        else:
+            cache.metrics["stale_hits"] += 1
+            stale.append(day)
+    
+    semaphore = asyncio.Semaphore(FEED_CONCURRENCY)
+    
+    async def fetch(window: Tuple[date, date]) -> Dict[str, list]:
+        async with semaphore:
+            return await _fetch_window(cache, *window)
+    
+    for fetched in await asyncio.gather(*(fetch(w) for w in _aligned_windows(missing))):
+        objects.update(fetched)
+    
+    for window in _aligned_windows(stale):
+        cache.run_in_background(
+            f"feed-window:{window[0].isoformat()}",
+            lambda window=window: _fetch_window(cache, *window)
+        )
+    
+    near_earth_objects = {day.isoformat(): objects[day.isoformat()] for day in days}
+    return {
+        "links": _links(start, end, n_days),
+        "element_count": sum(len(neos) for neos in near_earth_objects.values()),
+        "near_earth_objects": near_earth_objects
+    }
+
+
+def _links(start: date, end: date, n_days: int) -> Dict[str, str]:
+    """
+    Build next/previous/self links to this API (never exposing the NASA key).
+    """
+    def link(first: date, last: date) -> str:
+        return f"/api/asteroids/neo/feed?start_date={first.isoformat()}&end_date={last.isoformat()}"
+    
+    span = timedelta(days=n_days)
+    return {
+        "next": link(start + span, end + span),
+        "previous": link(start - span, end - span),
+        "self": link(start, end)
+    }
+
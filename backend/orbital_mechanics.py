@@ -0,0 +1,195 @@
+import numpy as np
+from typing import Dict, Tuple
+
+
+class OrbitalMechanics:
+    """
+    Vectorized two-body (Keplerian) propagation around the Sun.
+    
+    Python counterpart of lib/orbital-mechanics.ts. Element sets are
+    arrays of shape (n,), epochs are Julian dates of shape (m,), and results
+    are heliocentric ecliptic coordinates in AU (and AU/day).
+    """
+    
+    # Physical constants
+    AU_KM = 149597870.7  # km
+    GAUSS_K = 0.01720209895  # Gaussian gravitational constant (AU^1.5 / day)
+    GM_SUN = GAUSS_K ** 2  # AU³/day²
+    
+    # Earth-Moon barycenter, J2000 ecliptic (Standish, JPL approximate elements)
+    EARTH_ELEMENTS = {
+        "a": 1.00000261,
+        "e": 0.01671123,
+        "i": 0.0,
+        "omega": 102.93768193,
+        "Omega": 0.0,
+        "M": 357.52688973,
+        "epoch": 2451545.0,
+    }
+    
+    @staticmethod
+    def solve_kepler(M: np.ndarray, e: np.ndarray, tol: float = 1e-12, max_iter: int = 20) -> np.ndarray:
+        """
+        Solve Kepler's equation M = E - e sin(E) with Halley's method.
+        
+        Args:
+            M: Mean anomalies in radians (any shape)
+            e: Eccentricities (< 1), broadcastable against M
+            tol: Convergence tolerance in radians
+            max_iter: Maximum iterations (Halley converges cubically)
+            
+        Returns:
+            Eccentric anomalies in radians, shaped like the broadcast inputs
+        """
+        M = np.asarray(M, dtype=np.float64)
+        e = np.asarray(e, dtype=np.float64)
+        M = np.remainder(M + np.pi, 2 * np.pi) - np.pi  # Wrap to [-π, π)
+        M, e = np.broadcast_arrays(M, e)
+        
+        # Starting guess robust for high eccentricities
+        E = np.where(e < 0.8, M, np.where(M >= 0, np.pi, -np.pi)).astype(np.float64)
+        for _ in range(max_iter):
+            sin_E = np.sin(E)
+            cos_E = np.cos(E)
+            f = E - e * sin_E - M
+            f_prime = 1 - e * cos_E
+            f_double = e * sin_E
+            step = 2 * f * f_prime / (2 * f_prime ** 2 - f * f_double)
+            E = E - step
+            if np.all(np.abs(step) < tol):
+                break
+        return E
+    
+    @staticmethod
+    def mean_motion(a: np.ndarray) -> np.ndarray:
+        """
+        Mean motion in radians per day for semi-major axes in AU.
+        """
+        return OrbitalMechanics.GAUSS_K / np.power(np.asarray(a, dtype=np.float64), 1.5)
+    
+    @staticmethod
+    def orientation(i: np.ndarray, omega: np.ndarray, Omega: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Perifocal unit vectors P (toward periapsis) and Q in the ecliptic frame.
+        
+        Args:
+            i: Inclinations in degrees (n,)
+            omega: Arguments of periapsis in degrees (n,)
+            Omega: Longitudes of ascending node in degrees (n,)
+            
+        Returns:
+            Tuple of (P, Q), each of shape (n, 3)
+        """
+        i, omega, Omega = (np.radians(np.asarray(x, dtype=np.float64)) for x in (i, omega, Omega))
+        cos_O, sin_O = np.cos(Omega), np.sin(Omega)
+        cos_w, sin_w = np.cos(omega), np.sin(omega)
+        cos_i, sin_i = np.cos(i), np.sin(i)
+        P = np.stack([
+            cos_O * cos_w - sin_O * sin_w * cos_i,
+            sin_O * cos_w + cos_O * sin_w * cos_i,
+            sin_w * sin_i,
+        ], axis=-1)
+        Q = np.stack([
+            -cos_O * sin_w - sin_O * cos_w * cos_i,
+            -sin_O * sin_w + cos_O * cos_w * cos_i,
+            cos_w * sin_i,
+        ], axis=-1)
+        return P, Q
+    
+    @staticmethod
+    def propagate(elements: Dict[str, np.ndarray], epochs: np.ndarray,
+                  with_velocity: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Propagate many element sets to many epochs in one pass.
+        
+        Args:
+            elements: Dict of (n,) arrays with keys a (AU), e, i, omega,
+                Omega, M (degrees) and epoch (Julian date of M)
+            epochs: Julian dates (m,)
+            with_velocity: Also compute velocities
+            
+        Returns:
+            Tuple of (positions, velocities) of shape (n, m, 3) in AU and
+            AU/day; velocities is None unless requested
+        """
+        a = np.asarray(elements["a"], dtype=np.float64)[:, None]
+        e = np.asarray(elements["e"], dtype=np.float64)[:, None]
+        M0 = np.radians(np.asarray(elements["M"], dtype=np.float64))[:, None]
+        epoch0 = np.asarray(elements["epoch"], dtype=np.float64)[:, None]
+        epochs = np.asarray(epochs, dtype=np.float64)[None, :]
+        
+        n = OrbitalMechanics.mean_motion(a)
+        E = OrbitalMechanics.solve_kepler(M0 + n * (epochs - epoch0), e)
+        cos_E, sin_E = np.cos(E), np.sin(E)
+        root = np.sqrt(1 - e ** 2)
+        
+        P, Q = OrbitalMechanics.orientation(elements["i"], elements["omega"], elements["Omega"])
+        P, Q = P[:, None, :], Q[:, None, :]
+        
+        x_orb = a * (cos_E - e)
+        y_orb = a * root * sin_E
+        positions = x_orb[..., None] * P + y_orb[..., None] * Q
+        
+        velocities = None
+        if with_velocity:
+            rate = a * n / (1 - e * cos_E)
+            velocities = (-rate * sin_E)[..., None] * P + (rate * root * cos_E)[..., None] * Q
+        return positions, velocities
+    
+    @staticmethod
+    def state_to_elements(positions: np.ndarray, velocities: np.ndarray, epochs: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Osculating elements from heliocentric state vectors (inverse of propagate).
+        
+        For equatorial orbits Omega is set to 0, so omega becomes the
+        longitude of periapsis; for circular orbits periapsis is placed at
+        the ascending node and M is the argument of latitude.
+        
+        Args:
+            positions: Positions in AU (..., 3)
+            velocities: Velocities in AU/day (..., 3)
+            epochs: Julian dates of the states, broadcastable to positions[..., 0]
+            
+        Returns:
+            Dict of arrays a, e, i, omega, Omega, M (degrees) and epoch
+        """
+        mu = OrbitalMechanics.GM_SUN
+        r_vec = np.asarray(positions, dtype=np.float64)
+        v_vec = np.asarray(velocities, dtype=np.float64)
+        r = np.linalg.norm(r_vec, axis=-1)
+        v2 = np.sum(v_vec * v_vec, axis=-1)
+        rv = np.sum(r_vec * v_vec, axis=-1)
+        
+        h_vec = np.cross(r_vec, v_vec)
+        h = np.linalg.norm(h_vec, axis=-1)
+        e_vec = ((v2 - mu / r)[..., None] * r_vec - rv[..., None] * v_vec) / mu
+        e = np.linalg.norm(e_vec, axis=-1)
+        a = 1 / (2 / r - v2 / mu)
+        i = np.arccos(np.clip(h_vec[..., 2] / h, -1, 1))
+        
+        # Node vector k x h; fall back to the x axis for equatorial orbits
+        node = np.stack([-h_vec[..., 1], h_vec[..., 0], np.zeros_like(h)], axis=-1)
+        node_norm = np.linalg.norm(node, axis=-1)
+        equatorial = node_norm < 1e-12 * h
+        node = np.where(equatorial[..., None], np.array([1.0, 0.0, 0.0]), node)
+        Omega = np.where(equatorial, 0.0, np.arctan2(node[..., 1], node[..., 0]))
+        
+        h_unit = h_vec / h[..., None]
+        omega = np.arctan2(np.sum(np.cross(node, e_vec) * h_unit, axis=-1), np.sum(node * e_vec, axis=-1))
+        E = np.arctan2(rv / np.sqrt(mu * a), 1 - r / a)
+        
+        circular = e < 1e-10
+        latitude = np.arctan2(np.sum(np.cross(node, r_vec) * h_unit, axis=-1), np.sum(node * r_vec, axis=-1))
+        omega = np.where(circular, 0.0, omega)
+        E = np.where(circular, latitude, E)
+        M = E - e * np.sin(E)
+        
+        return {
+            "a": a,
+            "e": e,
+            "i": np.degrees(i),
+            "omega": np.degrees(omega) % 360,
+            "Omega": np.degrees(Omega) % 360,
+            "M": np.degrees(M) % 360,
+            "epoch": np.broadcast_to(np.asarray(epochs, dtype=np.float64), a.shape).copy(),
+        }
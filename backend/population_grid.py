@@ -0,0 +1,272 @@
+"""
+Gridded population lookup for casualty estimation.
+
+A global population-count raster (for example GPW at 2.5 or 0.5 arc-minutes)
+is converted once into a summed-area table stored as a .npy file. At runtime
+the table is opened with numpy's memmap, so every worker shares the same
+read-only pages through the OS page cache.
+
+Population inside a geodesic disk is integrated by splitting the disk into
+a fixed number of latitude bands. Each band is one rectangle query against
+the summed-area table, so the cost per radius is constant whatever the
+radius or raster resolution.
+
+Usage:
+    python population_grid.py build <raster.asc|raster.npy> [--output PATH]
+"""
+import argparse
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS = 6371  # km
+
+DEFAULT_GRID_PATH = os.getenv(
+    "POPULATION_GRID_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "population_sat.npy")
+)
+
+# Latitude bands per disk: error is confined to the band edges
+DISK_BANDS = 48
+
+# Band counts tried in order: a disk uses the first one >= its row span
+BAND_BUCKETS = (4, 12, DISK_BANDS)
+
+# Disks smaller than this many cells use the density of the center cell
+SMALL_DISK_CELLS = 2
+
+# Casualty rate inside each effect zone; a point takes the highest rate of
+# the zones that reach it
+CASUALTY_RATES = {
+    "fireball": 0.9,
+    "overpressure": 0.5,
+    "thermal": 0.25,
+}
+
+
+class PopulationGrid:
+    """
+    Summed-area table over a global equirectangular population-count raster.
+    
+    Rows run from 90°N to 90°S and columns from 180°W to 180°E.
+    """
+    
+    def __init__(self, path: str = DEFAULT_GRID_PATH):
+        # Plain ndarray view of the memmap (skips memmap's Python-level __getitem__)
+        self.sat = np.asarray(np.load(path, mmap_mode="r"))
+        self.rows = self.sat.shape[0] - 1
+        self.cols = self.sat.shape[1] - 1
+        self.cell_lat = 180.0 / self.rows
+        self.cell_lng = 360.0 / self.cols
+        self.total = float(self.sat[-1, -1])
+    
+    def _rect_sum(self, r0: np.ndarray, r1: np.ndarray, c0: np.ndarray, c1: np.ndarray) -> np.ndarray:
+        """
+        Sum cells in rows [r0, r1) and columns [c0, c1) (no wrap-around).
+        """
+        sat = self.sat
+        return sat[r1, c1] - sat[r0, c1] - sat[r1, c0] + sat[r0, c0]
+    
+    def population_within(self, lat, lng, radius_km) -> np.ndarray:
+        """
+        Population inside geodesic disks.
+        
+        Args:
+            lat: Center latitudes in degrees
+            lng: Center longitudes in degrees
+            radius_km: Disk radii in km (broadcast against lat/lng)
+            
+        Returns:
+            Array of population counts with the broadcast shape
+        """
+        lat, lng, radius_km = np.broadcast_arrays(
+            np.asarray(lat, dtype=np.float64),
+            np.asarray(lng, dtype=np.float64),
+            np.asarray(radius_km, dtype=np.float64)
+        )
+        shape = lat.shape
+        lat0 = np.radians(lat.ravel())[:, None]
+        lng0 = lng.ravel()[:, None]
+        delta = np.clip(radius_km.ravel() / EARTH_RADIUS, 0, np.pi)[:, None]
+        
+        # Row span of each disk, snapped to whole rows
+        north = np.degrees(np.minimum(lat0 + delta, np.pi / 2))
+        south = np.degrees(np.maximum(lat0 - delta, -np.pi / 2))
+        row_top = np.clip(np.round((90 - north) / self.cell_lat), 0, self.rows)
+        row_bottom = np.clip(np.round((90 - south) / self.cell_lat), 0, self.rows)
+        
+        # Disks spanning only a few cells: center-cell density times disk area
+        total = np.empty(len(delta), dtype=np.float64)
+        small = np.degrees(delta[:, 0]) < SMALL_DISK_CELLS * self.cell_lat
+        if small.any():
+            total[small] = self._density(lat0[small, 0], lng0[small, 0]) * (
+                2 * np.pi * EARTH_RADIUS ** 2 * (1 - np.cos(delta[small, 0]))
+            )
+        
+        # Disks spanning few rows need fewer bands (one per row at most)
+        span = row_bottom[:, 0] - row_top[:, 0]
+        lower = -1
+        for bands in BAND_BUCKETS:
+            group = ~small & (span > lower)
+            if bands < DISK_BANDS:
+                group &= span <= bands
+            lower = bands
+            if group.any():
+                total[group] = self._band_sums(
+                    lat0[group], lng0[group], delta[group], row_top[group], row_bottom[group], bands
+                )
+        
+        return np.maximum(total, 0).reshape(shape)
+    
+    def _band_sums(self, lat0: np.ndarray, lng0: np.ndarray, delta: np.ndarray,
+                   row_top: np.ndarray, row_bottom: np.ndarray, bands: int) -> np.ndarray:
+        """
+        Integrate disks as `bands` latitude bands, one rectangle query each.
+        
+        All arguments are (n, 1) columns; lat0 and delta are in radians.
+        """
+        edges = np.round(
+            row_top + (row_bottom - row_top) * np.linspace(0, 1, bands + 1)[None, :]
+        ).astype(np.int64)
+        r0, r1 = edges[:, :-1], edges[:, 1:]
+        
+        # Longitude half-width of the disk at each band's middle latitude
+        band_lat = np.radians(90 - (r0 + r1) / 2 * self.cell_lat)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cos_dlng = (np.cos(delta) - np.sin(lat0) * np.sin(band_lat)) / (np.cos(lat0) * np.cos(band_lat))
+        half_width = np.degrees(np.arccos(np.clip(np.nan_to_num(cos_dlng, nan=-1.0), -1, 1)))
+        
+        # Column span, split in two where it crosses the antimeridian
+        full = half_width >= 180
+        c_start = np.round((lng0 - half_width + 180) / self.cell_lng).astype(np.int64)
+        c_end = np.round((lng0 + half_width + 180) / self.cell_lng).astype(np.int64)
+        c_end = np.where(full | (c_end - c_start >= self.cols), c_start + self.cols, c_end)
+        c_start = np.where(full, 0, c_start)
+        c_end = np.where(full, self.cols, c_end)
+        
+        shift = np.floor_divide(c_start, self.cols) * self.cols
+        c_start -= shift
+        c_end -= shift
+        first_end = np.minimum(c_end, self.cols)
+        wrap_end = np.maximum(c_end - self.cols, 0)
+        
+        total = self._rect_sum(r0, r1, c_start, first_end) + self._rect_sum(r0, r1, np.zeros_like(wrap_end), wrap_end)
+        return total.sum(axis=1)
+    
+    def _density(self, lat_rad: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """
+        Population per km² of the cells containing the given points.
+        """
+        row = np.clip(((90 - np.degrees(lat_rad)) / self.cell_lat).astype(np.int64), 0, self.rows - 1)
+        col = np.clip(((lng + 180) / self.cell_lng).astype(np.int64), 0, self.cols - 1)
+        count = self._rect_sum(row, row + 1, col, col + 1)
+        north = np.radians(90 - row * self.cell_lat)
+        south = np.radians(90 - (row + 1) * self.cell_lat)
+        area = EARTH_RADIUS ** 2 * np.radians(self.cell_lng) * (np.sin(north) - np.sin(south))
+        return count / area
+    
+    def estimate_casualties(self, lat, lng, fireball_radius, thermal_radius,
+                            overpressure_radius) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Casualties from the population inside each effect zone.
+        
+        The disks are sorted by radius and integrated once each; every ring
+        between consecutive radii is weighted by the highest casualty rate
+        of the zones covering it.
+        
+        Returns:
+            Tuple of (estimated casualties, affected population) arrays
+        """
+        radii = np.stack(np.broadcast_arrays(
+            np.asarray(fireball_radius, dtype=np.float64),
+            np.asarray(overpressure_radius, dtype=np.float64),
+            np.asarray(thermal_radius, dtype=np.float64)
+        ), axis=-1)
+        rates = np.array([CASUALTY_RATES["fireball"], CASUALTY_RATES["overpressure"], CASUALTY_RATES["thermal"]])
+        
+        order = np.argsort(radii, axis=-1)
+        sorted_radii = np.take_along_axis(radii, order, axis=-1)
+        population = self.population_within(
+            np.asarray(lat, dtype=np.float64)[..., None],
+            np.asarray(lng, dtype=np.float64)[..., None],
+            sorted_radii
+        )
+        rings = np.diff(population, axis=-1, prepend=0)
+        ring_rates = np.maximum.accumulate(rates[order][..., ::-1], axis=-1)[..., ::-1]
+        
+        estimated = np.trunc((rings * ring_rates).sum(axis=-1))
+        affected = np.trunc(population[..., -1])
+        return estimated, affected
+
+
+def build_summed_area_table(counts: np.ndarray) -> np.ndarray:
+    """
+    Build a (rows + 1, cols + 1) float64 summed-area table from a count raster.
+    """
+    counts = np.nan_to_num(np.asarray(counts, dtype=np.float64), nan=0.0)
+    counts = np.maximum(counts, 0)
+    sat = np.zeros((counts.shape[0] + 1, counts.shape[1] + 1), dtype=np.float64)
+    np.cumsum(counts, axis=0, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    return sat
+
+
+def read_raster(path: str) -> np.ndarray:
+    """
+    Read a population-count raster as a global grid.
+    
+    Accepts a global .npy array (north-up, starting at 180°W) or an ESRI
+    ASCII grid (the format GPW is distributed in). ASCII grids that do not
+    cover the whole globe are placed into a global grid using their header.
+    """
+    if path.endswith(".npy"):
+        return np.load(path)
+    
+    header = {}
+    with open(path) as f:
+        for _ in range(6):
+            key, value = f.readline().split()
+            header[key.lower()] = float(value)
+        data = np.loadtxt(f, dtype=np.float64)
+    
+    nodata = header.get("nodata_value")
+    if nodata is not None:
+        data[data == nodata] = 0
+    cell = header["cellsize"]
+    rows, cols = int(round(180 / cell)), int(round(360 / cell))
+    top = int(round((90 - (header["yllcorner"] + header["nrows"] * cell)) / cell))
+    left = int(round((header["xllcorner"] + 180) / cell))
+    grid = np.zeros((rows, cols), dtype=np.float64)
+    grid[top:top + data.shape[0], left:left + data.shape[1]] = data
+    return grid
+
+
+_grid: Optional[PopulationGrid] = None
+_grid_checked = False
+
+
+def get_population_grid() -> Optional[PopulationGrid]:
+    """
+    Return the shared population grid, or None if no grid has been built.
+    """
+    global _grid, _grid_checked
+    if not _grid_checked:
+        _grid_checked = True
+        if os.path.exists(DEFAULT_GRID_PATH):
+            _grid = PopulationGrid(DEFAULT_GRID_PATH)
+    return _grid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the population summed-area table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Convert a population-count raster")
+    build_parser.add_argument("source", help="ESRI ASCII grid (.asc) or .npy population counts")
+    build_parser.add_argument("--output", default=DEFAULT_GRID_PATH)
+    args = parser.parse_args()
+    
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    sat = build_summed_area_table(read_raster(args.source))
+    np.save(args.output, sat)
+    print(f"Wrote {args.output}: {sat.shape[0] - 1}x{sat.shape[1] - 1} cells, total population {sat[-1, -1]:,.0f}")
@@ -0,0 +1,36 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# Worker processes per server process (serve.py divides the CPUs among the
+# server workers so that their pools do not oversubscribe the machine)
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", 0)) or os.cpu_count() or 1
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Return the shared process pool for CPU-heavy work, creating it on first use.
+    
+    Workers are spawned (not forked) so that they never inherit the event
+    loop or open sockets of the server process.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """
+    Shut down the shared process pool (called on application shutdown).
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
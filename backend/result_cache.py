@@ -0,0 +1,278 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from coastline import DEFAULT_COASTLINE_PATH, get_coastline
+from datasets import file_version
+from entry import DEFAULT_ENTRY_TABLE_PATH, get_entry_table
+from population_grid import DEFAULT_GRID_PATH, get_population_grid
+from terrain import DEFAULT_TERRAIN_PATH, get_terrain_grid
+
+DEFAULT_RESULT_CACHE_PATH = os.getenv(
+    "RESULT_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "result_cache.sqlite3")
+)
+
+# Memory tier budget in bytes of cached responses (per worker process)
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# Entries kept in the shared SQLite tier
+RESULT_CACHE_MAX_DISK_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_DISK_ENTRIES", 200_000))
+
+# Significant digits that scalar parameters are rounded to before lookup
+# (0 = exact parameters only). Quantized requests are also computed from
+# the rounded values, so a cached response never depends on which nearby
+# request filled it.
+RESULT_CACHE_SIGNIFICANT_DIGITS = int(os.getenv("RESULT_CACHE_SIGNIFICANT_DIGITS", 0))
+
+# Decimal places impact coordinates are rounded to when quantizing (~11 m)
+LOCATION_DECIMALS = 4
+
+# Seconds a cached response stays valid
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 24 * 60 * 60))
+
+# Bump whenever the simulation model or response shape changes, so the
+# shared tier never serves results of an older model
+MODEL_VERSION = 4
+
+# Disk inserts between trims of the SQLite tier
+TRIM_INTERVAL = 1000
+
+
+_dataset_fingerprint: Optional[str] = None
+
+
+def dataset_fingerprint() -> str:
+    """
+    Short hash of the optional datasets this process simulates with: the
+    path, size and modification time of each one that is loaded.
+
+    Results depend on which datasets are loaded (population grid, terrain,
+    entry table, coastline), so the fingerprint is part of every cache key.
+    Each dataset is loaded at most once per process, so the fingerprint is
+    computed once.
+    """
+    global _dataset_fingerprint
+    if _dataset_fingerprint is None:
+        versions = [file_version(path) if dataset is not None else None
+                    for path, dataset in ((DEFAULT_GRID_PATH, get_population_grid()),
+                                          (DEFAULT_TERRAIN_PATH, get_terrain_grid()),
+                                          (DEFAULT_ENTRY_TABLE_PATH, get_entry_table()),
+                                          (DEFAULT_COASTLINE_PATH, get_coastline()))]
+        _dataset_fingerprint = hashlib.sha1(repr(versions).encode()).hexdigest()[:12]
+    return _dataset_fingerprint
+
+
+def quantize(value: float, digits: int = RESULT_CACHE_SIGNIFICANT_DIGITS) -> float:
+    """
+    Round a value to `digits` significant figures (unchanged if digits is 0).
+    """
+    if not digits or value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
+def quantize_location(value: float, digits: int = RESULT_CACHE_SIGNIFICANT_DIGITS) -> float:
+    """
+    Round a latitude or longitude when quantization is enabled.
+    """
+    return round(value, LOCATION_DECIMALS) if digits else value
+
+
+def cache_key(endpoint: str, *values: Any) -> str:
+    """
+    Canonical key for an endpoint and its (already quantized) parameters.
+
+    Floats are written with repr, so equal values always give equal keys
+    (and 100 and 100.0 are the same scenario). The model version and the
+    dataset fingerprint are included, so results computed with another
+    model or other datasets are never served.
+    """
+    parts = [endpoint, f"v{MODEL_VERSION}", dataset_fingerprint()]
+    for value in values:
+        if isinstance(value, bool) or value is None:
+            parts.append(str(value))
+        else:
+            parts.append(repr(float(value)))
+    return "|".join(parts)
+
+
+class ResultCache:
+    """
+    Two-tier cache of pre-serialized response bodies.
+
+    - Tier 1: in-process LRU bounded by total bytes (RESULT_CACHE_MAX_BYTES)
+    - Tier 2: SQLite file shared by all workers, bounded by entry count and
+      trimmed least recently used first
+
+    Values are the exact bytes sent to the client, so a hit skips both the
+    simulation and JSON encoding.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_RESULT_CACHE_PATH, max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 max_disk_entries: int = RESULT_CACHE_MAX_DISK_ENTRIES, ttl: float = RESULT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self.metrics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_results_used_at ON results (used_at)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a response body in memory, then in the shared tier.
+
+        Returns:
+            The cached bytes, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.metrics["memory_hits"] += 1
+                    return entry[0]
+                self._forget(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT body, expires_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self._db.execute("UPDATE results SET used_at = ? WHERE key = ?", (now, key))
+                    body = bytes(row[0])
+                    self._remember(key, body, row[1])
+                    self.metrics["disk_hits"] += 1
+                    return body
+
+            self.metrics["misses"] += 1
+            return None
+
+    def set(self, key: str, body: bytes):
+        """
+        Store a response body in both tiers.
+        """
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, body, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, body, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                    (key, body, expires_at, now)
+                )
+                self._inserts += 1
+                if self._inserts % TRIM_INTERVAL == 0:
+                    self._trim(now)
+
+    def clear(self):
+        """
+        Drop every cached response. Not needed after rebuilding a dataset:
+        the new dataset gives new keys, and old entries age out.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and tier sizes.
+        """
+        hits = self.metrics["memory_hits"] + self.metrics["disk_hits"]
+        lookups = hits + self.metrics["misses"]
+        with self._lock:
+            disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] if self._db else 0
+            return {
+                **self.metrics,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, body: bytes, expires_at: float):
+        """
+        Insert into the memory tier, evicting least recently used entries
+        until the byte budget is met.
+        """
+        if len(body) > self.max_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = (body, expires_at)
+        self._memory_bytes += len(body)
+        while self._memory_bytes > self.max_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.metrics["evictions"] += 1
+
+    def _forget(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0])
+
+    def _trim(self, now: float):
+        """
+        Drop expired rows, then the least recently used rows over the limit.
+        """
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        excess = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used_at LIMIT ?)", (excess,)
+            )
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Return the process-wide result cache, creating it on first use.
+    """
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
+
+
+def close_result_cache():
+    """
+    Close the process-wide result cache (called on application shutdown).
+    """
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.close()
+        _result_cache = None
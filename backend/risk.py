@@ -0,0 +1,202 @@
+"""
+Catalog-wide impact-risk precompute.
+
+Every catalog object with a diameter estimate and an Earth close approach
+is run through the impact pipeline (energy, atmospheric entry, crater,
+seismic, atmospheric effects and casualties) over a small grid of
+scenarios:
+
+- diameter: the low and high NASA estimate
+- velocity: the slowest and fastest Earth close approach, converted to an
+  impact velocity by adding Earth's escape velocity in quadrature
+- entry angle: ENTRY_ANGLES
+- density: ASSUMED_DENSITY
+
+The maximum of each effect over the grid (the worst-case envelope) is
+stored in the catalog's neo_risk table, which backs the leaderboard
+endpoint. The impact site is unknown, so impacts are on land and
+casualties use estimate_casualties' uniform population density.
+
+The precompute is incremental and resumable: each row stores a hash of
+its inputs, the model version and the version of the entry table, the
+only dataset the envelope reads (building it changes which bodies
+airburst). Only objects whose hash changed are recomputed, and results
+are stored chunk by chunk as they finish.
+
+Usage:
+    python risk.py run [--full] [--chunk-size N]
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import NeoCatalog, get_catalog
+from datasets import file_version
+from entry import DEFAULT_ENTRY_TABLE_PATH
+from process_pool import get_executor
+from result_cache import MODEL_VERSION
+from simulation import ImpactSimulator
+
+# Assumed bulk density of every object (kg/m³, a typical stony asteroid)
+ASSUMED_DENSITY = 2600.0
+
+# Entry angles of the scenario grid (degrees from horizontal)
+ENTRY_ANGLES = (15.0, 45.0, 90.0)
+
+EARTH_ESCAPE_VELOCITY = 11.2  # km/s
+
+# Objects per worker task
+RISK_CHUNK_SIZE = 5000
+
+INPUT_KEYS = ("diameter_min_km", "diameter_max_km", "velocity_min_kms", "velocity_max_kms")
+
+
+def inputs_hash(diameter_min_km: float, diameter_max_km: float,
+                velocity_min_kms: float, velocity_max_kms: float, entry_table: Optional[Tuple]) -> str:
+    """
+    Hash of an object's risk inputs, the assumptions, the model version and
+    the entry table version (see datasets.file_version).
+    """
+    values = tuple(round(float(x), 10) for x in (diameter_min_km, diameter_max_km, velocity_min_kms, velocity_max_kms))
+    assumptions = (ASSUMED_DENSITY, ENTRY_ANGLES, MODEL_VERSION, entry_table)
+    return hashlib.sha1(repr((values, assumptions)).encode()).hexdigest()
+
+
+def impact_velocity(relative_velocity):
+    """
+    Velocity at atmospheric entry (km/s) for a relative velocity far from Earth.
+    """
+    return np.sqrt(np.power(relative_velocity, 2) + EARTH_ESCAPE_VELOCITY ** 2)
+
+
+def risk_envelope(inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Worst-case effects envelope for many objects (runs inside a worker process).
+
+    Args:
+        inputs: Dict of (n,) arrays diameter_min_km, diameter_max_km,
+            velocity_min_kms and velocity_max_kms
+
+    Returns:
+        Dict of (n,) arrays keyed by NeoRisk column
+    """
+    n = len(inputs["diameter_min_km"])
+    diameter = np.stack([inputs["diameter_min_km"], inputs["diameter_max_km"]], axis=1) * 1000
+    velocity = impact_velocity(np.stack([inputs["velocity_min_kms"], inputs["velocity_max_kms"]], axis=1))
+
+    # Scenario grid as (n, diameters, velocities, angles), flattened per object
+    grid = (n, 2, 2, len(ENTRY_ANGLES))
+    size = np.broadcast_to(diameter[:, :, None, None], grid).reshape(n, -1)
+    speed = np.broadcast_to(velocity[:, None, :, None], grid).reshape(n, -1)
+    angle = np.broadcast_to(np.array(ENTRY_ANGLES), grid).reshape(n, -1)
+    density = np.full(size.shape, ASSUMED_DENSITY)
+
+    energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(size, density, speed)
+    burst_altitude, _, ground_fraction, _ = \
+        ImpactSimulator.calculate_atmospheric_entry(size, density, speed, angle)
+    ground_joules, ground_mt = energy_joules * ground_fraction, energy_mt * ground_fraction
+    crater_diameter, _ = ImpactSimulator.calculate_crater_size(ground_mt, np.zeros(size.shape, dtype=bool))
+    seismic_magnitude, _ = ImpactSimulator.calculate_seismic_effects(ground_joules)
+    fireball, thermal, overpressure = ImpactSimulator.calculate_atmospheric_effects(energy_mt, burst_altitude)
+    casualties, affected_population = ImpactSimulator.estimate_casualties(overpressure)
+
+    return {
+        "diameter_min_m": diameter[:, 0],
+        "diameter_max_m": diameter[:, 1],
+        "velocity_min_kms": velocity[:, 0],
+        "velocity_max_kms": velocity[:, 1],
+        "energy_mt_min": energy_mt.min(axis=1),
+        "energy_mt_max": energy_mt.max(axis=1),
+        "ground_energy_mt_max": ground_mt.max(axis=1),
+        "crater_diameter_max": crater_diameter.max(axis=1),
+        "seismic_magnitude_max": seismic_magnitude.max(axis=1),
+        "fireball_radius_max": fireball.max(axis=1),
+        "thermal_radiation_max": thermal.max(axis=1),
+        "overpressure_max": overpressure.max(axis=1),
+        "casualties_max": casualties.max(axis=1),
+        "affected_population_max": affected_population.max(axis=1),
+    }
+
+
+async def run_risk(catalog: NeoCatalog, full: bool = False,
+                   chunk_size: int = RISK_CHUNK_SIZE,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   max_in_flight: Optional[int] = None) -> Dict[str, int]:
+    """
+    Precompute risk envelopes for the catalog, recomputing only changed objects.
+
+    Args:
+        catalog: Catalog to process (results are stored in its neo_risk table)
+        full: Recompute every object regardless of stored hashes
+        chunk_size: Objects per worker task
+        progress: Called with (objects done, objects to recompute) after each chunk
+        max_in_flight: Chunks queued in the process pool at once (None = all)
+
+    Returns:
+        Dict with the number of objects considered and recomputed
+    """
+    inputs = await asyncio.to_thread(catalog.risk_inputs)
+    ids: List[str] = inputs["id"]
+    # The pool workers load the entry table if it exists
+    entry_table = file_version(DEFAULT_ENTRY_TABLE_PATH)
+    hashes = [inputs_hash(*(inputs[key][k] for key in INPUT_KEYS), entry_table) for k in range(len(ids))]
+
+    stored = {} if full else await asyncio.to_thread(catalog.risk_hashes)
+    todo = np.array([k for k, neo_id in enumerate(ids) if stored.get(neo_id) != hashes[k]], dtype=np.int64)
+
+    executor = get_executor()
+    loop = asyncio.get_running_loop()
+    chunks = [todo[first:first + chunk_size] for first in range(0, len(todo), chunk_size)]
+    window = max_in_flight or len(chunks)
+
+    def submit(index):
+        return loop.run_in_executor(executor, risk_envelope, {key: inputs[key][index] for key in INPUT_KEYS})
+
+    futures = [submit(index) for index in chunks[:window]]
+    done = 0
+    try:
+        for position, index in enumerate(chunks):
+            envelope = await futures[position]
+            if position + window < len(chunks):
+                futures.append(submit(chunks[position + window]))
+            computed_at = time.time()
+            columns = {key: values.tolist() for key, values in envelope.items()}
+            rows = [
+                {
+                    "neo_id": ids[k],
+                    **{key: values[row] for key, values in columns.items()},
+                    "density": ASSUMED_DENSITY,
+                    "inputs_hash": hashes[k],
+                    "computed_at": computed_at,
+                }
+                for row, k in enumerate(index)
+            ]
+            # Stored per chunk, so an interrupted run resumes where it stopped
+            await asyncio.to_thread(catalog.store_risks, rows)
+            done += len(index)
+            if progress is not None:
+                progress(done, len(todo))
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+    return {"objects": len(ids), "recomputed": int(len(todo))}
+
+
+async def _main(args):
+    stats = await run_risk(get_catalog(), args.full, args.chunk_size)
+    print(f"Computed risk for {stats['objects']} objects ({stats['recomputed']} recomputed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Impact-risk precompute for the local NEO catalog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Recompute changed objects (or all with --full)")
+    run_parser.add_argument("--full", action="store_true")
+    run_parser.add_argument("--chunk-size", type=int, default=RISK_CHUNK_SIZE)
+    asyncio.run(_main(parser.parse_args()))
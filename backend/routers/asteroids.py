@@ -1,12 +1,52 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
-import requests
-from datetime import datetime, timedelta
+import asyncio
+import math
+from datetime import date, timedelta
+from nasa_client import NASAAPIError, QuotaExhausted, get_client
+from cache import get_cache
+from neo_feed import get_feed
 
 router = APIRouter()
 
-NASA_API_KEY = "DEMO_KEY"  # Replace with actual API key
-NASA_BASE_URL = "https://api.nasa.gov/neo/rest/v1"
+# (fresh seconds, extra seconds served stale while refreshing) per endpoint
+# (feed days are cached individually, see neo_feed.py)
+CACHE_TTLS = {
+    "browse": (24 * 60 * 60, 7 * 24 * 60 * 60),
+    "detail": (24 * 60 * 60, 7 * 24 * 60 * 60),
+    "stats": (6 * 60 * 60, 7 * 24 * 60 * 60),
+}
+
+# IDs accepted by /neo/bulk (upstream concurrency is bounded by the scheduler)
+MAX_BULK_IDS = 100
+
+def _catalog():
+    """
+    The local NEO catalog, imported on first use (SQLAlchemy is slow to import).
+    """
+    from catalog import get_catalog
+    return get_catalog()
+
+def _rate_limited(e: QuotaExhausted) -> HTTPException:
+    """
+    429 for a request that NASA's API quota could not serve, with Retry-After when known.
+    """
+    headers = None
+    if e.retry_after is not None:
+        headers = {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    return HTTPException(status_code=429, detail=str(e), headers=headers)
+
+async def _cached_get(endpoint: str, key: str, path: str, params: Optional[dict] = None):
+    """
+    Serve a NASA resource through the tiered cache with the endpoint's TTLs.
+    """
+    ttl, stale_ttl = CACHE_TTLS[endpoint]
+    return await get_cache().get_or_fetch(
+        f"{endpoint}:{key}",
+        lambda: get_client().get(path, params),
+        ttl,
+        stale_ttl
+    )
 
 @router.get("/neo/feed")
 async def get_neo_feed(
@@ -15,44 +55,25 @@ async def get_neo_feed(
 ):
     """
     Fetch Near-Earth Objects from NASA API.
+    
+    Ranges may span up to a year; each day is cached separately so that
+    overlapping windows only fetch the days not seen before.
     """
     try:
-        if not start_date:
-            start_date = datetime.now().strftime("%Y-%m-%d")
-        if not end_date:
-            end_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-        
-        url = f"{NASA_BASE_URL}/feed"
-        params = {
-            "start_date": start_date,
-            "end_date": end_date,
-            "api_key": NASA_API_KEY
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        return response.json()
-        
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"NASA API error: {str(e)}")
-
-@router.get("/neo/{asteroid_id}")
-async def get_asteroid_details(asteroid_id: str):
-    """
-    Get detailed information about a specific asteroid.
-    """
+        start = date.fromisoformat(start_date) if start_date else date.today()
+        end = date.fromisoformat(end_date) if end_date else start + timedelta(days=7)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    
     try:
-        url = f"{NASA_BASE_URL}/neo/{asteroid_id}"
-        params = {"api_key": NASA_API_KEY}
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        return await get_feed(start, end)
         
-        return response.json()
-        
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=404, detail=f"Asteroid not found: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QuotaExhausted as e:
+        raise _rate_limited(e)
+    except NASAAPIError as e:
+        raise HTTPException(status_code=500, detail=f"NASA API error: {str(e)}")
 
 @router.get("/neo/browse")
 async def browse_asteroids(
@@ -61,36 +82,194 @@ async def browse_asteroids(
 ):
     """
     Browse all known Near-Earth Objects.
+    
+    Served from the local catalog once an ingest (`python catalog.py
+    ingest`) has completed, otherwise from NASA, so that a partial catalog
+    is never served.
     """
+    catalog = _catalog()
+    if await asyncio.to_thread(catalog.ingest_state) is not None:
+        return await asyncio.to_thread(catalog.browse, page, size)
+    
     try:
-        url = f"{NASA_BASE_URL}/neo/browse"
         params = {
             "page": page,
-            "size": size,
-            "api_key": NASA_API_KEY
+            "size": size
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        return response.json()
+        return await _cached_get("browse", f"{page}:{size}", "/neo/browse", params)
         
-    except requests.exceptions.RequestException as e:
+    except QuotaExhausted as e:
+        raise _rate_limited(e)
+    except NASAAPIError as e:
         raise HTTPException(status_code=500, detail=f"NASA API error: {str(e)}")
 
+@router.get("/neo/search")
+async def search_asteroids(
+    min_diameter: Optional[float] = Query(None, ge=0, description="Minimum estimated diameter (km)"),
+    max_diameter: Optional[float] = Query(None, ge=0, description="Maximum estimated diameter (km)"),
+    hazardous: Optional[bool] = None,
+    approach_start: Optional[date] = Query(None, description="Has a close approach on or after this date"),
+    approach_end: Optional[date] = Query(None, description="Has a close approach on or before this date"),
+    max_miss_distance: Optional[float] = Query(None, ge=0, description="Has a close approach within this distance (km)"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Filter the local catalog, largest objects first.
+    
+    Uses keyset pagination: pass the returned `next_cursor` as `cursor`.
+    """
+    try:
+        return await asyncio.to_thread(
+            _catalog().search,
+            min_diameter, max_diameter, hazardous,
+            approach_start, approach_end, max_miss_distance,
+            cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/close-approaches")
+async def list_close_approaches(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    max_miss_distance: Optional[float] = Query(None, ge=0, description="Maximum miss distance (km)"),
+    hazardous: Optional[bool] = None,
+    min_diameter: Optional[float] = Query(None, ge=0, description="Minimum estimated diameter (km)"),
+    order_by: str = Query("date", description="Sort order: date or miss_distance"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    List close approaches from the local catalog by date or miss distance.
+    
+    Uses keyset pagination: pass the returned `next_cursor` as `cursor`.
+    """
+    try:
+        return await asyncio.to_thread(
+            _catalog().close_approaches,
+            start_date, end_date, max_miss_distance, hazardous,
+            min_diameter, order_by, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/moid")
+async def list_moid_ranking(
+    max_moid: Optional[float] = Query(None, ge=0, description="Maximum MOID to Earth (AU)"),
+    hazardous: Optional[bool] = None,
+    order: str = Query("asc", description="Sort order by MOID: asc or desc"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Rank catalog objects by their screened MOID against Earth's orbit.
+
+    Results come from the last `python screening.py run`.
+    Uses keyset pagination: pass the returned `next_cursor` as `cursor`.
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    try:
+        return await asyncio.to_thread(
+            _catalog().moid_ranking,
+            max_moid, hazardous, order == "desc", cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/neo/bulk")
+async def get_asteroids_bulk(ids: str = Query(..., description="Comma-separated asteroid IDs")):
+    """
+    Get details for many asteroids in one request.
+    
+    Catalog objects are read locally in one query; the rest are fetched
+    from NASA through the cache. Each ID gets its own status (ok,
+    not_found, rate_limited or error), so one missing or throttled object
+    does not fail the others.
+    """
+    asteroid_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not asteroid_ids:
+        raise HTTPException(status_code=400, detail="ids must list at least one asteroid ID")
+    if len(asteroid_ids) > MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} IDs per request")
+    
+    local = await asyncio.to_thread(_catalog().get_many, asteroid_ids)
+    
+    async def fetch(asteroid_id: str) -> dict:
+        if asteroid_id in local:
+            return {"id": asteroid_id, "status": "ok", "data": local[asteroid_id]}
+        try:
+            data = await _cached_get("detail", asteroid_id, f"/neo/{asteroid_id}")
+            return {"id": asteroid_id, "status": "ok", "data": data}
+        except NASAAPIError as e:
+            if e.status_code == 429:
+                status = "rate_limited"
+            elif e.status_code in (400, 404):
+                status = "not_found"
+            else:
+                status = "error"
+            return {"id": asteroid_id, "status": status, "error": str(e)}
+    
+    results = await asyncio.gather(*(fetch(asteroid_id) for asteroid_id in asteroid_ids))
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"results": results, "counts": counts}
+
+@router.get("/leaderboard")
+async def get_risk_leaderboard(
+    order_by: str = Query("casualties", description="Rank by worst-case casualties or energy"),
+    hazardous: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Most dangerous catalog objects by their worst-case impact effects.
+
+    Served from the envelopes of the last `python risk.py run` (or risk
+    job) rather than live simulation.
+    Uses keyset pagination: pass the returned `next_cursor` as `cursor`.
+    """
+    try:
+        return await asyncio.to_thread(_catalog().risk_ranking, order_by, hazardous, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/neo/{asteroid_id}")
+async def get_asteroid_details(asteroid_id: str):
+    """
+    Get detailed information about a specific asteroid.
+    """
+    local = await asyncio.to_thread(_catalog().get, asteroid_id)
+    if local is not None:
+        return local
+    
+    try:
+        return await _cached_get("detail", asteroid_id, f"/neo/{asteroid_id}")
+        
+    except QuotaExhausted as e:
+        raise _rate_limited(e)
+    except NASAAPIError as e:
+        raise HTTPException(status_code=404, detail=f"Asteroid not found: {str(e)}")
+
 @router.get("/statistics")
 async def get_neo_statistics():
     """
     Get NEO statistics from NASA.
     """
     try:
-        url = f"{NASA_BASE_URL}/stats"
-        params = {"api_key": NASA_API_KEY}
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        return await _cached_get("stats", "all", "/stats")
         
-        return response.json()
-        
-    except requests.exceptions.RequestException as e:
+    except QuotaExhausted as e:
+        raise _rate_limited(e)
+    except NASAAPIError as e:
         raise HTTPException(status_code=500, detail=f"NASA API error: {str(e)}")
+
+@router.get("/cache/stats")
+async def get_cache_statistics():
+    """
+    Hit/miss counters and tier sizes for the NEO response cache.
+    """
+    return get_cache().stats()
@@ -1,13 +1,27 @@
 from fastapi import APIRouter, HTTPException
-from models import DeflectionStrategy, DeflectionResult, OrbitalData
+from models import (DeflectionStrategy, DeflectionResult, OrbitalData,
+                    TradeSpaceRequest, TradeSpacePoint, TradeSpaceResults,
+                    DeflectionPropagationRequest, DeflectionOption, DeflectionPropagationResults)
+from deflection import (DeflectionCalculator, RTN_DIRECTIONS, propagate_deflection, sweep_values,
+                        trade_space, trade_space_axes)
+from typing import Dict, List, Optional
+import numpy as np
 import math
 
 router = APIRouter()
 
+# Largest lead time x direction grid propagated per request
+MAX_PROPAGATION_CASES = 1_000_000
+
 @router.post("/calculate", response_model=DeflectionResult)
 async def calculate_deflection(strategy: DeflectionStrategy):
     """
     Calculate deflection parameters for a given strategy.
+    
+    When `orbital_data` and `encounter_epoch` are given, the delta-v is
+    applied `time_available` days before the encounter along `direction`
+    and the deflected orbit is propagated to report the new elements and
+    the B-plane miss distance.
     """
     try:
         if strategy.type == "kinetic-impactor":
@@ -19,8 +33,24 @@ async def calculate_deflection(strategy: DeflectionStrategy):
         else:
             raise HTTPException(status_code=400, detail="Unknown deflection strategy")
         
+        if strategy.orbital_data is not None:
+            if strategy.encounter_epoch is None:
+                raise HTTPException(status_code=400, detail="encounter_epoch is required with orbital_data")
+            elements = _elements(strategy.orbital_data)
+            direction = _directions([strategy.direction])
+            outcome = propagate_deflection(
+                elements, strategy.encounter_epoch,
+                [strategy.encounter_epoch - strategy.time_available], [result.delta_v], direction
+            )
+            result.new_orbital_data = _orbital_data(outcome["elements"], 0, 0)
+            result.b_plane_miss_distance_km = _finite(outcome["miss_distance_km"][0, 0])
+            result.nominal_miss_distance_km = outcome["nominal_miss_distance_km"]
+            result.capture_radius_km = outcome["capture_radius_km"]
+        
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
 
@@ -31,26 +61,7 @@ def calculate_kinetic_impactor(strategy: DeflectionStrategy) -> DeflectionResult
     Momentum transfer: Δv = (β * m_impactor * v_impactor) / m_asteroid
     where β is momentum enhancement factor (typically 1.5-3.0)
     """
-    # Typical impactor parameters
-    impactor_mass = 1000  # kg (spacecraft mass)
-    impactor_velocity = 10000  # m/s (relative velocity)
-    beta = 2.0  # momentum enhancement factor
-    
-    # Calculate delta-v
-    delta_v = (beta * impactor_mass * impactor_velocity) / strategy.asteroid_mass
-    
-    # Success probability based on time available
-    days_needed = 180  # Typical mission duration
-    success_prob = min(strategy.time_available / days_needed, 1.0) * 0.85
-    
-    # Number of missions required
-    required_missions = max(1, int(strategy.asteroid_mass / (impactor_mass * 100)))
-    
-    return DeflectionResult(
-        delta_v=delta_v,
-        success_probability=success_prob,
-        required_missions=required_missions
-    )
+    return _result(DeflectionCalculator.evaluate("kinetic-impactor", strategy.time_available, strategy.asteroid_mass))
 
 def calculate_gravity_tractor(strategy: DeflectionStrategy) -> DeflectionResult:
     """
@@ -59,30 +70,7 @@ def calculate_gravity_tractor(strategy: DeflectionStrategy) -> DeflectionResult:
     Uses gravitational attraction to slowly alter orbit.
     Requires long mission duration but very precise.
     """
-    # Gravity tractor parameters
-    spacecraft_mass = 20000  # kg
-    distance = 100  # meters from asteroid
-    G = 6.67430e-11  # gravitational constant
-    
-    # Gravitational force
-    force = G * spacecraft_mass * strategy.asteroid_mass / (distance ** 2)
-    
-    # Acceleration
-    acceleration = force / strategy.asteroid_mass
-    
-    # Delta-v over mission duration
-    time_seconds = strategy.time_available * 24 * 60 * 60
-    delta_v = acceleration * time_seconds
-    
-    # Success probability (requires long duration)
-    days_needed = 365  # Requires at least 1 year
-    success_prob = min(strategy.time_available / days_needed, 1.0) * 0.95
-    
-    return DeflectionResult(
-        delta_v=delta_v,
-        success_probability=success_prob,
-        required_missions=1
-    )
+    return _result(DeflectionCalculator.evaluate("gravity-tractor", strategy.time_available, strategy.asteroid_mass))
 
 def calculate_laser_ablation(strategy: DeflectionStrategy) -> DeflectionResult:
     """
@@ -91,29 +79,137 @@ def calculate_laser_ablation(strategy: DeflectionStrategy) -> DeflectionResult:
     Uses focused laser to vaporize surface material,
     creating thrust through ablation.
     """
-    # Laser parameters
-    laser_power = 100000  # watts
-    efficiency = 0.1  # 10% efficiency
+    return _result(DeflectionCalculator.evaluate("laser-ablation", strategy.time_available, strategy.asteroid_mass))
+
+def _result(values) -> DeflectionResult:
+    delta_v, success_prob, required_missions = values
+    return DeflectionResult(
+        delta_v=float(delta_v),
+        success_probability=float(success_prob),
+        required_missions=int(required_missions)
+    )
+
+@router.post("/trade-space", response_model=TradeSpaceResults)
+def explore_trade_space(request: TradeSpaceRequest):
+    """
+    Sweep strategies over lead time, asteroid mass and spacecraft parameters.
     
-    # Ablation thrust
-    thrust = laser_power * efficiency / (3e8)  # Approximate
+    The full Cartesian grid is evaluated in one vectorized pass and reduced
+    to its Pareto frontier (max delta-v, max success probability, fewest
+    missions), computed separately for each asteroid mass.
+    """
+    try:
+        axes = trade_space_axes(request)
+        columns, frontier = trade_space(request.strategies, axes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
     
-    # Delta-v over mission duration
-    time_seconds = strategy.time_available * 24 * 60 * 60
-    delta_v = (thrust * time_seconds) / strategy.asteroid_mass
+    points = []
+    for k in frontier[:request.limit]:
+        strategy = request.strategies[columns["strategy"][k]]
+        points.append(TradeSpacePoint(
+            strategy=strategy,
+            time_available=float(columns["time_available"][k]),
+            asteroid_mass=float(columns["asteroid_mass"][k]),
+            parameters={name: float(columns[name][k]) for name in DeflectionCalculator.PARAMETERS[strategy]},
+            delta_v=float(columns["delta_v"][k]),
+            success_probability=float(columns["success_probability"][k]),
+            required_missions=int(columns["required_missions"][k])
+        ))
+    return TradeSpaceResults(
+        grid_points=len(columns["delta_v"]),
+        frontier_size=len(frontier),
+        frontier=points
+    )
+
+@router.post("/propagate", response_model=DeflectionPropagationResults)
+def propagate_deflections(request: DeflectionPropagationRequest):
+    """
+    Evaluate the Earth miss distance for many push times and directions.
     
-    # Success probability (experimental technology)
-    days_needed = 270
-    success_prob = min(strategy.time_available / days_needed, 1.0) * 0.70
+    Each lead time (days before `encounter_epoch`) is combined with each RTN
+    direction. The delta-v is either fixed (`delta_v`) or taken from
+    `strategy` with the lead time as its time available. All combinations
+    are propagated in one vectorized pass, and the option with the largest
+    B-plane miss distance is returned in full.
+    """
+    try:
+        elements = _elements(request.orbital_data)
+        lead_times = sweep_values("lead_times", request.lead_times)
+        if np.any(lead_times < 0):
+            raise ValueError("lead_times must be >= 0")
+        directions = _directions(request.directions or list(RTN_DIRECTIONS.values()))
+        if len(lead_times) * len(directions) > MAX_PROPAGATION_CASES:
+            raise ValueError(f"At most {MAX_PROPAGATION_CASES} lead time x direction combinations are allowed")
+        
+        if (request.delta_v is None) == (request.strategy is None):
+            raise ValueError("Provide either delta_v or strategy")
+        if request.strategy is not None:
+            if request.asteroid_mass is None:
+                raise ValueError("asteroid_mass is required with strategy")
+            delta_v, _, _ = DeflectionCalculator.evaluate(request.strategy, lead_times, request.asteroid_mass)
+        else:
+            delta_v = np.full(len(lead_times), request.delta_v)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    required_missions = max(1, int(strategy.asteroid_mass / 1e9))
+    try:
+        epochs = request.encounter_epoch - lead_times
+        outcome = propagate_deflection(elements, request.encounter_epoch, epochs, delta_v, directions)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
     
-    return DeflectionResult(
-        delta_v=delta_v,
-        success_probability=success_prob,
-        required_missions=required_missions
+    miss = outcome["miss_distance_km"]
+    best = None
+    if np.any(np.isfinite(miss)):
+        m, k = np.unravel_index(np.nanargmax(miss), miss.shape)
+        best = DeflectionOption(
+            lead_time=float(lead_times[m]),
+            deflection_epoch=float(epochs[m]),
+            direction=directions[k].tolist(),
+            delta_v=float(delta_v[m]),
+            miss_distance_km=float(miss[m, k]),
+            new_orbital_data=_orbital_data(outcome["elements"], m, k)
+        )
+    return DeflectionPropagationResults(
+        nominal_miss_distance_km=outcome["nominal_miss_distance_km"],
+        relative_speed_kms=outcome["relative_speed_kms"],
+        capture_radius_km=outcome["capture_radius_km"],
+        lead_times=lead_times.tolist(),
+        directions=directions.tolist(),
+        delta_v=np.asarray(delta_v, dtype=np.float64).tolist(),
+        miss_distance_km=[[_finite(value) for value in row] for row in miss],
+        best=best
     )
 
+def _elements(orbit: OrbitalData) -> Dict[str, float]:
+    if orbit.epoch is None:
+        raise HTTPException(status_code=400, detail="orbital_data.epoch is required for propagation")
+    if not 0 <= orbit.e < 1 or orbit.a <= 0:
+        raise HTTPException(status_code=400, detail="Only bound elliptical orbits (0 <= e < 1, a > 0) are supported")
+    return orbit.model_dump()
+
+def _directions(directions: List[List[float]]) -> np.ndarray:
+    """
+    Validate RTN push directions and normalize them to unit vectors.
+    """
+    values = np.asarray(directions, dtype=np.float64)
+    if values.ndim != 2 or values.shape[1] != 3:
+        raise HTTPException(status_code=400, detail="Directions must be [radial, transverse, normal] triples")
+    norms = np.linalg.norm(values, axis=1)
+    if not np.all(np.isfinite(norms)) or np.any(norms == 0):
+        raise HTTPException(status_code=400, detail="Directions must be finite and non-zero")
+    return values / norms[:, None]
+
+def _orbital_data(elements: Dict[str, np.ndarray], m: int, k: int) -> OrbitalData:
+    return OrbitalData(**{key: float(values[m, k]) for key, values in elements.items()})
+
+def _finite(value) -> Optional[float]:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
 @router.get("/strategies")
 async def list_strategies():
     """
@@ -0,0 +1,277 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List
+import asyncio
+import io
+import json
+import math
+import numpy as np
+from models import BatchImpactRequest, MonteCarloRequest, TradeSpaceRequest, JobStatus
+from jobs import Job, JobQueueFull, get_job_manager
+from simulation import ImpactSimulator, batch_columns
+from cities import get_city_index
+from monte_carlo import run_monte_carlo, validate_spec
+from deflection import DeflectionCalculator, trade_space, trade_space_axes
+from process_pool import get_executor
+
+router = APIRouter()
+
+# Scenarios per batch job chunk
+BATCH_JOB_CHUNK = 50_000
+
+# Frontier points per trade-space result chunk
+FRONTIER_JOB_CHUNK = 10_000
+
+# Chunks a single job keeps queued in the process pool
+JOB_MAX_IN_FLIGHT = 1
+
+# Jobs whose results are NumPy columns and can be streamed as binary
+BINARY_KINDS = ("batch",)
+
+def simulate_batch_chunk(columns: Dict[str, np.ndarray], include_cities: bool) -> Dict[str, np.ndarray]:
+    """
+    Simulate one chunk of a batch job (runs inside a worker process).
+    """
+    results = ImpactSimulator.simulate_batch(
+        columns["size"], columns["density"], columns["velocity"],
+        columns["is_water_impact"], columns["lat"], columns["lng"], columns["angle"]
+    )
+    if include_cities:
+        totals = get_city_index().city_casualties_batch(
+            columns["lat"], columns["lng"], ImpactSimulator.effect_radii(results)
+        )
+        for key, values in totals.items():
+            results[f"cities.{key}"] = values
+    return results
+
+def trade_space_frontier(strategies: List[str], axes: Dict[str, np.ndarray]) -> List[Dict]:
+    """
+    Frontier records of a trade-space sweep (runs inside a worker process).
+    """
+    columns, frontier = trade_space(strategies, axes)
+    records = []
+    for k in frontier:
+        strategy = strategies[columns["strategy"][k]]
+        records.append({
+            "strategy": strategy,
+            "time_available": float(columns["time_available"][k]),
+            "asteroid_mass": float(columns["asteroid_mass"][k]),
+            "parameters": {name: float(columns[name][k]) for name in DeflectionCalculator.PARAMETERS[strategy]},
+            "delta_v": float(columns["delta_v"][k]),
+            "success_probability": float(columns["success_probability"][k]),
+            "required_missions": int(columns["required_missions"][k]),
+        })
+    return records
+
+def _submit(kind: str, run) -> Dict:
+    try:
+        return get_job_manager().submit(kind, run).status_dict()
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@router.post("/batch", response_model=JobStatus, status_code=202)
+async def submit_batch_job(request: BatchImpactRequest):
+    """
+    Run a batch simulation as a background job.
+
+    Results are streamed in scenario order, one record per scenario, with
+    the same fields as `/api/simulation/batch`.
+    """
+    try:
+        columns = batch_columns(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    n = len(columns["size"])
+
+    async def run(job: Job):
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        for start in range(0, n, BATCH_JOB_CHUNK):
+            chunk = {key: values[start:start + BATCH_JOB_CHUNK] for key, values in columns.items()}
+            results = await loop.run_in_executor(executor, simulate_batch_chunk, chunk, request.include_cities)
+            job.emit_columns(results)
+            job.set_progress(min(start + BATCH_JOB_CHUNK, n), n)
+
+    return _submit("batch", run)
+
+@router.post("/monte-carlo", response_model=JobStatus, status_code=202)
+async def submit_monte_carlo_job(request: MonteCarloRequest):
+    """
+    Run a Monte Carlo analysis as a background job.
+
+    The single result record matches `/api/simulation/monte-carlo`.
+    """
+    try:
+        for name in ("size", "density", "velocity", "angle", "lat", "lng"):
+            validate_spec(name, getattr(request, name))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def run(job: Job):
+        result = await run_monte_carlo(request, progress=job.set_progress, max_in_flight=JOB_MAX_IN_FLIGHT)
+        job.emit_records([result])
+
+    return _submit("monte-carlo", run)
+
+@router.post("/trade-space", response_model=JobStatus, status_code=202)
+async def submit_trade_space_job(request: TradeSpaceRequest):
+    """
+    Run a deflection trade-space sweep as a background job.
+
+    Streams every frontier point (no `limit` is applied).
+    """
+    try:
+        axes = trade_space_axes(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def run(job: Job):
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(get_executor(), trade_space_frontier, request.strategies, axes)
+        for start in range(0, len(records), FRONTIER_JOB_CHUNK):
+            job.emit_records(records[start:start + FRONTIER_JOB_CHUNK])
+
+    return _submit("trade-space", run)
+
+@router.post("/screening", response_model=JobStatus, status_code=202)
+async def submit_screening_job(full: bool = False):
+    """
+    Run a catalog MOID screen as a background job.
+
+    The single result record holds the number of objects screened and recomputed.
+    """
+    async def run(job: Job):
+        from catalog import get_catalog
+        from screening import run_screening
+        stats = await run_screening(get_catalog(), full, progress=job.set_progress,
+                                    max_in_flight=JOB_MAX_IN_FLIGHT)
+        job.emit_records([stats])
+
+    return _submit("screening", run)
+
+@router.post("/risk", response_model=JobStatus, status_code=202)
+async def submit_risk_job(full: bool = False):
+    """
+    Precompute catalog impact-risk envelopes as a background job.
+
+    The single result record holds the number of objects considered and recomputed.
+    """
+    async def run(job: Job):
+        from catalog import get_catalog
+        from risk import run_risk
+        stats = await run_risk(get_catalog(), full, progress=job.set_progress,
+                               max_in_flight=JOB_MAX_IN_FLIGHT)
+        job.emit_records([stats])
+
+    return _submit("risk", run)
+
+@router.get("", response_model=List[JobStatus])
+async def list_jobs():
+    """
+    List queued, running and recently finished jobs, newest first.
+    """
+    return [job.status_dict() for job in get_job_manager().list()]
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """
+    Poll a job's status and progress.
+    """
+    return _job(job_id).status_dict()
+
+@router.delete("/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job. Results emitted so far stay readable.
+    """
+    _job(job_id)
+    job = get_job_manager().cancel(job_id)
+    await asyncio.sleep(0)  # let a running job observe the cancellation
+    return job.status_dict()
+
+@router.get("/{job_id}/results")
+async def stream_job_results(
+    job_id: str,
+    format: str = Query("ndjson", description="ndjson, or binary (concatenated .npy record arrays, batch jobs only)"),
+    offset: int = Query(0, ge=0, description="First result chunk to send (to resume a stream)")
+):
+    """
+    Stream a job's results while they are being computed.
+
+    The response stays open until the job finishes. With format=ndjson each
+    line is one record. If the job fails or is cancelled, a final
+    {"error": ...} line is sent. With format=binary each result chunk is one
+    NumPy .npy structured array; read them back with repeated `np.load` calls
+    on the stream.
+    """
+    job = _job(job_id)
+    if format == "ndjson":
+        return StreamingResponse(_ndjson_stream(job, offset), media_type="application/x-ndjson")
+    if format == "binary":
+        if job.kind not in BINARY_KINDS:
+            raise HTTPException(status_code=400, detail=f"Binary results are only available for: {', '.join(BINARY_KINDS)}")
+        return StreamingResponse(_binary_stream(job, offset), media_type="application/octet-stream")
+    raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'binary'")
+
+def _job(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+async def _chunks(job: Job, offset: int) -> AsyncIterator:
+    index = offset
+    while True:
+        await job.wait_for_chunk(index)
+        if index >= len(job.chunks):
+            return
+        yield await asyncio.to_thread(job.read_chunk, index)
+        index += 1
+
+async def _ndjson_stream(job: Job, offset: int) -> AsyncIterator[bytes]:
+    async for chunk in _chunks(job, offset):
+        if isinstance(chunk, dict):
+            lines = await asyncio.to_thread(_column_lines, chunk)
+        else:
+            lines = "".join(json.dumps(record) + "\n" for record in chunk)
+        yield lines.encode()
+    if job.status in ("failed", "cancelled"):
+        yield (json.dumps({"error": job.error or job.status}) + "\n").encode()
+
+async def _binary_stream(job: Job, offset: int) -> AsyncIterator[bytes]:
+    async for chunk in _chunks(job, offset):
+        yield await asyncio.to_thread(_npy_bytes, chunk)
+
+def _column_lines(columns: Dict[str, np.ndarray]) -> str:
+    """
+    Render a column chunk as NDJSON, nesting "group.field" keys.
+    """
+    lists = {key: values.tolist() for key, values in columns.items()}
+    rows = len(next(iter(lists.values())))
+    lines = []
+    for row in range(rows):
+        record: Dict[str, object] = {}
+        for key, values in lists.items():
+            value = values[row]
+            if isinstance(value, float) and math.isnan(value):
+                value = None
+            group, _, field = key.rpartition(".")
+            if group:
+                record.setdefault(group, {})[field] = value
+            else:
+                record[field] = value
+        lines.append(json.dumps(record))
+    return "\n".join(lines) + "\n"
+
+def _npy_bytes(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    Serialize a column chunk as one .npy structured array.
+    """
+    dtype = [(key, values.dtype.newbyteorder("<") if values.dtype.kind in "fiu" else values.dtype)
+             for key, values in columns.items()]
+    array = np.empty(len(next(iter(columns.values()))), dtype=dtype)
+    for key, values in columns.items():
+        array[key] = values
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Optional
+import asyncio
+import numpy as np
+from models import EphemerisRequest
+from orbital_mechanics import OrbitalMechanics
+
+router = APIRouter()
+
+# Upper bound on bodies x epochs per request (12 bytes per position)
+MAX_EPHEMERIS_POINTS = 5_000_000
+
+# Positions computed per chunk when streaming the catalog
+STREAM_CHUNK_POINTS = 500_000
+
+def _catalog():
+    """
+    The local NEO catalog, imported on first use (SQLAlchemy is slow to import).
+    """
+    from catalog import get_catalog
+    return get_catalog()
+
+def _epochs(start: float, stop: float, steps: int) -> np.ndarray:
+    if stop < start:
+        raise HTTPException(status_code=400, detail="stop must not be before start")
+    return np.linspace(start, stop, steps)
+
+def _binary_headers(n_bodies: int, steps: int) -> Dict[str, str]:
+    return {
+        "X-Ephemeris-Shape": f"{n_bodies},{steps},3",
+        "X-Ephemeris-Dtype": "<f4",
+        "X-Ephemeris-Units": "AU, heliocentric ecliptic",
+    }
+
+@router.post("/ephemeris")
+async def compute_ephemeris(request: EphemerisRequest):
+    """
+    Propagate orbits to evenly spaced epochs.
+    
+    Bodies come from `orbits` (element sets) and/or `asteroid_ids` (local
+    catalog). With format=binary the response is a little-endian float32
+    array of shape (bodies, steps, 3) in AU. The shape is given in the
+    X-Ephemeris-Shape header, and bodies are ordered as in the request.
+    """
+    if request.format not in ("binary", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'binary' or 'json'")
+    epochs = _epochs(request.start, request.stop, request.steps)
+    
+    orbits = request.orbits or []
+    elements = {
+        "a": [o.a for o in orbits],
+        "e": [o.e for o in orbits],
+        "i": [o.i for o in orbits],
+        "omega": [o.omega for o in orbits],
+        "Omega": [o.Omega for o in orbits],
+        "M": [o.M for o in orbits],
+        "epoch": [o.epoch if o.epoch is not None else request.start for o in orbits],
+    }
+    ids = [None] * len(orbits)
+    if request.asteroid_ids:
+        found = await asyncio.to_thread(_catalog().orbital_elements, request.asteroid_ids)
+        by_id = {neo_id: k for k, neo_id in enumerate(found["id"])}
+        missing = [neo_id for neo_id in request.asteroid_ids if neo_id not in by_id]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"No orbital elements for: {', '.join(missing[:10])}")
+        for neo_id in request.asteroid_ids:
+            for key in elements:
+                elements[key].append(found[key][by_id[neo_id]])
+        ids += request.asteroid_ids
+    
+    n_bodies = len(ids)
+    if n_bodies == 0:
+        raise HTTPException(status_code=400, detail="Provide orbits or asteroid_ids")
+    if n_bodies * request.steps > MAX_EPHEMERIS_POINTS:
+        raise HTTPException(status_code=400, detail=f"Request exceeds {MAX_EPHEMERIS_POINTS} positions")
+    if any(not 0 <= e < 1 for e in elements["e"]) or any(a <= 0 for a in elements["a"]):
+        raise HTTPException(status_code=400, detail="Only bound elliptical orbits (0 <= e < 1, a > 0) are supported")
+    
+    elements = {key: np.asarray(values, dtype=np.float64) for key, values in elements.items()}
+    positions, _ = await asyncio.to_thread(OrbitalMechanics.propagate, elements, epochs)
+    
+    if request.format == "json":
+        return {"epochs": epochs.tolist(), "ids": ids, "positions": positions.tolist()}
+    return Response(
+        content=positions.astype("<f4").tobytes(),
+        media_type="application/octet-stream",
+        headers=_binary_headers(n_bodies, request.steps)
+    )
+
+@router.get("/catalog/ids")
+async def catalog_ids(
+    hazardous: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    IDs of catalog objects in the order used by /catalog/ephemeris (objects
+    on unbound orbits are left out).
+    """
+    elements = await asyncio.to_thread(_catalog().orbital_elements, None, hazardous, limit, bound_only=True)
+    return {"count": len(elements["id"]), "ids": elements["id"]}
+
+@router.get("/catalog/ephemeris")
+async def catalog_ephemeris(
+    start: float = Query(..., description="First epoch (Julian date)"),
+    stop: float = Query(..., description="Last epoch (Julian date)"),
+    steps: int = Query(100, ge=1, le=10000),
+    hazardous: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    Stream trajectories for the whole local catalog.
+    
+    The body is a little-endian float32 array of shape (bodies, steps, 3),
+    produced chunk by chunk so that memory stays flat. Bodies are in the
+    order returned by /catalog/ids with the same filters. Only bound
+    elliptical orbits (0 <= e < 1, a > 0) are propagated.
+    """
+    epochs = _epochs(start, stop, steps)
+    elements = await asyncio.to_thread(_catalog().orbital_elements, None, hazardous, limit, bound_only=True)
+    n_bodies = len(elements["id"])
+    bodies_per_chunk = max(1, STREAM_CHUNK_POINTS // steps)
+    
+    async def generate():
+        for first in range(0, n_bodies, bodies_per_chunk):
+            chunk = {key: values[first:first + bodies_per_chunk]
+                     for key, values in elements.items() if key != "id"}
+            positions, _ = await asyncio.to_thread(OrbitalMechanics.propagate, chunk, epochs)
+            yield positions.astype("<f4").tobytes()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/octet-stream",
+        headers=_binary_headers(n_bodies, steps)
+    )
@@ -1,102 +1,620 @@
-from fastapi import APIRouter, HTTPException
-from models import ImpactParameters, ImpactResults, EnergyResult, CraterResult, SeismicResult, TsunamiResult, AtmosphericResult, CasualtiesResult
-from simulation import ImpactSimulator
+from fastapi import APIRouter, HTTPException, Response, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from typing import Any, Dict, Optional
+import asyncio
+import io
+import json
+import math
+import time
+import numpy as np
+from models import ImpactLocation, ImpactParameters, ImpactResults, TerrainResult, EnergyResult, EntryResult, CraterResult, SeismicResult, TsunamiResult, AtmosphericResult, CasualtiesResult, CoastalImpactResults, BatchImpactRequest, BatchImpactResults, GridRequest, MonteCarloRequest, MonteCarloResults, CityImpactResults
+from simulation import ImpactSimulator, batch_columns
+from monte_carlo import run_monte_carlo
+from cities import get_city_index
+from coastline import get_coastline
+from result_cache import RESULT_CACHE_SIGNIFICANT_DIGITS, cache_key, get_result_cache, quantize, quantize_location
+from deflection import sweep_values
+from simulation_graph import SimulationGraph, flatten_parameters, diff_results
+import metrics
 
 router = APIRouter()
 
+# Points per parameter-space grid (e.g. 1024 x 1024)
+MAX_GRID_POINTS = 1 << 20
+
+# Valid range of each sweepable parameter (same constraints as ImpactParameters)
+GRID_PARAMETERS = {
+    "size": (0, math.inf),
+    "density": (0, math.inf),
+    "velocity": (0, math.inf),
+    "angle": (0, 90),
+    "lat": (-90, 90),
+    "lng": (-180, 180),
+}
+
+# Numeric result columns a grid can return
+GRID_FIELDS = (
+    "terrain.elevation", "terrain.water_depth",
+    "energy.joules", "energy.megatons_tnt",
+    "entry.burst_altitude", "entry.breakup_altitude", "entry.airburst_energy_mt",
+    "entry.ground_energy_mt", "entry.impact_velocity",
+    "crater.diameter", "crater.depth",
+    "seismic.magnitude", "seismic.radius",
+    "tsunami.wave_height", "tsunami.affected_radius",
+    "atmospheric.fireball_radius", "atmospheric.thermal_radiation", "atmospheric.overpressure",
+    "casualties.estimated", "casualties.affected_population",
+)
+
+# Minimum seconds between result frames of a live session; updates arriving
+# in between are merged into the next frame
+SESSION_FRAME_INTERVAL = 1 / 30
+
 @router.post("/simulate", response_model=ImpactResults)
 async def simulate_impact(params: ImpactParameters):
     """
     Run a complete asteroid impact simulation.
     
     This endpoint calculates:
+    - Surface at the impact point (land or water, water depth)
     - Impact energy
     - Crater dimensions
     - Seismic effects
     - Tsunami effects (if water impact)
     - Atmospheric effects
     - Estimated casualties
+    
+    Responses are cached per scenario (see result_cache.py), so repeated
+    scenarios skip both the simulation and JSON encoding.
     """
+    params = _quantized(params)
+    key = cache_key("simulate", params.size, params.density, params.velocity, params.angle,
+                    params.impact_location.lat, params.impact_location.lng, params.is_water_impact)
+    result_cache = get_result_cache()
+    body = result_cache.get(key)
+    if body is not None:
+        return Response(body, media_type="application/json", headers={"X-Cache": "HIT"})
+    
     try:
-        # Calculate impact energy
+        body = _simulate(params).model_dump_json().encode()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+    result_cache.set(key, body)
+    return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+def _simulate(params: ImpactParameters) -> ImpactResults:
+    """
+    The /simulate pipeline, uncached.
+    """
+    # Land or water at the impact point, unless the client chose
+    with metrics.stage("terrain"):
+        is_water, water_depth, elevation = ImpactSimulator.surface_conditions(
+            params.impact_location.lat,
+            params.impact_location.lng,
+            params.is_water_impact
+        )
+    
+    # Calculate impact energy
+    with metrics.stage("energy"):
         energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(
             params.size,
             params.density,
             params.velocity
         )
-        
-        # Calculate crater size
+    
+    # Atmospheric entry: airburst, or how much energy reaches the ground
+    with metrics.stage("entry"):
+        burst_altitude, breakup_altitude, ground_fraction, impact_velocity = \
+            ImpactSimulator.calculate_atmospheric_entry(
+                params.size,
+                params.density,
+                params.velocity,
+                params.angle
+            )
+    ground_joules, ground_mt = energy_joules * ground_fraction, energy_mt * ground_fraction
+    
+    # Calculate crater size
+    with metrics.stage("crater"):
         crater_diameter, crater_depth = ImpactSimulator.calculate_crater_size(
-            energy_mt,
-            params.is_water_impact
+            ground_mt,
+            is_water
         )
-        
-        # Calculate seismic effects
+    
+    # Calculate seismic effects
+    with metrics.stage("seismic"):
         seismic_magnitude, seismic_radius = ImpactSimulator.calculate_seismic_effects(
-            energy_joules
+            ground_joules
         )
-        
-        # Calculate tsunami effects (if water impact)
-        tsunami_result = None
-        if params.is_water_impact:
-            wave_height, tsunami_radius = ImpactSimulator.calculate_tsunami_effects(energy_mt)
-            tsunami_result = TsunamiResult(
-                wave_height=wave_height,
-                affected_radius=tsunami_radius
+    
+    # Calculate tsunami effects (if water impact)
+    tsunami_result = None
+    if is_water:
+        with metrics.stage("tsunami"):
+            wave_height, tsunami_radius = ImpactSimulator.calculate_tsunami_effects(ground_mt, water_depth)
+        with metrics.stage("inundation"):
+            coast_points, first_arrival, inundated = ImpactSimulator.calculate_coastal_inundation(
+                params.impact_location.lat,
+                params.impact_location.lng,
+                wave_height,
+                tsunami_radius
             )
-        
-        # Calculate atmospheric effects
+        tsunami_result = TsunamiResult(
+            wave_height=wave_height,
+            affected_radius=tsunami_radius,
+            affected_coast_points=coast_points,
+            first_arrival=first_arrival,
+            inundated_population=inundated
+        )
+    
+    # Calculate atmospheric effects
+    with metrics.stage("atmospheric"):
         fireball, thermal, overpressure = ImpactSimulator.calculate_atmospheric_effects(
-            energy_mt
+            energy_mt,
+            burst_altitude
         )
-        
-        # Estimate casualties
-        casualties, affected_pop = ImpactSimulator.estimate_casualties(overpressure)
-        
-        # Build result
-        result = ImpactResults(
-            energy=EnergyResult(
-                joules=energy_joules,
-                megatons_tnt=energy_mt
-            ),
-            crater=CraterResult(
-                diameter=crater_diameter,
-                depth=crater_depth
-            ),
-            seismic=SeismicResult(
-                magnitude=seismic_magnitude,
-                radius=seismic_radius
-            ),
-            tsunami=tsunami_result,
-            atmospheric=AtmosphericResult(
-                fireball_radius=fireball,
-                thermal_radiation=thermal,
-                overpressure=overpressure
-            ),
-            casualties=CasualtiesResult(
-                estimated=casualties,
-                affected_population=affected_pop
-            )
+    
+    # Estimate casualties
+    with metrics.stage("casualties"):
+        casualties, affected_pop = ImpactSimulator.estimate_casualties_at(
+            params.impact_location.lat,
+            params.impact_location.lng,
+            fireball,
+            thermal,
+            overpressure
         )
-        
-        return result
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+    
+    # Build result
+    result = ImpactResults(
+        terrain=TerrainResult(
+            is_water_impact=bool(is_water),
+            elevation=None if np.isnan(elevation) else elevation,
+            water_depth=water_depth
+        ),
+        energy=EnergyResult(
+            joules=energy_joules,
+            megatons_tnt=energy_mt
+        ),
+        entry=EntryResult(
+            is_airburst=bool(burst_altitude > 0),
+            burst_altitude=burst_altitude,
+            breakup_altitude=breakup_altitude,
+            airburst_energy_mt=energy_mt - ground_mt,
+            ground_energy_mt=ground_mt,
+            impact_velocity=impact_velocity
+        ),
+        crater=CraterResult(
+            diameter=crater_diameter,
+            depth=crater_depth
+        ),
+        seismic=SeismicResult(
+            magnitude=seismic_magnitude,
+            radius=seismic_radius
+        ),
+        tsunami=tsunami_result,
+        atmospheric=AtmosphericResult(
+            fireball_radius=fireball,
+            thermal_radiation=thermal,
+            overpressure=overpressure
+        ),
+        casualties=CasualtiesResult(
+            estimated=casualties,
+            affected_population=affected_pop
+        )
+    )
+    
+    return result
 
 @router.get("/energy-estimate")
 async def estimate_energy(size: float, density: float, velocity: float):
     """
     Quick energy estimation without full simulation.
     """
+    size, density, velocity = quantize(size), quantize(density), quantize(velocity)
+    key = cache_key("energy-estimate", size, density, velocity)
+    result_cache = get_result_cache()
+    body = result_cache.get(key)
+    if body is not None:
+        return Response(body, media_type="application/json", headers={"X-Cache": "HIT"})
+    
     try:
         energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(
             size, density, velocity
         )
-        return {
+        body = json.dumps({
             "joules": energy_joules,
             "megatons_tnt": energy_mt,
             "hiroshima_equivalent": energy_mt / 0.015  # Hiroshima was ~15 kilotons
-        }
+        }, separators=(",", ":")).encode()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Calculation error: {str(e)}")
+    result_cache.set(key, body)
+    return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+def _quantized(params: ImpactParameters) -> ImpactParameters:
+    """
+    Round scenario parameters for the result cache (a no-op unless
+    RESULT_CACHE_SIGNIFICANT_DIGITS is set).
+    """
+    if not RESULT_CACHE_SIGNIFICANT_DIGITS:
+        return params
+    return params.model_copy(update={
+        "size": quantize(params.size),
+        "density": quantize(params.density),
+        "velocity": quantize(params.velocity),
+        "angle": quantize(params.angle),
+        "impact_location": ImpactLocation(
+            lat=quantize_location(params.impact_location.lat),
+            lng=quantize_location(params.impact_location.lng),
+        ),
+    })
+
+@router.websocket("/session")
+async def simulation_session(websocket: WebSocket):
+    """
+    Live simulation session for interactive parameter controls.
+    
+    The client sends JSON objects with any subset of the ImpactParameters
+    fields (plus an optional "seq" number); each update is merged into the
+    session's current parameters. Only the stages downstream of a changed
+    parameter are recomputed.
+    
+    Bursts of updates are coalesced: at most one result frame is sent per
+    SESSION_FRAME_INTERVAL, for the latest merged parameters, and
+    intermediate states are never computed. Each frame is
+    {"type": "result", "seq": ..., "changed": {...}, "recomputed": [...]},
+    where "changed" holds only the result fields that differ from the
+    previous frame (the first frame holds all of them). Invalid parameters
+    produce {"type": "error", "seq": ..., "detail": ...} and leave the
+    session state unchanged.
+    """
+    await websocket.accept()
+    pending: Dict[str, Any] = {}
+    seq: Optional[int] = None
+    updated = asyncio.Event()
+    
+    async def receive():
+        nonlocal seq
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "seq": None, "detail": "Messages must be JSON objects"})
+                continue
+            seq = message.pop("seq", seq)
+            location = message.pop("impact_location", None)
+            if isinstance(location, dict):
+                pending["impact_location"] = {**pending.get("impact_location", {}), **location}
+            elif location is not None:
+                pending["impact_location"] = location
+            pending.update(message)
+            updated.set()
+    
+    receiver = asyncio.create_task(receive())
+    graph = SimulationGraph()
+    params: Dict[str, Any] = {}
+    previous = None
+    try:
+        while True:
+            waiter = asyncio.create_task(updated.wait())
+            await asyncio.wait({waiter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done():
+                waiter.cancel()
+                receiver.result()  # re-raise the disconnect
+            updated.clear()
+            frame_start = time.perf_counter()
+            frame_seq = seq
+            
+            update = dict(pending)
+            pending.clear()
+            if "impact_location" in update and isinstance(update["impact_location"], dict):
+                update["impact_location"] = {**params.get("impact_location", {}), **update["impact_location"]}
+            try:
+                merged = ImpactParameters(**{**params, **update}).model_dump()
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "seq": frame_seq,
+                                           "detail": e.errors(include_url=False, include_context=False)})
+                continue
+            except TypeError as e:
+                await websocket.send_json({"type": "error", "seq": frame_seq, "detail": str(e)})
+                continue
+            
+            try:
+                results, recomputed = graph.update(flatten_parameters(merged))
+            except Exception as e:
+                await websocket.send_json({"type": "error", "seq": frame_seq, "detail": f"Simulation error: {str(e)}"})
+                continue
+            params = merged
+            await websocket.send_json({
+                "type": "result",
+                "seq": frame_seq,
+                "changed": diff_results(previous, results),
+                "recomputed": recomputed,
+            })
+            previous = results
+            
+            # Let further updates accumulate until the next frame is due
+            await asyncio.sleep(max(0.0, SESSION_FRAME_INTERVAL - (time.perf_counter() - frame_start)))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
+@router.post("/batch", response_model=BatchImpactResults)
+def simulate_batch(request: BatchImpactRequest):
+    """
+    Run many impact simulations in a single vectorized pass.
+    
+    Accepts either a list of ImpactParameters (`scenarios`) or columnar
+    arrays (`columns`, faster to parse for large sweeps). Results are
+    returned column-wise in scenario order and match `/simulate` exactly.
+    """
+    try:
+        columns = batch_columns(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        results = ImpactSimulator.simulate_batch(
+            columns["size"],
+            columns["density"],
+            columns["velocity"],
+            columns["is_water_impact"],
+            columns["lat"],
+            columns["lng"],
+            columns["angle"]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+    
+    if request.include_cities:
+        totals = get_city_index().city_casualties_batch(
+            columns["lat"], columns["lng"], ImpactSimulator.effect_radii(results)
+        )
+        for key, values in totals.items():
+            results[f"cities.{key}"] = values
+    
+    body: Dict[str, object] = {"count": len(columns["size"])}
+    for key, values in results.items():
+        group, field = key.split(".")
+        body.setdefault(group, {})[field] = _column_to_list(values)
+    return body
+
+@router.post("/cities", response_model=CityImpactResults)
+def simulate_city_impacts(params: ImpactParameters):
+    """
+    Per-city breakdown of an impact.
+    
+    Returns every city inside the fireball, overpressure, thermal, seismic
+    and (for water impacts) tsunami radii, with the zones reaching it and
+    an estimated casualty count. The radii are those of /simulate
+    (including atmospheric entry: an airburst has no seismic zone).
+    """
+    try:
+        results = ImpactSimulator.simulate_batch(
+            np.array([params.size]),
+            np.array([params.density]),
+            np.array([params.velocity]),
+            None if params.is_water_impact is None else np.array([params.is_water_impact]),
+            np.array([params.impact_location.lat]),
+            np.array([params.impact_location.lng]),
+            np.array([params.angle])
+        )
+        # Tsunami radii are NaN for land impacts
+        radii = {
+            zone: float(radius[0])
+            for zone, radius in ImpactSimulator.effect_radii(results).items()
+            if not np.isnan(radius[0])
+        }
+        
+        cities = get_city_index().city_casualties(
+            params.impact_location.lat,
+            params.impact_location.lng,
+            radii
+        )
+        return {
+            "radii": radii,
+            "cities": cities,
+            "total_population": sum(city["population"] for city in cities),
+            "estimated_casualties": sum(city["estimated_casualties"] for city in cities)
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+
+@router.post("/tsunami", response_model=CoastalImpactResults)
+def simulate_tsunami(params: ImpactParameters):
+    """
+    Per-coast breakdown of a tsunami.
+    
+    Returns every coastline point the wave reaches, in order of arrival,
+    with its distance, arrival time, wave height (run-up) and the coastal
+    population living below it. Land impacts reach no coast. Requires the
+    coastline dataset (`python coastline.py build`).
+    """
+    coastline = get_coastline()
+    if coastline is None:
+        raise HTTPException(status_code=503, detail="Coastline dataset not built (run `python coastline.py build`)")
+    
+    try:
+        is_water, water_depth, _ = ImpactSimulator.surface_conditions(
+            params.impact_location.lat,
+            params.impact_location.lng,
+            params.is_water_impact
+        )
+        wave_height = tsunami_radius = None
+        if is_water:
+            energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(
+                params.size,
+                params.density,
+                params.velocity
+            )
+            _, _, ground_fraction, _ = ImpactSimulator.calculate_atmospheric_entry(
+                params.size,
+                params.density,
+                params.velocity,
+                params.angle
+            )
+            wave_height, tsunami_radius = ImpactSimulator.calculate_tsunami_effects(
+                energy_mt * ground_fraction,
+                water_depth
+            )
+            wave_height, tsunami_radius = float(wave_height), float(tsunami_radius)
+            points = coastline.inundation(
+                params.impact_location.lat,
+                params.impact_location.lng,
+                wave_height,
+                tsunami_radius
+            )
+        else:
+            points = coastline.inundation(params.impact_location.lat, params.impact_location.lng, 0.0, 0.0)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+    
+    population = points.get("inundated_population")
+    coast = {
+        "lat": points["lat"].tolist(),
+        "lng": points["lng"].tolist(),
+        "distance_km": points["distance_km"].tolist(),
+        "arrival_time": (points["arrival_time"] / 60).tolist(),
+        "wave_height": points["wave_height"].tolist(),
+        "inundated_population": None if population is None else population.tolist(),
+    }
+    return {
+        "is_water_impact": bool(is_water),
+        "wave_height": wave_height,
+        "affected_radius": tsunami_radius,
+        "affected_coast_points": len(points["index"]),
+        "first_arrival": coast["arrival_time"][0] if coast["arrival_time"] else None,
+        "inundated_population": None if population is None else int(population.sum()),
+        "coast": coast,
+    }
+
+@router.post("/monte-carlo", response_model=MonteCarloResults)
+async def simulate_monte_carlo(request: MonteCarloRequest):
+    """
+    Run a Monte Carlo uncertainty analysis.
+    
+    Each input (size, density, velocity, angle, lat, lng) is given as a
+    distribution: fixed, normal, lognormal, uniform, or empirical samples.
+    Draws are simulated in vectorized chunks across a process pool and
+    reduced to percentile bands for every ImpactResults field. Passing the
+    returned `seed` back reproduces the run exactly.
+    """
+    try:
+        return await run_monte_carlo(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+
+@router.post("/grid")
+def simulate_grid(request: GridRequest):
+    """
+    Evaluate result surfaces over a 2-D parameter grid in one pass.
+    
+    Two parameters are swept (`x` along columns, `y` along rows) and the
+    others are fixed by `base`. With format=npy (the default) the body is a
+    .npy float32 array of shape (fields, y, x), readable with `np.load` or
+    viewed in place as a Float32Array after the .npy header. Field order,
+    shape and axes are given in the X-Grid-* headers. NaN marks values that
+    do not apply (e.g. tsunami fields on land).
+    
+    `preview` evaluates every k-th value of each axis, with k chosen per
+    axis so that at most `preview` values remain. This gives a cheap coarse
+    surface to draw before the full grid arrives. The strides (y, x) are
+    returned in X-Grid-Stride.
+    """
+    try:
+        axes = {}
+        for name, axis in (("x", request.x), ("y", request.y)):
+            if axis.parameter not in GRID_PARAMETERS:
+                raise ValueError(f"{name}.parameter must be one of: {', '.join(GRID_PARAMETERS)}")
+            values = sweep_values(axis.parameter, axis.sweep)
+            low, high = GRID_PARAMETERS[axis.parameter]
+            if axis.parameter in ("size", "density", "velocity"):
+                valid = values > low
+            else:
+                valid = (values >= low) & (values <= high)
+            if not valid.all():
+                raise ValueError(f"{axis.parameter}: values out of range")
+            axes[name] = values
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.x.parameter == request.y.parameter:
+        raise HTTPException(status_code=400, detail="x and y must sweep different parameters")
+    unknown = [field for field in request.fields if field not in GRID_FIELDS]
+    if unknown or not request.fields:
+        raise HTTPException(status_code=400, detail=f"fields must be a non-empty subset of: {', '.join(GRID_FIELDS)}")
+    if request.format not in ("npy", "json"):
+        raise HTTPException(status_code=400, detail="format must be 'npy' or 'json'")
+    
+    stride = {name: 1 for name in axes}
+    if request.preview is not None:
+        stride = {name: math.ceil(len(values) / request.preview) for name, values in axes.items()}
+        axes = {name: values[::stride[name]] for name, values in axes.items()}
+    shape = (len(axes["y"]), len(axes["x"]))
+    if shape[0] * shape[1] > MAX_GRID_POINTS:
+        raise HTTPException(status_code=400, detail=f"Grid has {shape[0] * shape[1]} points; at most {MAX_GRID_POINTS} are allowed")
+    
+    base = request.base
+    columns = {
+        "size": base.size,
+        "density": base.density,
+        "velocity": base.velocity,
+        "angle": base.angle,
+        "lat": base.impact_location.lat,
+        "lng": base.impact_location.lng,
+    }
+    columns = {key: np.full(shape, value, dtype=np.float64) for key, value in columns.items()}
+    columns[request.x.parameter][:] = axes["x"][None, :]
+    columns[request.y.parameter][:] = axes["y"][:, None]
+    columns = {key: values.ravel() for key, values in columns.items()}
+    water = None if base.is_water_impact is None else np.full(columns["size"].shape, base.is_water_impact)
+    
+    try:
+        results = ImpactSimulator.simulate_batch(
+            columns["size"],
+            columns["density"],
+            columns["velocity"],
+            water,
+            columns["lat"],
+            columns["lng"],
+            columns["angle"]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+    
+    if request.format == "json":
+        return {
+            "x": {"parameter": request.x.parameter, "values": axes["x"].tolist(), "stride": stride["x"]},
+            "y": {"parameter": request.y.parameter, "values": axes["y"].tolist(), "stride": stride["y"]},
+            "fields": {
+                field: [_column_to_list(row) for row in results[field].astype(np.float64).reshape(shape)]
+                for field in request.fields
+            },
+        }
+    
+    surfaces = np.empty((len(request.fields),) + shape, dtype="<f4")
+    for k, field in enumerate(request.fields):
+        surfaces[k] = results[field].reshape(shape)
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, surfaces, allow_pickle=False)
+    return Response(
+        content=buffer.getvalue(),
+        media_type="application/octet-stream",
+        headers={
+            "X-Grid-Shape": f"{len(request.fields)},{shape[0]},{shape[1]}",
+            "X-Grid-Fields": ",".join(request.fields),
+            "X-Grid-Axes": f"{request.y.parameter},{request.x.parameter}",
+            "X-Grid-Stride": f"{stride['y']},{stride['x']}",
+        }
+    )
+
+def _column_to_list(values: np.ndarray) -> list:
+    """
+    Convert a result column to a JSON-ready list, mapping NaN to null.
+    """
+    if values.dtype.kind == "f" and np.isnan(values).any():
+        return np.where(np.isnan(values), None, values.astype(object)).tolist()
+    return values.tolist()
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, HTTPException, Query
+import numpy as np
+from models import TerrainPointsRequest, TerrainPoints, TerrainProfile
+from terrain import DEFAULT_PROFILE_SAMPLES, TerrainGrid, get_terrain_grid
+
+router = APIRouter()
+
+MAX_TERRAIN_POINTS = 1_000_000
+
+MAX_PROFILE_SAMPLES = 100_000
+
+def _grid() -> TerrainGrid:
+    grid = get_terrain_grid()
+    if grid is None:
+        raise HTTPException(status_code=503, detail="Terrain grid not built (run `python terrain.py build`)")
+    return grid
+
+@router.get("/point")
+async def terrain_point(lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180)):
+    """
+    Elevation, land/water and water depth at one point.
+    """
+    is_water, water_depth, elevation = _grid().surface(lat, lng)
+    return {
+        "lat": lat,
+        "lng": lng,
+        "is_water": bool(is_water),
+        "elevation": float(elevation),
+        "water_depth": float(water_depth)
+    }
+
+@router.post("/points", response_model=TerrainPoints)
+def terrain_points(request: TerrainPointsRequest):
+    """
+    Elevation, land/water and water depth for many points in one lookup.
+
+    Results are returned column-wise in request order.
+    """
+    lat = np.asarray(request.lat, dtype=np.float64)
+    lng = np.asarray(request.lng, dtype=np.float64)
+    if len(lat) != len(lng):
+        raise HTTPException(status_code=400, detail="lat and lng must have the same length")
+    if len(lat) > MAX_TERRAIN_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TERRAIN_POINTS} points per request")
+    if not ((np.abs(lat) <= 90).all() and (np.abs(lng) <= 180).all()):
+        raise HTTPException(status_code=400, detail="Coordinates out of range")
+
+    is_water, water_depth, elevation = _grid().surface(lat, lng)
+    return {
+        "is_water": is_water.tolist(),
+        "elevation": elevation.tolist(),
+        "water_depth": water_depth.tolist()
+    }
+
+@router.get("/profile", response_model=TerrainProfile)
+def terrain_profile(
+    start_lat: float = Query(..., ge=-90, le=90),
+    start_lng: float = Query(..., ge=-180, le=180),
+    end_lat: float = Query(..., ge=-90, le=90),
+    end_lng: float = Query(..., ge=-180, le=180),
+    samples: int = Query(DEFAULT_PROFILE_SAMPLES, ge=2, le=MAX_PROFILE_SAMPLES, description="Equally spaced samples, endpoints included")
+):
+    """
+    Terrain along the great circle between two points.
+
+    Samples are equally spaced along the shorter arc; each reports its
+    distance from the start, position, elevation and whether it is water.
+    """
+    profile = _grid().profile(start_lat, start_lng, end_lat, end_lng, samples)
+    return {key: values.tolist() for key, values in profile.items()}
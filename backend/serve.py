@@ -0,0 +1,129 @@
+"""
+Production launcher: several uvicorn worker processes, no auto-reload.
+
+    python serve.py --workers 4 [--host 0.0.0.0] [--port 8000]
+
+The app is imported and the array datasets are opened once, here, and the
+workers are then forked from this process. They start in milliseconds
+instead of each importing the app again, and share the imported code and
+the datasets copy-on-write. Datasets built as .npz archives are extracted
+to .npy files and memory mapped (see datasets.py), so they are shared
+through the page cache rather than copied. The CPUs are divided among the
+workers' process pools.
+
+Each worker answers /health as soon as it accepts connections and /ready
+once its datasets are open. Use /ready for load balancer and deployment
+readiness checks.
+
+A worker that exits unexpectedly is replaced. SIGINT or SIGTERM stops the
+workers and then the launcher. Where os.fork is unavailable, uvicorn's own
+multi-process mode (which imports the app in every worker) is used.
+"""
+import argparse
+import os
+import signal
+import socket
+import time
+from typing import Dict
+
+import uvicorn
+
+
+def prepare_datasets():
+    """
+    Extract every built .npz dataset for memory mapping.
+    """
+    from cities import DEFAULT_CITIES_PATH
+    from coastline import DEFAULT_COASTLINE_PATH
+    from datasets import extracted_path, load_arrays
+
+    for path in (DEFAULT_CITIES_PATH, DEFAULT_COASTLINE_PATH):
+        if os.path.exists(path) and not os.path.isdir(extracted_path(path)):
+            start = time.perf_counter()
+            load_arrays(path)
+            print(f"Extracted {path} for memory mapping in {time.perf_counter() - start:.1f}s")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve(workers: int, host: str, port: int, log_level: str):
+    """
+    Import the app, fork the workers and supervise them until SIGINT or SIGTERM.
+
+    Args:
+        workers: Server worker processes
+        host: Address to listen on
+        port: Port to listen on
+        log_level: uvicorn log level
+    """
+    import main
+    main._open_datasets()
+
+    sock = _bind(host, port)
+    config = uvicorn.Config(main.app, host=host, port=port, log_level=log_level)
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def fork():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        fork()
+    print(f"Serving on http://{host}:{port} with {workers} workers (launcher pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, replacing it")
+        # Do not spin if workers die during startup (e.g. a broken deployment)
+        time.sleep(max(0.0, 1.0 - (time.monotonic() - started)))
+        if not stopping:
+            fork()
+    sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Server worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Read when the app is imported
+    os.environ.setdefault("PROCESS_POOL_WORKERS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+    prepare_datasets()
+    if hasattr(os, "fork"):
+        serve(args.workers, args.host, args.port, args.log_level)
+    else:
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers,
+                    log_level=args.log_level, reload=False)
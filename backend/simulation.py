@@ -1,5 +1,13 @@
-import math
-from typing import Optional, Tuple
+import numpy as np
+from typing import Dict, Optional, Tuple
+from models import BatchImpactRequest
+from population_grid import get_population_grid
+from entry import get_entry_table
+from terrain import get_terrain_grid
+from coastline import get_coastline
+
+# Largest batch simulated per request
+MAX_BATCH_SIZE = 1_000_000
 
 class ImpactSimulator:
     """
@@ -7,6 +15,9 @@ class ImpactSimulator:
     - Collins et al. (2005) crater scaling laws
     - Holsapple (1993) impact cratering equations
     - Schultz & Gault (1975) seismic effects
+
+    Every method accepts either plain floats or NumPy arrays, so the same
+    formulas serve single simulations and vectorized batches bit-for-bit.
     """
     
     # Physical constants
@@ -29,16 +40,84 @@ class ImpactSimulator:
         Returns:
             Tuple of (energy in joules, energy in megatons TNT)
         """
-        radius = size / 2
-        volume = (4 / 3) * math.pi * (radius ** 3)
+        radius = np.divide(size, 2)
+        volume = (4 / 3) * np.pi * np.power(radius, 3)
         mass = volume * density
-        velocity_ms = velocity * 1000  # Convert to m/s
+        velocity_ms = np.multiply(velocity, 1000)  # Convert to m/s
         
-        energy_joules = 0.5 * mass * (velocity_ms ** 2)
+        energy_joules = 0.5 * mass * np.power(velocity_ms, 2)
         megatons_tnt = energy_joules / (ImpactSimulator.TNT_JOULES * 1000)
         
         return energy_joules, megatons_tnt
     
+    @staticmethod
+    def calculate_atmospheric_entry(size: float, density: float, velocity: float,
+                                    angle: float) -> Tuple[float, float, float, float]:
+        """
+        Atmospheric entry: whether the body airbursts, and what reaches the ground.
+        
+        Interpolated from the precomputed pancake-model table (see entry.py).
+        Without a built table every body reaches the ground intact.
+        
+        Args:
+            size: Asteroid diameter in meters
+            density: Density in kg/m³
+            velocity: Entry velocity in km/s
+            angle: Entry angle in degrees from horizontal
+            
+        Returns:
+            Tuple of (burst altitude in m (0 for a ground impact), breakup
+            altitude in m (0 if the body stays intact), fraction of the
+            entry energy delivered to the ground, impact velocity in km/s)
+        """
+        table = get_entry_table()
+        if table is None:
+            zero = np.zeros(np.broadcast(size, density, velocity, angle).shape)[()]
+            return zero, zero, zero + 1.0, np.multiply(velocity, 1.0)
+        
+        burst_altitude, breakup_altitude, velocity_fraction, mass_fraction = table.lookup(
+            size, density, velocity, angle
+        )
+        ground_fraction = mass_fraction * np.power(velocity_fraction, 2)
+        return burst_altitude, breakup_altitude, ground_fraction, np.multiply(velocity, velocity_fraction)
+    
+    @staticmethod
+    def surface_conditions(lat: float, lng: float,
+                           is_water: Optional[bool] = None) -> Tuple[bool, float, float]:
+        """
+        Surface at the impact point: land or water, and the water depth.
+        
+        Read from the terrain grid (see terrain.py). Without a built grid,
+        impacts are on land unless `is_water` says otherwise, at
+        WATER_DEPTH_AVG.
+        
+        Args:
+            lat: Impact latitude in degrees
+            lng: Impact longitude in degrees
+            is_water: Caller's land/water choice, or None to take it from
+                the terrain (arrays must not contain None)
+            
+        Returns:
+            Tuple of (is water impact, water depth in m (0 on land),
+            elevation in m (NaN without a terrain grid))
+        """
+        grid = get_terrain_grid()
+        if grid is None:
+            shape = np.broadcast(lat, lng).shape
+            water = np.zeros(shape, dtype=bool) if is_water is None else np.broadcast_to(is_water, shape).astype(bool)
+            depth = np.where(water, ImpactSimulator.WATER_DEPTH_AVG, 0.0)
+            return water[()], depth[()], np.full(shape, np.nan)[()]
+        
+        terrain_water, depth, elevation = grid.surface(lat, lng)
+        if is_water is None:
+            water = terrain_water
+        else:
+            # Water impacts the terrain places on land get the average depth
+            water = np.broadcast_to(is_water, terrain_water.shape).astype(bool)
+            depth = np.where(water & ~terrain_water, ImpactSimulator.WATER_DEPTH_AVG, depth)
+        depth = np.where(water, depth, 0.0)
+        return water[()], depth[()], elevation[()]
+    
     @staticmethod
     def calculate_crater_size(energy_mt: float, is_water: bool) -> Tuple[float, float]:
         """
@@ -52,10 +131,10 @@ class ImpactSimulator:
             Tuple of (diameter in meters, depth in meters)
         """
         # Scaling constant (higher for water impacts)
-        K = 1.8 if is_water else 1.2
+        K = np.where(is_water, 1.8, 1.2)[()]
         
         # Scaling law: D = K * E^(1/3.4)
-        diameter = K * (energy_mt ** (1 / 3.4)) * 1000  # Convert to meters
+        diameter = K * np.power(energy_mt, 1 / 3.4) * 1000  # Convert to meters
         depth = diameter / 5  # Typical depth-to-diameter ratio
         
         return diameter, depth
@@ -72,54 +151,108 @@ class ImpactSimulator:
             Tuple of (Richter magnitude, affected radius in km)
         """
         # Richter magnitude formula
-        magnitude = (2 / 3) * (math.log10(energy_joules) - 4.8)
-        magnitude = min(magnitude, 12)  # Cap at maximum possible
+        magnitude = (2 / 3) * (np.log10(np.maximum(energy_joules, 1.0)) - 4.8)
+        magnitude = np.minimum(magnitude, 12)  # Cap at maximum possible
         
         # Affected radius where shaking is felt (Modified Mercalli intensity > III)
-        radius = 10 ** (0.5 * magnitude - 0.8)
+        radius = np.power(10.0, 0.5 * magnitude - 0.8)
+        
+        # A complete airburst delivers no energy to the ground
+        if np.any(np.equal(energy_joules, 0)):
+            magnitude = np.where(energy_joules > 0, magnitude, 0.0)[()]
+            radius = np.where(energy_joules > 0, radius, 0.0)[()]
         
         return magnitude, radius
     
     @staticmethod
-    def calculate_tsunami_effects(energy_mt: float) -> Optional[Tuple[float, float]]:
+    def calculate_tsunami_effects(energy_mt: float,
+                                  water_depth: float = WATER_DEPTH_AVG) -> Optional[Tuple[float, float]]:
         """
         Calculate tsunami characteristics for water impacts.
         
         Args:
             energy_mt: Impact energy in megatons TNT
+            water_depth: Water depth at the impact point in meters
             
         Returns:
             Tuple of (wave height in meters, affected radius in km) or None
         """
         # Tsunami wave height (meters)
-        wave_height = (energy_mt / 1000) ** 0.25 * 10
-        wave_height = min(wave_height, 500)  # Physical limit
+        deep_water_height = np.power(np.divide(energy_mt, 1000), 0.25) * 10
+        deep_water_height = np.minimum(deep_water_height, 500)  # Physical limit
         
-        # Affected radius (km)
-        affected_radius = math.sqrt(energy_mt) * 15
-        affected_radius = min(affected_radius, 10000)  # Pacific Ocean scale
+        # The wave cannot be taller than the water column it displaces
+        wave_height = np.minimum(deep_water_height, water_depth)
+        
+        # Affected radius (km); amplitude decays with distance, so a wave
+        # limited by shallow water reaches proportionally less far
+        affected_radius = np.sqrt(energy_mt) * 15
+        affected_radius = np.minimum(affected_radius, 10000)  # Pacific Ocean scale
+        if np.any(wave_height < deep_water_height):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                affected_radius = affected_radius * np.where(
+                    deep_water_height > 0, wave_height / deep_water_height, 1.0
+                )[()]
         
         return wave_height, affected_radius
     
     @staticmethod
-    def calculate_atmospheric_effects(energy_mt: float) -> Tuple[float, float, float]:
+    def calculate_coastal_inundation(lat: float, lng: float, wave_height: float,
+                                     affected_radius: float) -> Tuple[Optional[int], Optional[float], Optional[int]]:
+        """
+        Coasts reached by a tsunami (single scenarios only).
+        
+        Propagated over the precomputed coastline and ocean travel-time graph
+        (see coastline.py); all values are None if it has not been built.
+        
+        Args:
+            lat: Impact latitude in degrees
+            lng: Impact longitude in degrees
+            wave_height: Tsunami wave height at the source in meters
+            affected_radius: Tsunami affected radius in km
+            
+        Returns:
+            Tuple of (coastline points reached, first arrival in minutes
+            (None if no coast is reached), inundated coastal population
+            (None without population data))
+        """
+        coastline = get_coastline()
+        if coastline is None:
+            return None, None, None
+        
+        points, first_arrival, population = coastline.summary(lat, lng, float(wave_height), float(affected_radius))
+        return (
+            points,
+            None if first_arrival is None else first_arrival / 60,
+            None if population is None else int(population)
+        )
+    
+    @staticmethod
+    def calculate_atmospheric_effects(energy_mt: float, burst_altitude: float = 0) -> Tuple[float, float, float]:
         """
         Calculate atmospheric and thermal effects.
         
         Args:
             energy_mt: Impact energy in megatons TNT
+            burst_altitude: Airburst altitude in meters (0 for a ground impact)
             
         Returns:
             Tuple of (fireball radius, thermal radiation radius, overpressure radius) in km
         """
         # Fireball radius (km)
-        fireball_radius = (energy_mt ** 0.4) * 0.28
+        fireball_radius = np.power(energy_mt, 0.4) * 0.28
         
         # Thermal radiation radius (3rd degree burns, km)
-        thermal_radiation = (energy_mt ** 0.41) * 2.2
+        thermal_radiation = np.power(energy_mt, 0.41) * 2.2
         
         # Overpressure radius (5 psi, structural damage, km)
-        overpressure = (energy_mt ** 0.33) * 2.2
+        overpressure = np.power(energy_mt, 0.33) * 2.2
+        
+        # For an airburst these are slant ranges; convert to ground ranges
+        if np.any(burst_altitude):
+            height = np.divide(burst_altitude, 1000)
+            thermal_radiation = _ground_range(thermal_radiation, height)
+            overpressure = _ground_range(overpressure, height)
         
         return fireball_radius, thermal_radiation, overpressure
     
@@ -135,10 +268,204 @@ class ImpactSimulator:
         Returns:
             Tuple of (estimated casualties, affected population)
         """
-        affected_area = math.pi * (overpressure_radius ** 2)
-        affected_population = int(affected_area * population_density)
+        affected_area = np.pi * np.power(overpressure_radius, 2)
+        affected_population = np.trunc(affected_area * population_density)
         casualty_rate = 0.5  # 50% casualty rate in affected zone
         
-        estimated_casualties = int(affected_population * casualty_rate)
+        estimated_casualties = np.trunc(affected_population * casualty_rate)
+        
+        return _to_int(estimated_casualties), _to_int(affected_population)
+    
+    @staticmethod
+    def estimate_casualties_at(lat: float, lng: float, fireball_radius: float,
+                               thermal_radius: float, overpressure_radius: float) -> Tuple[int, int]:
+        """
+        Estimate casualties from the population actually around the impact.
+        
+        Integrates the gridded population over the geodesic disk of each
+        effect radius (see population_grid.py). Falls back to the uniform
+        density of estimate_casualties when no population grid is built.
+        
+        Args:
+            lat: Impact latitude in degrees
+            lng: Impact longitude in degrees
+            fireball_radius: Fireball radius in km
+            thermal_radius: Thermal radiation radius in km
+            overpressure_radius: Overpressure radius in km
+            
+        Returns:
+            Tuple of (estimated casualties, affected population)
+        """
+        grid = get_population_grid()
+        if grid is None:
+            return ImpactSimulator.estimate_casualties(overpressure_radius)
+        
+        estimated_casualties, affected_population = grid.estimate_casualties(
+            lat, lng, fireball_radius, thermal_radius, overpressure_radius
+        )
+        return _to_int(estimated_casualties), _to_int(affected_population)
+    
+    @staticmethod
+    def simulate_batch(size: np.ndarray, density: np.ndarray, velocity: np.ndarray,
+                       is_water: Optional[np.ndarray], lat: np.ndarray, lng: np.ndarray,
+                       angle: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run the full impact pipeline over arrays of scenarios in one pass.
+        
+        Args:
+            size: Asteroid diameters in meters
+            density: Densities in kg/m³
+            velocity: Velocities in km/s
+            is_water: Boolean mask of water impacts, or None to take it from
+                the terrain grid
+            lat: Impact latitudes in degrees
+            lng: Impact longitudes in degrees
+            angle: Entry angles in degrees
+            
+        Returns:
+            Dict of result columns keyed by "<group>.<field>", matching the
+            fields of ImpactResults. Tsunami columns are NaN for land impacts.
+        """
+        size = np.asarray(size, dtype=np.float64)
+        density = np.asarray(density, dtype=np.float64)
+        velocity = np.asarray(velocity, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        angle = np.asarray(angle, dtype=np.float64)
+        if is_water is not None:
+            is_water = np.asarray(is_water, dtype=bool)
+        
+        is_water, water_depth, elevation = ImpactSimulator.surface_conditions(lat, lng, is_water)
         
-        return estimated_casualties, affected_population
+        energy_joules, energy_mt = ImpactSimulator.calculate_impact_energy(size, density, velocity)
+        burst_altitude, breakup_altitude, ground_fraction, impact_velocity = \
+            ImpactSimulator.calculate_atmospheric_entry(size, density, velocity, angle)
+        ground_joules, ground_mt = energy_joules * ground_fraction, energy_mt * ground_fraction
+        crater_diameter, crater_depth = ImpactSimulator.calculate_crater_size(ground_mt, is_water)
+        seismic_magnitude, seismic_radius = ImpactSimulator.calculate_seismic_effects(ground_joules)
+        wave_height, tsunami_radius = ImpactSimulator.calculate_tsunami_effects(ground_mt, water_depth)
+        fireball, thermal, overpressure = ImpactSimulator.calculate_atmospheric_effects(energy_mt, burst_altitude)
+        casualties, affected_pop = ImpactSimulator.estimate_casualties_at(lat, lng, fireball, thermal, overpressure)
+        
+        return {
+            "terrain.is_water_impact": is_water,
+            "terrain.elevation": elevation,
+            "terrain.water_depth": water_depth,
+            "energy.joules": energy_joules,
+            "energy.megatons_tnt": energy_mt,
+            "entry.is_airburst": burst_altitude > 0,
+            "entry.burst_altitude": burst_altitude,
+            "entry.breakup_altitude": breakup_altitude,
+            "entry.airburst_energy_mt": energy_mt - ground_mt,
+            "entry.ground_energy_mt": ground_mt,
+            "entry.impact_velocity": impact_velocity,
+            "crater.diameter": crater_diameter,
+            "crater.depth": crater_depth,
+            "seismic.magnitude": seismic_magnitude,
+            "seismic.radius": seismic_radius,
+            "tsunami.wave_height": np.where(is_water, wave_height, np.nan),
+            "tsunami.affected_radius": np.where(is_water, tsunami_radius, np.nan),
+            "atmospheric.fireball_radius": fireball,
+            "atmospheric.thermal_radiation": thermal,
+            "atmospheric.overpressure": overpressure,
+            "casualties.estimated": casualties,
+            "casualties.affected_population": affected_pop,
+        }
+    
+    @staticmethod
+    def effect_radii(results: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Effect radius per zone (km) from simulate_batch output, as used by
+        the city index. Tsunami radii are NaN for land impacts.
+        """
+        return {
+            "fireball": results["atmospheric.fireball_radius"],
+            "overpressure": results["atmospheric.overpressure"],
+            "thermal": results["atmospheric.thermal_radiation"],
+            "tsunami": results["tsunami.affected_radius"],
+            "seismic": results["seismic.radius"],
+        }
+
+
+def batch_columns(request: BatchImpactRequest) -> Dict[str, np.ndarray]:
+    """
+    Normalize a batch request into validated NumPy columns.
+
+    Raises:
+        ValueError: If both or neither of scenarios and columns are given,
+            the columns differ in length or hold invalid values, or the
+            batch exceeds MAX_BATCH_SIZE
+    """
+    if (request.scenarios is None) == (request.columns is None):
+        raise ValueError("Provide exactly one of 'scenarios' or 'columns'")
+
+    if request.scenarios is not None:
+        scenarios = request.scenarios
+        columns = {
+            "size": np.array([p.size for p in scenarios], dtype=np.float64),
+            "density": np.array([p.density for p in scenarios], dtype=np.float64),
+            "velocity": np.array([p.velocity for p in scenarios], dtype=np.float64),
+            "angle": np.array([p.angle for p in scenarios], dtype=np.float64),
+            "lat": np.array([p.impact_location.lat for p in scenarios], dtype=np.float64),
+            "lng": np.array([p.impact_location.lng for p in scenarios], dtype=np.float64),
+        }
+        water = [p.is_water_impact for p in scenarios]
+    else:
+        raw = request.columns
+        n = len(raw.size)
+        water = raw.is_water_impact
+        columns = {
+            "size": np.asarray(raw.size, dtype=np.float64),
+            "density": np.asarray(raw.density, dtype=np.float64),
+            "velocity": np.asarray(raw.velocity, dtype=np.float64),
+            "angle": np.asarray(raw.angle, dtype=np.float64),
+            "lat": np.asarray(raw.lat, dtype=np.float64),
+            "lng": np.asarray(raw.lng, dtype=np.float64),
+        }
+        if any(len(values) != n for values in columns.values()) or (water is not None and len(water) != n):
+            raise ValueError("All columns must have the same length")
+
+        # Same constraints as ImpactParameters
+        checks = [
+            ("size", columns["size"] > 0),
+            ("density", columns["density"] > 0),
+            ("velocity", columns["velocity"] > 0),
+            ("angle", (columns["angle"] >= 0) & (columns["angle"] <= 90)),
+            ("lat", (columns["lat"] >= -90) & (columns["lat"] <= 90)),
+            ("lng", (columns["lng"] >= -180) & (columns["lng"] <= 180)),
+        ]
+        for name, valid in checks:
+            if not valid.all():
+                index = int(np.argmin(valid))
+                raise ValueError(f"Invalid {name} at index {index}")
+
+    if len(columns["size"]) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch size exceeds {MAX_BATCH_SIZE}")
+
+    columns["is_water_impact"] = _water_column(water, columns["lat"], columns["lng"])
+    return columns
+
+
+def _water_column(water: Optional[list], lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """
+    Water impact mask for a batch, taking unspecified entries from the terrain.
+    """
+    if water is None or any(value is None for value in water):
+        derived, _, _ = ImpactSimulator.surface_conditions(lat, lng)
+        if water is None:
+            return derived
+        return np.array([d if value is None else value for value, d in zip(water, derived.tolist())], dtype=bool)
+    return np.asarray(water, dtype=bool)
+
+
+def _ground_range(slant_range, height):
+    """Ground distance (km) at which a slant range from a burst at `height` km lands."""
+    ground = np.sqrt(np.maximum(np.power(slant_range, 2) - np.power(height, 2), 0))
+    return np.where(height > 0, ground, slant_range)[()]
+
+
+def _to_int(value):
+    """Convert a truncated float (or array of them) to int / int64."""
+    if np.ndim(value) == 0:
+        return int(value)
+    return value.astype(np.int64)
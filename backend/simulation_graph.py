@@ -0,0 +1,196 @@
+"""
+Incremental impact pipeline for live parameter updates.
+
+The /simulate pipeline is modelled as a dependency graph: every stage
+(energy, crater, ...) is a node that depends on input parameters and on
+other stages. A node is recomputed only when one of its dependencies has
+changed since its last evaluation, and a recomputed node whose value comes
+out unchanged does not invalidate its dependents. Moving only the impact
+location therefore re-runs just the terrain lookup, the casualty estimate
+and (for water impacts) the coastal tsunami, unless the move crosses a
+coastline.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from simulation import ImpactSimulator
+import metrics
+
+# Input parameters (leaves of the graph), flattened from ImpactParameters
+INPUTS = ("size", "density", "velocity", "angle", "lat", "lng", "is_water_impact")
+
+
+class Stage:
+    """
+    One memoized node of the pipeline.
+
+    Args:
+        name: Stage name (also the ImpactResults group it renders)
+        inputs: Names of the parameters and stages the stage depends on
+        compute: Function of the input values, in order
+        render: Converts the computed value to its ImpactResults group
+            (a dict of fields, or None)
+    """
+
+    def __init__(self, name: str, inputs: Tuple[str, ...], compute: Callable[..., Any],
+                 render: Callable[[Any], Optional[Dict[str, Any]]]):
+        self.name = name
+        self.inputs = inputs
+        self.compute = compute
+        self.render = render
+
+
+STAGES: List[Stage] = [
+    Stage("terrain", ("lat", "lng", "is_water_impact"),
+          lambda lat, lng, is_water: _terrain(*ImpactSimulator.surface_conditions(lat, lng, is_water)),
+          lambda v: {"is_water_impact": v[0], "elevation": v[2], "water_depth": v[1]}),
+    Stage("energy", ("size", "density", "velocity"),
+          ImpactSimulator.calculate_impact_energy,
+          lambda v: {"joules": float(v[0]), "megatons_tnt": float(v[1])}),
+    Stage("entry", ("energy", "size", "density", "velocity", "angle"),
+          lambda energy, *inputs: _entry(energy, ImpactSimulator.calculate_atmospheric_entry(*inputs)),
+          lambda v: {"is_airburst": bool(v[0] > 0), "burst_altitude": float(v[0]), "breakup_altitude": float(v[1]),
+                     "airburst_energy_mt": float(v[2]), "ground_energy_mt": float(v[3]), "impact_velocity": float(v[4])}),
+    Stage("crater", ("entry", "terrain"),
+          lambda entry, terrain: ImpactSimulator.calculate_crater_size(entry[3], terrain[0]),
+          lambda v: {"diameter": float(v[0]), "depth": float(v[1])}),
+    Stage("seismic", ("entry",),
+          lambda entry: ImpactSimulator.calculate_seismic_effects(entry[5]),
+          lambda v: {"magnitude": float(v[0]), "radius": float(v[1])}),
+    Stage("tsunami", ("entry", "terrain", "lat", "lng"),
+          lambda entry, terrain, lat, lng: _tsunami(entry[3], terrain[1], lat, lng) if terrain[0] else None,
+          lambda v: None if v is None else {"wave_height": float(v[0]), "affected_radius": float(v[1]),
+                                            "affected_coast_points": v[2], "first_arrival": v[3],
+                                            "inundated_population": v[4]}),
+    Stage("atmospheric", ("energy", "entry"),
+          lambda energy, entry: ImpactSimulator.calculate_atmospheric_effects(energy[1], entry[0]),
+          lambda v: {"fireball_radius": float(v[0]), "thermal_radiation": float(v[1]), "overpressure": float(v[2])}),
+    Stage("casualties", ("atmospheric", "lat", "lng"),
+          lambda atmospheric, lat, lng: ImpactSimulator.estimate_casualties_at(lat, lng, *atmospheric),
+          lambda v: {"estimated": int(v[0]), "affected_population": int(v[1])}),
+]
+
+
+def _terrain(is_water, water_depth, elevation) -> Tuple:
+    """
+    (is water, water depth, elevation or None) as plain Python values, so
+    that an unchanged surface compares equal (NaN elevations would not).
+    """
+    return bool(is_water), float(water_depth), None if np.isnan(elevation) else float(elevation)
+
+
+def _tsunami(ground_mt, water_depth, lat, lng) -> Tuple:
+    """
+    (wave height, affected radius, coast points, first arrival, inundated
+    population) for a water impact.
+    """
+    wave_height, affected_radius = ImpactSimulator.calculate_tsunami_effects(ground_mt, water_depth)
+    return (wave_height, affected_radius,
+            *ImpactSimulator.calculate_coastal_inundation(lat, lng, wave_height, affected_radius))
+
+
+def _entry(energy, entry) -> Tuple:
+    """
+    (burst altitude, breakup altitude, airburst Mt, ground Mt, impact
+    velocity, ground joules) from the energy and entry stage outputs.
+    """
+    burst_altitude, breakup_altitude, ground_fraction, impact_velocity = entry
+    ground_mt = energy[1] * ground_fraction
+    return burst_altitude, breakup_altitude, energy[1] - ground_mt, ground_mt, impact_velocity, energy[0] * ground_fraction
+
+
+class SimulationGraph:
+    """
+    Memoized evaluation of STAGES for one client session.
+
+    Each node carries a version that is bumped only when its value changes;
+    a stage remembers the versions of its inputs it was computed from.
+    """
+
+    def __init__(self, stages: List[Stage] = STAGES):
+        self.stages = stages
+        self._values: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._seen: Dict[str, Tuple[int, ...]] = {}
+
+    def update(self, params: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Set input parameters and bring every stage up to date.
+
+        Args:
+            params: Values for INPUTS (missing inputs keep their previous value)
+
+        Returns:
+            Tuple of (ImpactResults dict, names of the stages recomputed)
+        """
+        for name, value in params.items():
+            if name not in INPUTS:
+                raise ValueError(f"Unknown simulation input: {name}")
+            self._set(name, value)
+
+        recomputed = []
+        for stage in self.stages:
+            seen = tuple(self._versions.get(name, 0) for name in stage.inputs)
+            if self._seen.get(stage.name) == seen:
+                continue
+            with metrics.stage(stage.name):
+                value = stage.compute(*(self._values[name] for name in stage.inputs))
+            self._seen[stage.name] = seen
+            self._set(stage.name, value)
+            recomputed.append(stage.name)
+
+        return self.results(), recomputed
+
+    def results(self) -> Dict[str, Any]:
+        """
+        The current results, shaped like ImpactResults.
+        """
+        return {stage.name: stage.render(self._values[stage.name]) for stage in self.stages}
+
+    def _set(self, name: str, value: Any):
+        if name in self._values and _same(self._values[name], value):
+            return
+        self._values[name] = value
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+
+def flatten_parameters(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Graph inputs from an ImpactParameters dict.
+    """
+    flat = {name: value for name, value in params.items() if name != "impact_location"}
+    flat["lat"] = params["impact_location"]["lat"]
+    flat["lng"] = params["impact_location"]["lng"]
+    if flat.get("is_water_impact") is not None:
+        flat["is_water_impact"] = bool(flat["is_water_impact"])
+    return flat
+
+
+def diff_results(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The result fields that differ between two ImpactResults dicts.
+
+    Groups are compared field by field; a group that appears or disappears
+    (e.g. tsunami) is sent whole, or as None.
+    """
+    if previous is None:
+        return current
+    changed = {}
+    for group, fields in current.items():
+        before = previous.get(group)
+        if fields is None or before is None:
+            if fields != before:
+                changed[group] = fields
+            continue
+        delta = {field: value for field, value in fields.items() if before.get(field) != value}
+        if delta:
+            changed[group] = delta
+    return changed
+
+
+def _same(a: Any, b: Any) -> bool:
+    try:
+        return bool(a == b) and type(a) is type(b)
+    except ValueError:  # array comparisons
+        return False
@@ -0,0 +1,172 @@
+"""
+Global elevation and bathymetry lookups.
+
+A global elevation raster that includes ocean depths (for example ETOPO or
+GEBCO, as an ESRI ASCII grid) is converted once into an int16 .npy grid of
+meters above sea level. At runtime the grid is opened with numpy's memmap,
+so every worker shares the same read-only pages and a lookup touches only
+the cells it reads. No elevation service is called at request time.
+
+A point is water when the cell containing it lies below sea level, and its
+water depth is the depth of that cell. Dry land below sea level (the Dead
+Sea shore, the Caspian depression) is therefore reported as water.
+
+Usage:
+    python terrain.py build <raster.asc|raster.npy> [--output PATH]
+"""
+import argparse
+import math
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from population_grid import read_raster
+
+EARTH_RADIUS = 6371  # km
+
+DEFAULT_TERRAIN_PATH = os.getenv(
+    "TERRAIN_GRID_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "terrain.npy")
+)
+
+# Samples per terrain profile when the caller does not choose
+DEFAULT_PROFILE_SAMPLES = 256
+
+
+class TerrainGrid:
+    """
+    Equirectangular elevation grid in meters (negative below sea level).
+
+    Rows run from 90°N to 90°S and columns from 180°W to 180°E.
+    """
+
+    def __init__(self, path: str = DEFAULT_TERRAIN_PATH):
+        # Plain ndarray view of the memmap (skips memmap's Python-level __getitem__)
+        self.elevation_grid = np.asarray(np.load(path, mmap_mode="r"))
+        self.rows, self.cols = self.elevation_grid.shape
+        self.cell_lat = 180.0 / self.rows
+        self.cell_lng = 360.0 / self.cols
+
+    def elevation(self, lat, lng) -> np.ndarray:
+        """
+        Elevation of the cells containing the given points.
+
+        Args:
+            lat: Latitudes in degrees
+            lng: Longitudes in degrees (any range; wrapped to [-180, 180))
+
+        Returns:
+            Elevations in meters (float64, broadcast shape of lat and lng)
+        """
+        if np.ndim(lat) == 0 and np.ndim(lng) == 0:
+            # Single points: plain Python index arithmetic is much faster
+            row = min(max(int((90 - lat) / self.cell_lat), 0), self.rows - 1)
+            col = math.floor((lng + 180) / self.cell_lng) % self.cols
+            return np.float64(self.elevation_grid[row, col])
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        row = np.clip(((90 - lat) / self.cell_lat).astype(np.int64), 0, self.rows - 1)
+        col = (np.floor((lng + 180) / self.cell_lng).astype(np.int64)) % self.cols
+        return self.elevation_grid[row, col].astype(np.float64)
+
+    def surface(self, lat, lng) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Land/water classification and water depth at the given points.
+
+        Returns:
+            Tuple of (is_water mask, water depth in meters (0 on land),
+            elevation in meters)
+        """
+        elevation = self.elevation(lat, lng)
+        is_water = elevation < 0
+        return is_water, np.maximum(-elevation, 0), elevation
+
+    def profile(self, start_lat: float, start_lng: float, end_lat: float, end_lng: float,
+                samples: int = DEFAULT_PROFILE_SAMPLES) -> Dict[str, np.ndarray]:
+        """
+        Terrain along the great circle between two points.
+
+        Args:
+            start_lat, start_lng: Start point in degrees
+            end_lat, end_lng: End point in degrees
+            samples: Number of equally spaced samples, endpoints included
+
+        Returns:
+            Dict of arrays: distance_km (from the start), lat, lng, elevation
+            (meters) and is_water
+        """
+        lat, lng, distance = great_circle_points(start_lat, start_lng, end_lat, end_lng, samples)
+        is_water, _, elevation = self.surface(lat, lng)
+        return {
+            "distance_km": distance,
+            "lat": lat,
+            "lng": lng,
+            "elevation": elevation,
+            "is_water": is_water,
+        }
+
+
+def great_circle_points(start_lat: float, start_lng: float, end_lat: float, end_lng: float,
+                        samples: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Equally spaced points on the shorter great-circle arc between two points.
+
+    Returns:
+        Tuple of (latitudes, longitudes in [-180, 180], distances from the
+        start in km)
+    """
+    lat1, lng1, lat2, lng2 = np.radians([start_lat, start_lng, end_lat, end_lng])
+    a = np.array([np.cos(lat1) * np.cos(lng1), np.cos(lat1) * np.sin(lng1), np.sin(lat1)])
+    b = np.array([np.cos(lat2) * np.cos(lng2), np.cos(lat2) * np.sin(lng2), np.sin(lat2)])
+    angle = np.arctan2(np.linalg.norm(np.cross(a, b)), np.dot(a, b))
+    t = np.linspace(0, 1, samples)
+
+    # Spherical linear interpolation (points coincide when the arc is empty)
+    if angle < 1e-12:
+        points = np.repeat(a[None, :], samples, axis=0)
+    else:
+        points = (np.sin((1 - t) * angle)[:, None] * a + np.sin(t * angle)[:, None] * b) / np.sin(angle)
+
+    lat = np.degrees(np.arcsin(np.clip(points[:, 2], -1, 1)))
+    lng = np.degrees(np.arctan2(points[:, 1], points[:, 0]))
+    return lat, lng, t * angle * EARTH_RADIUS
+
+
+def build_grid(elevation: np.ndarray) -> np.ndarray:
+    """
+    Convert an elevation raster (meters) to the int16 grid stored on disk.
+    """
+    elevation = np.nan_to_num(np.asarray(elevation, dtype=np.float64), nan=0.0)
+    return np.clip(np.round(elevation), -32768, 32767).astype(np.int16)
+
+
+_grid: Optional[TerrainGrid] = None
+_grid_checked = False
+
+
+def get_terrain_grid() -> Optional[TerrainGrid]:
+    """
+    Return the shared terrain grid, or None if no grid has been built.
+    """
+    global _grid, _grid_checked
+    if not _grid_checked:
+        _grid_checked = True
+        if os.path.exists(DEFAULT_TERRAIN_PATH):
+            _grid = TerrainGrid(DEFAULT_TERRAIN_PATH)
+    return _grid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the terrain grid")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Convert an elevation/bathymetry raster")
+    build_parser.add_argument("source", help="ESRI ASCII grid (.asc) or .npy elevations in meters")
+    build_parser.add_argument("--output", default=DEFAULT_TERRAIN_PATH)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    grid = build_grid(read_raster(args.source))
+    np.save(args.output, grid)
+    water = float((grid < 0).mean())
+    print(f"Wrote {args.output}: {grid.shape[0]}x{grid.shape[1]} cells, {water:.1%} below sea level")
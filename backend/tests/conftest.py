@@ -0,0 +1,94 @@
+"""
+Every database and dataset path points into a temporary directory, so tests
+never read or write backend/data/ and optional datasets start out missing.
+
+Set here, before any app module is imported, because the modules read
+their settings at import time.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="meteor-tests-")
+
+os.environ["NEO_CACHE_PATH"] = os.path.join(DATA_DIR, "neo_cache.sqlite3")
+os.environ["NEO_CATALOG_URL"] = "sqlite:///" + os.path.join(DATA_DIR, "neo_catalog.sqlite3")
+os.environ["RESULT_CACHE_PATH"] = os.path.join(DATA_DIR, "result_cache.sqlite3")
+os.environ["DATASET_CACHE_DIR"] = os.path.join(DATA_DIR, "mmap")
+for name, filename in (("CITIES_PATH", "cities.npz"), ("COASTLINE_PATH", "coastline.npz"),
+                       ("ENTRY_TABLE_PATH", "entry_table.npz"), ("POPULATION_GRID_PATH", "population.npy"),
+                       ("TERRAIN_GRID_PATH", "terrain.npy")):
+    os.environ[name] = os.path.join(DATA_DIR, filename)
+# Never call the real NASA API
+os.environ["NASA_BASE_URL"] = "http://127.0.0.1:9"
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    """
+    The process-wide NASA client, pointed at a stub NeoWs server.
+    """
+    import nasa_client
+    from benchmarks.stub_nasa import start_stub
+
+    server = start_stub()
+    client = nasa_client.NASAClient(base_url="http://%s:%d" % server.server_address)
+    client.scheduler = nasa_client.UpstreamScheduler(rate_limit=1000000)
+    monkeypatch.setattr(nasa_client, "_client", client)
+    yield client
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def local_catalog(tmp_path, monkeypatch):
+    """
+    An empty catalog in a temporary database, used as the process-wide one.
+    """
+    import catalog
+
+    store = catalog.NeoCatalog("sqlite:///" + os.path.join(tmp_path, "catalog.sqlite3"))
+    monkeypatch.setattr(catalog, "_catalog", store)
+    return store
+
+
+@pytest.fixture
+def install_airburst_table(monkeypatch):
+    """
+    Returns a function that builds and loads a minimal entry table, as if
+    `python entry.py build` had run before the process started: bodies
+    under 100 m burst at 20 km, larger ones break up at 30 km and reach the
+    ground with half their velocity and mass.
+    """
+    import entry
+    import result_cache
+
+    def install():
+        # Small (1 m) and large (10 km) bodies on the first axis
+        values = {"burst_altitude": (20e3, 0.0), "breakup_altitude": (30e3, 30e3),
+                  "velocity_fraction": (0.0, 0.5), "mass_fraction": (0.0, 0.5)}
+        np.savez(entry.DEFAULT_ENTRY_TABLE_PATH, sizes=np.array([1.0, 1e4]), densities=np.array([1000.0, 8000.0]),
+                 velocities=np.array([11.0, 72.0]), angles=np.array([5.0, 90.0]),
+                 **{name: np.broadcast_to(np.reshape(values[name], (2, 1, 1, 1)), (2, 2, 2, 2))
+                    for name in entry.OUTPUTS})
+        monkeypatch.setattr(entry, "_table", entry.EntryTable(entry.DEFAULT_ENTRY_TABLE_PATH))
+        monkeypatch.setattr(entry, "_table_checked", True)
+        monkeypatch.setattr(result_cache, "_dataset_fingerprint", None)
+
+    yield install
+    if os.path.exists(entry.DEFAULT_ENTRY_TABLE_PATH):
+        os.remove(entry.DEFAULT_ENTRY_TABLE_PATH)
+
+
+@pytest.fixture
+def fresh_pool():
+    """
+    Pool workers load datasets once, so each test starts its own.
+    """
+    import process_pool
+
+    process_pool.shutdown_executor()
+    yield
+    process_pool.shutdown_executor()
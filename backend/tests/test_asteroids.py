@@ -0,0 +1,42 @@
+"""
+Asteroid endpoints: throttling by the NASA API quota.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import nasa_client
+from nasa_client import NASAClient, UpstreamScheduler
+
+
+@pytest.fixture
+def exhausted_quota(monkeypatch):
+    """
+    The app with a NASA client whose quota is used up (DEMO_KEY refill rate).
+    """
+    client = NASAClient()
+    client.scheduler = UpstreamScheduler(rate_limit=30)
+    client.scheduler.tokens = 0.0
+    monkeypatch.setattr(nasa_client, "_client", client)
+    monkeypatch.setattr(nasa_client, "NASA_INTERACTIVE_MAX_WAIT", 0.05)
+    with TestClient(main.app) as api:
+        yield api
+
+
+@pytest.mark.parametrize("path", [
+    "/api/asteroids/neo/feed?start_date=2030-01-01&end_date=2030-01-02",
+    "/api/asteroids/neo/browse",
+    "/api/asteroids/neo/3542519",
+    "/api/asteroids/statistics",
+])
+def test_exhausted_quota_is_429_with_retry_after(exhausted_quota, path):
+    response = exhausted_quota.get(path)
+    assert response.status_code == 429
+    # One token refills every 3600 / 30 seconds
+    assert 1 <= int(response.headers["Retry-After"]) <= 120
+
+
+def test_bulk_reports_rate_limited_ids(exhausted_quota):
+    response = exhausted_quota.get("/api/asteroids/neo/bulk?ids=3542519,2000433")
+    assert response.status_code == 200
+    assert response.json()["counts"] == {"rate_limited": 2}
@@ -0,0 +1,35 @@
+"""
+Catalog ingest against the stub NeoWs server.
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.stub_nasa import TOTAL_OBJECTS
+from catalog import ingest_catalog
+
+
+def test_partial_ingest_is_not_served_as_browse(stub_client, local_catalog):
+    stats = asyncio.run(ingest_catalog(local_catalog, max_pages=3))
+    assert stats["objects"] == 60
+    assert local_catalog.ingest_state() is None
+
+    with TestClient(main.app) as api:
+        page = api.get("/api/asteroids/neo/browse").json()
+    # Answered by NASA (the stub), not the local catalog
+    assert "links" not in page
+    assert page["page"]["total_elements"] == TOTAL_OBJECTS
+
+
+def test_completed_ingest_is_served_as_browse(stub_client, local_catalog):
+    asyncio.run(ingest_catalog(local_catalog, max_pages=3))
+    stats = asyncio.run(ingest_catalog(local_catalog, start_page=3))
+    assert stats["pages"] == TOTAL_OBJECTS // 20 - 3
+    assert local_catalog.ingest_state()["objects"] == TOTAL_OBJECTS
+
+    with TestClient(main.app) as api:
+        page = api.get("/api/asteroids/neo/browse?page=1&size=50").json()
+    assert page["links"]["self"].startswith("/api/asteroids/neo/browse")
+    assert page["page"]["total_elements"] == TOTAL_OBJECTS
+    assert len(page["near_earth_objects"]) == 50
@@ -0,0 +1,72 @@
+"""
+City index: batch per-city casualty totals.
+"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import cities
+from cities import CityIndex
+
+
+def _random_cities(n: int, seed: int = 0) -> CityIndex:
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lng = rng.uniform(-180, 180, n)
+    return CityIndex(np.array([f"city {k}" for k in range(n)]), np.full(n, "XX"), lat, lng,
+                     rng.integers(1000, 5_000_000, n))
+
+
+def _random_radii(n: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-60, 60, n), rng.uniform(-180, 180, n), {
+        "fireball": rng.uniform(0, 50, n),
+        "overpressure": rng.uniform(0, 300, n),
+        "thermal": rng.uniform(0, 800, n),
+        "tsunami": np.where(rng.random(n) < 0.5, np.nan, rng.uniform(0, 1000, n)),
+        "seismic": rng.uniform(0, 5000, n),
+    }
+
+
+def test_batch_matches_single_impact_breakdown():
+    index = _random_cities(2000)
+    lat, lng, radii = _random_radii(20)
+    totals = index.city_casualties_batch(lat, lng, radii)
+    for k in range(len(lat)):
+        breakdown = index.city_casualties(lat[k], lng[k], {
+            zone: radius[k] for zone, radius in radii.items() if not np.isnan(radius[k])
+        })
+        assert totals["affected"][k] == len(breakdown)
+        assert totals["population"][k] == sum(city["population"] for city in breakdown)
+        assert totals["estimated_casualties"][k] == sum(city["estimated_casualties"] for city in breakdown)
+
+
+@pytest.mark.parametrize("max_pairs", [1, 1000])
+def test_batch_slicing_does_not_change_totals(monkeypatch, max_pairs):
+    index = _random_cities(2000)
+    lat, lng, radii = _random_radii(200)
+    expected = index.city_casualties_batch(lat, lng, radii)
+    monkeypatch.setattr(cities, "MAX_CITY_PAIRS", max_pairs)
+    totals = index.city_casualties_batch(lat, lng, radii)
+    for key, values in expected.items():
+        np.testing.assert_array_equal(totals[key], values)
+
+
+def test_batch_memory_is_bounded_for_global_radii():
+    index = _random_cities(20000)
+    n = 200
+    lat, lng, _ = _random_radii(n)
+    # The seismic zone reaches every city: 4M (scenario, city) pairs
+    radii = {"overpressure": np.full(n, 20.0), "seismic": np.full(n, 20100.0)}
+
+    tracemalloc.start()
+    try:
+        totals = index.city_casualties_batch(lat, lng, radii)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert (totals["affected"] == 20000).all()
+    # Evaluating every pair at once peaks at ~450 MB here
+    assert peak < 2 * cities.MAX_CITY_PAIRS * 150
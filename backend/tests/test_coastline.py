@@ -0,0 +1,47 @@
+"""
+Tsunami reach over the ocean graph.
+"""
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+
+from cities import EARTH_RADIUS, to_unit_vectors
+from coastline import CoastlineIndex, ELEVATION_BANDS, _wave_speed, build_ocean_graph
+
+
+@pytest.fixture
+def walled_ocean():
+    """
+    A 10° ocean grid with a land wall along 0-10° E from the North Pole to
+    60° S, and two coastline points on the equator: one 10° west of the
+    source at 5° W, one just across the wall at 12° E.
+    """
+    fraction = np.ones((18, 36))
+    fraction[:15, 18] = 0.0
+    data = build_ocean_graph(fraction, np.full(fraction.shape, 4000.0))
+    coast_lat, coast_lng = np.array([0.0, 0.0]), np.array([-15.0, 12.0])
+    node_vectors = to_unit_vectors(data["node_lat"], data["node_lng"])
+    chord, node = cKDTree(node_vectors).query(to_unit_vectors(coast_lat, coast_lng))
+    offset_km = EARTH_RADIUS * 2 * np.arcsin(chord / 2)
+    data.update({
+        "coast_lat": coast_lat,
+        "coast_lng": coast_lng,
+        "coast_node": node,
+        "coast_offset": offset_km * 1000 / _wave_speed(data["node_depth"][node]),
+        "bands": np.array(ELEVATION_BANDS),
+    })
+    return CoastlineIndex(data)
+
+
+def test_coast_behind_a_landmass_is_reached_by_the_ocean_path(walled_ocean):
+    # Both points are under 2000 km from the source in a straight line, but
+    # the wave reaches the one behind the wall only around its southern end
+    reach = walled_ocean.inundation(0.0, -5.0, 10.0, 5000.0)
+    assert reach["index"].tolist() == [0]
+    assert reach["distance_km"][0] < 3000
+
+    reach = walled_ocean.inundation(0.0, -5.0, 10.0, 40000.0)
+    assert reach["index"].tolist() == [0, 1]
+    assert reach["distance_km"][1] > 10000
+    # The far side gets a wave decayed over the ocean path, not the straight line
+    assert reach["wave_height"][1] < reach["wave_height"][0] * 3000 / 10000
@@ -0,0 +1,17 @@
+"""
+Deflection strategy models.
+"""
+import numpy as np
+
+from deflection import DeflectionCalculator
+
+
+def test_parameters_not_given_take_their_nominal_values():
+    for strategy, nominal in DeflectionCalculator.PARAMETERS.items():
+        default = DeflectionCalculator.evaluate(strategy, 200.0, 1e10)
+        explicit = DeflectionCalculator.evaluate(strategy, 200.0, 1e10, **nominal)
+        assert default == explicit
+
+        name, value = next(iter(nominal.items()))
+        doubled = DeflectionCalculator.evaluate(strategy, 200.0, 1e10, **{name: 2 * value})
+        assert not np.array_equal(doubled[0], default[0])
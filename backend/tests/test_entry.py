@@ -0,0 +1,46 @@
+"""
+Atmospheric entry integration and the interpolated lookup table.
+"""
+import numpy as np
+import pytest
+
+import entry
+
+
+@pytest.mark.parametrize("size, density, angle", [(50, 1000, 45), (10, 3000, 30), (200, 2000, 20)])
+def test_burst_altitude_does_not_decrease_with_velocity(size, density, angle):
+    outcomes = np.array([entry.integrate_entry(size, density, velocity, angle) for velocity in entry.TABLE_VELOCITIES])
+    burst_altitude, breakup_altitude = outcomes[:, 0], outcomes[:, 1]
+    assert (burst_altitude > 0).all()
+    assert (np.diff(burst_altitude) >= 0).all()
+    assert (np.diff(breakup_altitude) >= 0).all()
+
+
+def test_body_over_strength_at_entry_breaks_up_immediately():
+    burst_altitude, breakup_altitude, velocity_fraction, mass_fraction = entry.integrate_entry(50, 1000, 70, 45)
+    assert breakup_altitude == entry.ENTRY_ALTITUDE
+    assert burst_altitude > 30e3
+    assert velocity_fraction == mass_fraction == 0.0
+
+
+def test_lookup_stays_within_one_regime(tmp_path):
+    # Small bodies burst aloft, large ones strike the ground
+    path = str(tmp_path / "entry_table.npz")
+    values = {"burst_altitude": (20e3, 0.0), "breakup_altitude": (30e3, 10e3),
+              "velocity_fraction": (0.0, 0.8), "mass_fraction": (0.0, 0.6)}
+    np.savez(path, sizes=np.array([1.0, 1e4]), densities=np.array([1000.0, 8000.0]),
+             velocities=np.array([11.0, 72.0]), angles=np.array([5.0, 90.0]),
+             **{name: np.broadcast_to(np.reshape(values[name], (2, 1, 1, 1)), (2, 2, 2, 2)) for name in entry.OUTPUTS})
+    table = entry.EntryTable(path)
+
+    sizes = np.logspace(0, 4, 41)
+    burst_altitude, breakup_altitude, velocity_fraction, mass_fraction = table.lookup(sizes, 3000.0, 20.0, 45.0)
+    airburst = burst_altitude > 0
+    assert airburst[sizes < 100].all() and not airburst[sizes > 100].any()
+    assert burst_altitude[airburst] == pytest.approx(20e3)
+    assert (velocity_fraction[airburst] == 0).all() and (mass_fraction[airburst] == 0).all()
+    assert velocity_fraction[~airburst] == pytest.approx(0.8) and mass_fraction[~airburst] == pytest.approx(0.6)
+
+    for k, size in enumerate(sizes):
+        single = table.lookup(float(size), 3000.0, 20.0, 45.0)
+        assert single == pytest.approx((burst_altitude[k], breakup_altitude[k], velocity_fraction[k], mass_fraction[k]))
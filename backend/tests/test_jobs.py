@@ -0,0 +1,107 @@
+"""
+Job queue result storage and streaming.
+"""
+import asyncio
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import jobs
+import main
+
+
+def _manager_run(coroutine_function, **kwargs):
+    async def main():
+        manager = jobs.JobManager(workers=1, **kwargs)
+        try:
+            return await coroutine_function(manager)
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+async def _wait(job: jobs.Job):
+    while not job.finished:
+        await job.wait_for_chunk(len(job.chunks))
+
+
+def test_results_are_kept_on_disk_and_read_back(tmp_path):
+    columns = {"energy.joules": np.arange(1000, dtype=np.float64), "entry.is_airburst": np.ones(1000, dtype=bool)}
+
+    async def run(job):
+        job.emit_columns(columns)
+        job.emit_records([{"count": 1}])
+
+    async def scenario(manager):
+        job = manager.submit("test", run)
+        await _wait(job)
+        assert job.status == "succeeded"
+        assert all(os.path.isfile(path) for path in job.chunks)
+        assert job.result_bytes == manager.result_bytes() > 0
+
+        chunk = job.read_chunk(0)
+        assert list(chunk) == list(columns)
+        assert all(np.array_equal(chunk[key], columns[key]) for key in columns)
+        assert job.read_chunk(1) == [{"count": 1}]
+        return job
+
+    job = _manager_run(scenario, results_dir=str(tmp_path))
+    # Closing the manager removes the result files
+    assert not os.path.exists(job.directory)
+
+
+def test_expired_jobs_delete_their_results(tmp_path):
+    async def run(job):
+        job.emit_records([{"value": 1}])
+
+    async def scenario(manager):
+        job = manager.submit("test", run)
+        await _wait(job)
+        assert os.path.isdir(job.directory)
+        job.finished_at = time.time() - manager.result_ttl - 1
+        assert manager.get(job.id) is None
+        assert not os.path.exists(job.directory)
+
+    _manager_run(scenario, results_dir=str(tmp_path))
+
+
+def test_result_storage_is_capped(tmp_path):
+    async def run(job):
+        job.emit_records([{"value": 1}])
+        job.emit_columns({"value": np.zeros(1000)})
+
+    async def scenario(manager):
+        job = manager.submit("test", run)
+        await _wait(job)
+        # The first chunk fits, the second would exceed the cap
+        assert job.status == "failed"
+        assert "storage is full" in job.error
+        assert len(job.chunks) == 1
+
+        manager.max_result_bytes = job.result_bytes
+        with pytest.raises(jobs.JobQueueFull):
+            manager.submit("test", run)
+
+    _manager_run(scenario, results_dir=str(tmp_path), max_result_bytes=4096)
+
+
+def test_batch_job_streams_ndjson_and_binary():
+    request = {"columns": {"size": [50, 100, 200], "density": [3000] * 3, "velocity": [20] * 3,
+                           "angle": [45] * 3, "lat": [0, 10, 20], "lng": [0, 10, 20],
+                           "is_water_impact": [False] * 3}}
+    with TestClient(main.app) as api:
+        job = api.post("/api/jobs/batch", json=request).json()
+        lines = api.get(f"/api/jobs/{job['id']}/results").text.splitlines()
+        binary = api.get(f"/api/jobs/{job['id']}/results", params={"format": "binary"}).content
+        status = api.get(f"/api/jobs/{job['id']}").json()
+
+    assert status["status"] == "succeeded"
+    records = [json.loads(line) for line in lines]
+    assert [record["energy"]["megatons_tnt"] > 0 for record in records] == [True] * 3
+    array = np.load(io.BytesIO(binary))
+    assert array["energy.megatons_tnt"].tolist() == [record["energy"]["megatons_tnt"] for record in records]
@@ -0,0 +1,58 @@
+"""
+Monte Carlo runs reduced through mergeable column sketches.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+import monte_carlo
+from models import DistributionSpec, MonteCarloRequest
+
+PERCENTILES = [0, 5, 25, 50, 75, 95, 100]
+
+
+def test_merged_sketches_match_exact_percentiles():
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.lognormal(10, 4, 30_000), -rng.lognormal(0, 2, 5_000),
+                             np.zeros(5_000), np.full(1_000, np.nan)])
+    rng.shuffle(values)
+    sketch = monte_carlo.ColumnSketch.from_values(values[:12_345])
+    for part in np.array_split(values[12_345:], 3):
+        sketch = sketch.merge(monte_carlo.ColumnSketch.from_values(part))
+
+    assert sketch.count == 40_000
+    assert sketch.mean == pytest.approx(np.nanmean(values))
+    exact = np.nanpercentile(values, PERCENTILES)
+    assert sketch.percentiles(PERCENTILES) == pytest.approx(exact, rel=monte_carlo.SKETCH_ACCURACY * 2)
+    assert sketch.percentiles([0, 100]).tolist() == [exact[0], exact[-1]]
+
+
+def test_discrete_columns_are_exact():
+    values = np.array([0, 1, 1, 1, 3, 3, 7], dtype=np.float64)
+    sketch = monte_carlo.ColumnSketch.from_values(values)
+    assert sketch.percentiles(PERCENTILES).tolist() == np.percentile(values, PERCENTILES).tolist()
+
+
+def test_run_matches_the_simulated_draws(monkeypatch, fresh_pool):
+    monkeypatch.setattr(monte_carlo, "CHUNK_SIZE", 400)
+    request = MonteCarloRequest(
+        size=DistributionSpec(kind="lognormal", mean=4, std=1),
+        density=DistributionSpec(kind="uniform", low=1000, high=8000),
+        velocity=DistributionSpec(kind="normal", mean=20, std=5),
+        angle=DistributionSpec(kind="fixed", value=45),
+        lat=DistributionSpec(kind="uniform", low=-60, high=60),
+        lng=DistributionSpec(kind="uniform", low=-180, high=180),
+        n_samples=1000, seed=11, percentiles=[5, 50, 95]
+    )
+    progress = []
+    result = asyncio.run(monte_carlo.run_monte_carlo(request, progress=lambda done, total: progress.append(done)))
+    assert progress == [400, 800, 1000]
+
+    specs = {name: getattr(request, name).model_dump() for name in ("size", "density", "velocity", "angle", "lat", "lng")}
+    chunks = [monte_carlo.simulate_chunk(specs, n, seed, None)
+              for n, seed in zip([400, 400, 200], np.random.SeedSequence(11).spawn(3))]
+    energy = np.concatenate([chunk["energy.megatons_tnt"] for chunk in chunks])
+    assert result["bands"]["energy"]["megatons_tnt"] == pytest.approx(
+        np.percentile(energy, [5, 50, 95]), rel=monte_carlo.SKETCH_ACCURACY * 2)
+    assert result["mean"]["energy"]["megatons_tnt"] == pytest.approx(energy.mean())
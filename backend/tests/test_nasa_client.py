@@ -0,0 +1,131 @@
+"""
+NASAClient against the local stub NeoWs server: request coalescing,
+retries, timeouts and malformed responses.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from benchmarks.stub_nasa import start_stub
+from nasa_client import NASA_INTERACTIVE_MAX_WAIT, NASAAPIError, NASAClient, QuotaExhausted, UpstreamScheduler
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server = start_stub(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _client(server, **kwargs) -> NASAClient:
+    host, port = server.server_address
+    client = NASAClient(base_url=f"http://{host}:{port}", **kwargs)
+    # Refill within milliseconds, so that a 429 emptying the bucket does
+    # not stall the retry for the real API's hour-long window
+    client.scheduler = UpstreamScheduler(rate_limit=1000, window=1.0)
+    return client
+
+
+def _run(client: NASAClient, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(stub):
+    server = stub(latency=0.2)
+    client = _client(server)
+
+    async def fetch_all():
+        return await asyncio.gather(*(client.get("/neo/3542519") for _ in range(100)))
+
+    results = _run(client, fetch_all())
+    assert server.RequestHandlerClass.requests == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["id"] == "3542519"
+
+
+def test_server_errors_are_retried(stub):
+    server = stub(faults=[(503, {}), (503, {})])
+    client = _client(server, backoff=0.01)
+
+    result = _run(client, client.get("/neo/3542519"))
+    assert result["id"] == "3542519"
+    assert server.RequestHandlerClass.requests == 3
+
+
+def test_rate_limited_response_is_retried_after_retry_after(stub):
+    server = stub(faults=[(429, {"Retry-After": "0.5"})])
+    client = _client(server, backoff=0.001)
+
+    start = time.perf_counter()
+    result = _run(client, client.get("/neo/3542519"))
+    assert result["id"] == "3542519"
+    assert server.RequestHandlerClass.requests == 2
+    assert time.perf_counter() - start >= 0.5
+
+
+def test_retries_are_bounded(stub):
+    server = stub(faults=[(503, {})] * 5)
+    client = _client(server, max_retries=2, backoff=0.01)
+
+    with pytest.raises(NASAAPIError) as error:
+        _run(client, client.get("/neo/3542519"))
+    assert error.value.status_code == 503
+    assert server.RequestHandlerClass.requests == 3
+
+
+def test_client_errors_are_not_retried(stub):
+    server = stub()
+    client = _client(server, backoff=0.01)
+
+    with pytest.raises(NASAAPIError) as error:
+        _run(client, client.get("/neo/not-an-id"))
+    assert error.value.status_code == 404
+    assert server.RequestHandlerClass.requests == 1
+
+
+def test_timeout_surfaces_as_nasa_api_error(stub):
+    server = stub(latency=1.0)
+    client = _client(server, timeout=0.1, max_retries=1, backoff=0.01)
+
+    with pytest.raises(NASAAPIError) as error:
+        _run(client, client.get("/neo/3542519"))
+    assert "Timeout" in str(error.value)
+    assert error.value.status_code is None
+
+
+def test_long_retry_after_fails_interactive_requests_immediately(stub):
+    server = stub(faults=[(429, {"Retry-After": "3600"})])
+    client = _client(server, backoff=0.01)
+
+    start = time.perf_counter()
+    with pytest.raises(QuotaExhausted) as error:
+        _run(client, client.get("/neo/3542519"))
+    assert time.perf_counter() - start < NASA_INTERACTIVE_MAX_WAIT
+    assert error.value.retry_after == 3600
+    assert server.RequestHandlerClass.requests == 1
+
+
+def test_non_json_response_surfaces_as_nasa_api_error():
+    client = NASAClient(base_url="http://nasa.invalid")
+    client._http = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, text="<html>Bad gateway</html>", headers={"Content-Type": "text/html"})
+    ))
+
+    with pytest.raises(NASAAPIError) as error:
+        _run(client, client.get("/neo/3542519"))
+    assert "Invalid JSON" in str(error.value)
@@ -0,0 +1,38 @@
+"""
+Ephemeris endpoints.
+"""
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.stub_nasa import fake_neo
+
+
+def test_catalog_ephemeris_leaves_out_unbound_orbits(local_catalog):
+    records = [fake_neo(3000000 + k) for k in range(4)]
+    records[1]["orbital_data"].update({"semi_major_axis": "-3.1", "eccentricity": "1.42"})
+    local_catalog.upsert(records)
+
+    params = {"start": 2460000.5, "stop": 2460365.5, "steps": 10}
+    with TestClient(main.app) as api:
+        ids = api.get("/api/orbits/catalog/ids").json()
+        response = api.get("/api/orbits/catalog/ephemeris", params=params)
+
+    assert ids["ids"] == [record["id"] for k, record in enumerate(records) if k != 1]
+    assert response.headers["X-Ephemeris-Shape"] == "3,10,3"
+    positions = np.frombuffer(response.content, dtype="<f4").reshape(3, 10, 3)
+    assert np.isfinite(positions).all()
+
+
+def test_ephemeris_format_is_checked_before_propagating(monkeypatch):
+    from orbital_mechanics import OrbitalMechanics
+
+    def propagate(*args):
+        raise AssertionError("propagated before validating the request")
+    monkeypatch.setattr(OrbitalMechanics, "propagate", propagate)
+
+    orbit = {"a": 1.5, "e": 0.2, "i": 5.0, "omega": 30.0, "Omega": 60.0, "M": 0.0}
+    with TestClient(main.app) as api:
+        response = api.post("/api/orbits/ephemeris", json={"orbits": [orbit], "start": 2460000.5,
+                                                           "stop": 2460010.5, "format": "csv"})
+    assert response.status_code == 400
@@ -0,0 +1,38 @@
+"""
+Incremental catalog risk precompute.
+"""
+import asyncio
+
+import process_pool
+from catalog import ingest_catalog
+from risk import run_risk
+
+
+def test_incremental_run_recomputes_after_the_entry_table_is_built(stub_client, local_catalog, fresh_pool,
+                                                                    install_airburst_table):
+    asyncio.run(ingest_catalog(local_catalog, max_pages=2))
+    first = asyncio.run(run_risk(local_catalog))
+    assert first["recomputed"] == first["objects"] > 0
+    assert asyncio.run(run_risk(local_catalog))["recomputed"] == 0
+    # Ranked by total energy, which entry does not change, so the same object
+    before = local_catalog.risk_ranking("energy", None, None, 1)["items"][0]["risk"]
+
+    # As after `python entry.py build` and a restart
+    install_airburst_table()
+    process_pool.shutdown_executor()
+    rerun = asyncio.run(run_risk(local_catalog))
+    assert rerun["recomputed"] == first["objects"]
+    after = local_catalog.risk_ranking("energy", None, None, 1)["items"][0]["risk"]
+    assert after["ground_energy_mt_max"] < before["ground_energy_mt_max"]
+
+
+def test_datasets_the_envelope_does_not_read_do_not_force_a_recompute(stub_client, local_catalog, fresh_pool,
+                                                                      monkeypatch):
+    import result_cache
+
+    asyncio.run(ingest_catalog(local_catalog, max_pages=1))
+    assert asyncio.run(run_risk(local_catalog))["recomputed"] > 0
+
+    # As after rebuilding the terrain, population grid or coastline
+    monkeypatch.setattr(result_cache, "_dataset_fingerprint", "rebuilt")
+    assert asyncio.run(run_risk(local_catalog))["recomputed"] == 0
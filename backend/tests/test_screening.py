@@ -0,0 +1,18 @@
+"""
+Catalog MOID screening.
+"""
+import asyncio
+
+from benchmarks.stub_nasa import fake_neo
+from screening import run_screening
+
+
+def test_unbound_orbits_are_not_screened(local_catalog, fresh_pool):
+    records = [fake_neo(3000000 + k) for k in range(5)]
+    records[2]["orbital_data"].update({"semi_major_axis": "-3.1", "eccentricity": "1.42"})
+    local_catalog.upsert(records)
+
+    stats = asyncio.run(run_screening(local_catalog))
+    assert stats == {"objects": 4, "recomputed": 4}
+    screened = local_catalog.moid_hashes()
+    assert sorted(screened) == sorted(record["id"] for k, record in enumerate(records) if k != 2)
@@ -0,0 +1,50 @@
+"""
+Simulation endpoints with an atmospheric entry table loaded.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_city_radii_match_simulate_for_an_airburst(install_airburst_table):
+    install_airburst_table()
+    scenario = {"size": 30, "density": 3000, "velocity": 20, "angle": 45,
+                "impact_location": {"lat": 35.6762, "lng": 139.6503}, "is_water_impact": False}
+    with TestClient(main.app) as api:
+        simulated = api.post("/api/simulation/simulate", json=scenario).json()
+        breakdown = api.post("/api/simulation/cities", json=scenario).json()
+
+    assert simulated["entry"]["is_airburst"]
+    assert breakdown["radii"] == pytest.approx({
+        "fireball": simulated["atmospheric"]["fireball_radius"],
+        "overpressure": simulated["atmospheric"]["overpressure"],
+        "thermal": simulated["atmospheric"]["thermal_radiation"],
+        "seismic": simulated["seismic"]["radius"],
+    })
+
+
+def test_city_tsunami_radius_uses_ground_energy(install_airburst_table):
+    install_airburst_table()
+    scenario = {"size": 300, "density": 3000, "velocity": 20, "angle": 45,
+                "impact_location": {"lat": 30.0, "lng": -40.0}, "is_water_impact": True}
+    with TestClient(main.app) as api:
+        simulated = api.post("/api/simulation/simulate", json=scenario).json()
+        breakdown = api.post("/api/simulation/cities", json=scenario).json()
+
+    assert breakdown["radii"]["tsunami"] == pytest.approx(simulated["tsunami"]["affected_radius"])
+
+
+def test_cached_results_are_not_served_with_other_datasets(install_airburst_table):
+    scenario = {"size": 31, "density": 3000, "velocity": 20, "angle": 45,
+                "impact_location": {"lat": 10.0, "lng": 20.0}, "is_water_impact": False}
+    with TestClient(main.app) as api:
+        assert api.post("/api/simulation/simulate", json=scenario).headers["X-Cache"] == "MISS"
+        assert api.post("/api/simulation/simulate", json=scenario).headers["X-Cache"] == "HIT"
+
+        # As after a restart with the entry table built
+        install_airburst_table()
+        response = api.post("/api/simulation/simulate", json=scenario)
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["entry"]["is_airburst"]